@@ -0,0 +1,26 @@
+import random
+import time
+from game.constants import DIFFICULTY_LEVELS
+from game.generator import generate_puzzle, generate_solution
+from game.puzzles import randomize_puzzle
+from .common import measure, summarize
+
+
+def run(seed, scale):
+    results = {}
+    for difficulty in DIFFICULTY_LEVELS:
+        samples = []
+        for i in range(10 * scale):
+            t = time.perf_counter()
+            generate_puzzle(difficulty, seed + i)
+            samples.append((time.perf_counter() - t) * 1000)
+        results[f"generate_puzzle_{difficulty}"] = summarize(samples)
+    rng = random.Random(seed)
+    results["generate_solution"] = measure(lambda: generate_solution(rng), 50 * scale)
+    solution = generate_solution(random.Random(seed))
+    for difficulty in DIFFICULTY_LEVELS:
+        rng = random.Random(seed)
+        stats = measure(lambda: randomize_puzzle(solution, difficulty, DIFFICULTY_LEVELS, rng=rng), 50 * scale)
+        stats["puzzles_per_second"] = round(1000 / stats["mean_ms"], 1)
+        results[f"randomize_puzzle_{difficulty}"] = stats
+    return results
@@ -0,0 +1,57 @@
+import os
+import random
+import tempfile
+import time
+
+# must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from .common import measure, summarize
+
+
+def _with_particles(game, count, frames, fn):
+    # keep the particle count steady by topping up outside the timed call
+    samples = []
+    for _ in range(frames):
+        game.particles.emit(count - len(game.particles), (0, 900), (0, 375))
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return summarize(samples)
+
+
+def run(seed, scale):
+    from game.game_logic import SudokuGame
+    random.seed(seed)
+    # loading a puzzle starts an autosave and the celebration discards it: keep both away
+    # from the player's own progress directory
+    with tempfile.TemporaryDirectory() as progress_dir:
+        game = SudokuGame(progress_dir=progress_dir)
+        try:
+            return _run(game, scale)
+        finally:
+            game.save_writer.close()
+            game.producer.shutdown()
+
+
+def _run(game, scale):
+    game.select_difficulty("puzzle1")
+    game.load_puzzle_with_difficulty("normal")
+    game.draw()
+    frames = 300 * scale
+
+    def full_frame():
+        game.dirty_tracker.invalidate()
+        game.draw()
+
+    results = {
+        "draw_full_frame": measure(full_frame, frames),
+        "draw_idle_frame": measure(game.draw, frames),
+        "draw_grid": measure(game.draw_grid, frames),
+    }
+    game.start_celebration("benchmark")
+    results["update_celebration"] = measure(game.update_celebration, frames)
+    results["update_celebration_5000_particles"] = _with_particles(game, 5000, frames, game.update_celebration)
+    results["draw_celebration_5000_particles"] = _with_particles(game, 5000, frames, game.draw_celebration)
+    return results
@@ -0,0 +1,38 @@
+import time
+from game.cli import read_puzzles
+from game.geometry import geometry_of
+from game.generator import generate_puzzle, generate_variant
+from game.solver import parse_grid, solve
+from game.variants import VARIANTS, make_rules
+from .common import HARD_PUZZLES_PATH, summarize
+
+
+def solve_rate(grids, rounds, rules=None):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for k, grid in enumerate(grids):
+            t = time.perf_counter()
+            solve(grid, rules=rules[k] if rules else None)
+            samples.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+    result = summarize(samples)
+    result["puzzles_per_second"] = round(len(samples) / elapsed, 1)
+    return result
+
+
+def run(seed, scale):
+    with open(HARD_PUZZLES_PATH) as f:
+        hard = [parse_grid(p) for p in read_puzzles(f)]
+    generated = [generate_puzzle("advanced", seed + i)[0] for i in range(20 * scale)]
+    results = {
+        "solve_hard_set": solve_rate(hard, 5 * scale),
+        "solve_generated_advanced": solve_rate(generated, 1),
+    }
+    # variant puzzles, each solved under its own rules
+    for kind in VARIANTS:
+        made = [generate_variant(kind, "advanced", seed + i) for i in range(5 * scale)]
+        grids = [puzzle for puzzle, _, _ in made]
+        rules = [make_rules(geometry_of(puzzle), constraints) for puzzle, _, constraints in made]
+        results[f"solve_{kind}_advanced"] = solve_rate(grids, 1, rules)
+    return results
@@ -0,0 +1,28 @@
+import os
+import statistics
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+HARD_PUZZLES_PATH = os.path.join(BENCH_DIR, "hard_puzzles.txt")
+
+
+def measure(fn, repeat):
+    # per-call timings in milliseconds
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0], 4),
+        "median_ms": round(statistics.median(ordered), 4),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max_ms": round(ordered[-1], 4),
+    }
@@ -0,0 +1,45 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from . import bench_generator, bench_render, bench_solver
+
+SUITES = {"solver": bench_solver, "generator": bench_generator, "render": bench_render}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Run the benchmark suites and write JSON results")
+    parser.add_argument("suites", nargs="*", help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--scale", type=int, default=1, help="multiply the amount of work per benchmark")
+    parser.add_argument("-o", "--output", default="-", help="JSON result file, or - for stdout (default)")
+    args = parser.parse_args(argv)
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    report = {
+        "meta": {
+            "seed": args.seed,
+            "scale": args.scale,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    for name in args.suites or list(SUITES):
+        print(f"running {name}...", file=sys.stderr)
+        report["results"][name] = SUITES[name].run(args.seed, args.scale)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+from multiprocessing import Pool
+from .constants import BANK_PATH, DIFFICULTY_LEVELS
+from .generator import generate_puzzle
+from .solver import solve
+
+# File layout:
+#   header   magic, version, record size, number of sections
+#   index    one (name, first record, record count) entry per difficulty
+#   records  fixed-size puzzles, grouped by section
+# A record is the puzzle's 81 cells packed two per byte (0 = blank). Every banked
+# puzzle has exactly one solution, so the solution is recovered with the solver
+# rather than stored, which keeps a pair at 41 bytes.
+MAGIC = b"SDKB"
+VERSION = 1
+RECORD_SIZE = 41
+HEADER = struct.Struct("<4sHHI")
+INDEX_ENTRY = struct.Struct("<16sII")
+
+
+def pack_grid(grid):
+    cells = [0 if ch == '.' else int(ch) for row in grid for ch in row] + [0]
+    return bytes(cells[k] << 4 | cells[k + 1] for k in range(0, 82, 2))
+
+
+def unpack_grid(data):
+    cells = []
+    for b in data:
+        cells.append(b >> 4); cells.append(b & 0xF)
+    return [[str(v) if v else '.' for v in cells[r * 9:r * 9 + 9]] for r in range(9)]
+
+
+class PuzzleBank:
+    def __init__(self, path=BANK_PATH):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, sections = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} puzzle bank")
+        self.records_offset = HEADER.size + sections * INDEX_ENTRY.size
+        self.index = {}
+        for k in range(sections):
+            name, first, count = INDEX_ENTRY.unpack_from(self.data, HEADER.size + k * INDEX_ENTRY.size)
+            self.index[name.rstrip(b"\0").decode()] = (first, count)
+
+    def count(self, difficulty):
+        return self.index.get(difficulty, (0, 0))[1]
+
+    def fetch_puzzle(self, difficulty, index):
+        first, count = self.index[difficulty]
+        if not 0 <= index < count:
+            raise IndexError(f"{difficulty} puzzle {index} out of range")
+        offset = self.records_offset + (first + index) * RECORD_SIZE
+        return unpack_grid(self.data[offset:offset + RECORD_SIZE])
+
+    def fetch(self, difficulty, index):
+        puzzle = self.fetch_puzzle(difficulty, index)
+        return puzzle, solve(puzzle)
+
+    def random_index(self, difficulty, rng=None):
+        return (rng or random).randrange(self.count(difficulty))
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+_bank = None
+
+def get_bank():
+    # opened on first use; None when no bank file has been built
+    global _bank
+    if _bank is None and os.path.exists(BANK_PATH):
+        try:
+            _bank = PuzzleBank(BANK_PATH)
+        except (OSError, ValueError) as e:
+            print("Failed to open puzzle bank:", e)
+    return _bank
+
+
+def _make_record(args):
+    difficulty, seed = args
+    puzzle, _ = generate_puzzle(difficulty, seed)
+    return pack_grid(puzzle)
+
+
+def build_bank(path, counts, seed=0, workers=None):
+    sections = list(counts.items())
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f, Pool(workers) as pool:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, len(sections)))
+        first = 0
+        for name, count in sections:
+            f.write(INDEX_ENTRY.pack(name.encode(), first, count))
+            first += count
+        for k, (name, count) in enumerate(sections):
+            jobs = ((name, seed + k * 1_000_000_007 + i) for i in range(count))
+            for i, record in enumerate(pool.imap(_make_record, jobs, chunksize=64), 1):
+                f.write(record)
+                if i % 1000 == 0:
+                    print(f"{name}: {i}/{count}")
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the binary puzzle bank")
+    parser.add_argument("--count", type=int, default=34000, help="puzzles per difficulty")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=BANK_PATH)
+    args = parser.parse_args()
+    build_bank(args.output, {d: args.count for d in DIFFICULTY_LEVELS}, args.seed, args.workers)
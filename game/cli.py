@@ -0,0 +1,174 @@
+import argparse
+import os
+import sys
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+from .geometry import BOX_SHAPES, STANDARD, for_size, geometry_of
+from .grader import grade_puzzle
+from .solver import count_solutions, grid_to_string, is_valid_solution, parse_grid, solve
+
+# Puzzles are read lazily and results written as soon as they are ready, with a bounded
+# number of chunks in flight, so arbitrarily large dumps run in constant memory.
+CHUNKS_IN_FLIGHT_PER_WORKER = 4
+
+
+def read_puzzles(stream):
+    # Yields puzzle strings from either one-puzzle-per-line files (81 cells, or n*n for another
+    # board size) or the 9-lines-of-9 puzzleN.txt layout (both may be mixed); '#' starts a
+    # comment line. Cells are digits of the board's size, with '.' or '0' for blanks; anything
+    # else raises ValueError naming the line, rather than shifting the puzzles that follow.
+    block = []; block_start = None
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        cells = "".join(line.split())
+        size = int(len(cells) ** 0.5)
+        if len(cells) == STANDARD.size:
+            geo = STANDARD
+        elif block:
+            raise ValueError(f"line {number}: expected row {len(block) + 1} of the puzzle starting on line {block_start}, got {len(cells)} cells")
+        elif size * size == len(cells) and size in BOX_SHAPES:
+            geo = for_size(size)
+        else:
+            raise ValueError(f"line {number}: expected 81 cells (or a row of 9), got {len(cells)}")
+        for ch in cells:
+            if ch not in geo.values and ch not in ".0":
+                raise ValueError(f"line {number}: unexpected character {ch!r}")
+        if len(cells) != STANDARD.size:
+            yield cells
+            continue
+        if not block:
+            block_start = number
+        block.append(cells)
+        if len(block) == 9:
+            yield "".join(block)
+            block = []
+    if block:
+        raise ValueError(f"incomplete puzzle at end of input ({len(block)} of 9 rows, starting on line {block_start})")
+
+
+def solve_one(puzzle, limit):
+    solution = solve(parse_grid(puzzle))
+    return grid_to_string(solution) if solution else "unsolvable"
+
+
+def count_one(puzzle, limit):
+    return str(count_solutions(parse_grid(puzzle), limit))
+
+
+def grade_one(puzzle, limit):
+    grid = parse_grid(puzzle)
+    if geometry_of(grid) is not STANDARD:
+        raise ValueError("grading supports 9x9 boards only")
+    technique, steps = grade_puzzle(grid)
+    return f"{technique}\t{steps}"
+
+
+def validate_one(pair, limit):
+    puzzle, solution = pair
+    grid = parse_grid(solution)
+    if not is_valid_solution(grid):
+        return "invalid-solution"
+    if any(p not in ".0" and p != s for p, s in zip(puzzle, solution)):
+        return "mismatch"
+    if count_solutions(parse_grid(puzzle), 2) != 1:
+        return "not-unique"
+    return "ok"
+
+
+def pair_solutions(puzzles, solutions):
+    # zip, except that a puzzle left without a solution (or the reverse) is an error rather
+    # than silently dropped
+    solutions = iter(solutions); count = 0
+    for puzzle in puzzles:
+        solution = next(solutions, None)
+        if solution is None:
+            raise ValueError(f"more puzzles than solutions (only {count} solutions)")
+        count += 1
+        yield puzzle, solution
+    if next(solutions, None) is not None:
+        raise ValueError(f"more solutions than puzzles (only {count} puzzles)")
+
+
+MODES = {"solve": solve_one, "count": count_one, "grade": grade_one, "validate": validate_one}
+
+
+def _run_chunk(mode, limit, chunk):
+    handler = MODES[mode]
+    results = []
+    for item in chunk:
+        try:
+            results.append(handler(item, limit))
+        except ValueError as e:
+            results.append(f"error: {e}")
+    return results
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(mode, items, out, workers=None, chunksize=256, limit=2):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(items, chunksize):
+            out.write("".join(r + "\n" for r in _run_chunk(mode, limit, chunk)))
+        return
+    with Pool(workers) as pool:
+        pending = deque()
+        for chunk in _chunks(items, chunksize):
+            pending.append(pool.apply_async(_run_chunk, (mode, limit, chunk)))
+            if len(pending) >= workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                out.write("".join(r + "\n" for r in pending.popleft().get()))
+        while pending:
+            out.write("".join(r + "\n" for r in pending.popleft().get()))
+
+
+def solution_path_for(path):
+    # puzzle/puzzle1.txt -> puzzle/puzzle1S.txt
+    root, ext = os.path.splitext(path)
+    return root + "S" + ext
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m game.cli", description="Solve, count, grade or validate Sudoku puzzles in bulk")
+    parser.add_argument("mode", choices=sorted(MODES))
+    parser.add_argument("input", nargs="?", default="-", help="puzzle file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="result file, or - for stdout (default)")
+    parser.add_argument("-s", "--solutions", help="solutions to validate against (default: the input's *S.txt sibling)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=256, help="puzzles per task sent to a worker")
+    parser.add_argument("--limit", type=int, default=2, help="stop counting solutions at this many")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == "-" else open(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    solutions_stream = None
+    try:
+        items = read_puzzles(stream)
+        if args.mode == "validate":
+            solutions = args.solutions or (solution_path_for(args.input) if args.input != "-" else None)
+            if not solutions:
+                parser.error("validate needs --solutions when reading from stdin")
+            solutions_stream = open(solutions)
+            items = pair_solutions(items, read_puzzles(solutions_stream))
+        run(args.mode, items, out, args.workers, args.chunksize, args.limit)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        for f in (stream, out, solutions_stream):
+            if f not in (None, sys.stdin, sys.stdout):
+                f.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
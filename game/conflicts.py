@@ -0,0 +1,83 @@
+from .geometry import STANDARD, geometry_of
+from .variants import plain_rules
+
+
+class ConflictIndex:
+    # How many times each digit appears in every unit, kept up to date one edit at a time.
+    # The units are the rules' (see variants.Rules): rows, columns and boxes, then any variant
+    # houses, cages and thermometers. A digit is in conflict when its count in any of its
+    # units is above one, or when a constraint through its cell (a cage sum, a thermometer's
+    # order) is already broken; a full board with neither is solved, with no need to consult
+    # the stored solution. used[unit] is the bitmask of digits present in each unit, so the
+    # candidates of an empty cell are a few ORs away.
+    __slots__ = ("rules", "geo", "counts", "used", "values", "filled", "duplicates")
+
+    def __init__(self, grid=None, rules=None):
+        rules = rules or plain_rules(geometry_of(grid) if grid else STANDARD)
+        geo = rules.geo; n = geo.size
+        self.rules = rules; self.geo = geo
+        # counts[unit][digit], digit 1..n (index 0 unused)
+        self.counts = [[0] * (n + 1) for _ in rules.units]
+        self.used = [0] * len(rules.units)
+        self.values = [0] * geo.cells  # digit per cell, 0 where empty
+        self.filled = 0
+        self.duplicates = 0  # (unit, digit) pairs whose count is above one
+        if grid:
+            for r in range(n):
+                for c in range(n):
+                    if grid[r][c] != '.':
+                        self._add(r * n + c, geo.value(grid[r][c]))
+
+    def _add(self, i, d):
+        self.filled += 1; self.values[i] = d
+        for unit in self.rules.units_of[i]:
+            counts = self.counts[unit]
+            counts[d] += 1
+            if counts[d] == 1:
+                self.used[unit] |= 1 << (d - 1)
+            elif counts[d] == 2:
+                self.duplicates += 1
+
+    def _remove(self, i, d):
+        self.filled -= 1; self.values[i] = 0
+        for unit in self.rules.units_of[i]:
+            counts = self.counts[unit]
+            counts[d] -= 1
+            if counts[d] == 0:
+                self.used[unit] &= ~(1 << (d - 1))
+            elif counts[d] == 1:
+                self.duplicates -= 1
+
+    def update(self, r, c, old, new):
+        # old and new are digit symbols or '.'
+        i = r * self.geo.size + c
+        if old != '.':
+            self._remove(i, self.geo.value(old))
+        if new != '.':
+            self._add(i, self.geo.value(new))
+
+    def conflicts(self, r, c, value):
+        # True if value at (r, c) is repeated in one of its units or breaks a constraint
+        # through the cell
+        if value == '.':
+            return False
+        i = r * self.geo.size + c; d = self.geo.value(value)
+        counts = self.counts
+        for unit in self.rules.units_of[i]:
+            if counts[unit][d] > 1:
+                return True
+        return any(con.broken(self.values, self.geo) for con in self.rules.local_of[i])
+
+    def candidates(self, r, c):
+        # bitmask (bit d-1 for digit d) of the digits not yet in any unit through the cell
+        used = self.used; taken = 0
+        for unit in self.rules.units_of[r * self.geo.size + c]:
+            taken |= used[unit]
+        return self.geo.all_digits & ~taken
+
+    def is_full(self):
+        return self.filled == self.geo.cells
+
+    def is_solved(self):
+        return (self.filled == self.geo.cells and not self.duplicates and
+                not any(con.broken(self.values, self.geo) for con in self.rules.local))
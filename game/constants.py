@@ -20,6 +20,8 @@ BLUE = (65, 105, 225)
 LIGHT_BLUE = (173, 216, 230)
 RED = (220, 20, 60)
 GREEN = (50, 205, 50)
+CONFLICT = (255, 140, 0)  # a digit repeated in one of its units, or breaking a cage or thermometer
+VARIANT_GRAY = (200, 200, 200)  # diagonals and thermometers under the digits
 YELLOW = (255, 215, 0)
 PURPLE = (147, 112, 219)
 BACKGROUND = (240, 248, 255)
@@ -32,8 +34,22 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PUZZLE_DIR = os.path.join(BASE_DIR, "puzzle")
 SOUNDS_DIR = os.path.join(BASE_DIR, "sounds")
 SETTINGS_PATH = os.path.join(BASE_DIR, "settings.json")
+PROFILE_CSV_PATH = os.path.join(BASE_DIR, "frame_profile.csv")
+FONT_CACHE_PATH = os.path.join(BASE_DIR, "font_cache.json")
+BANK_PATH = os.path.join(PUZZLE_DIR, "puzzles.bank")
 SETTINGS_ICON_PATH = os.path.join("./img/settings.png")  
 
 # Difficulty and hints
-DIFFICULTY_LEVELS = {"beginner": 60, "normal": 40, "advanced": 20}
-HINT_LIMITS = {"beginner": 7, "normal": 5, "advanced": 3}
\ No newline at end of file
+# fewest givens to dig down to; the label itself comes from grader.difficulty_of
+DIFFICULTY_LEVELS = {"beginner": 60, "normal": 24, "advanced": 20}
+# share of cells given on boards of other sizes (see geometry.BOX_SHAPES)
+DIFFICULTY_FILL = {"beginner": 0.6, "normal": 0.45, "advanced": 0.35}
+HINT_LIMITS = {"beginner": 7, "normal": 5, "advanced": 3}
+# ready-made puzzles kept per difficulty by the background producer
+PUZZLE_QUEUE_SIZE = 3
+# save slots, listed a page at a time in the save/load dialog
+SAVE_SLOTS = 200
+SLOTS_PER_PAGE = 5
+
+# shown in place of the instructions while pencil mode is on
+PENCIL_INSTRUCTIONS = "Pencil mode: digit keys toggle notes, Space to switch back"
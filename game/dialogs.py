@@ -1,9 +1,12 @@
 from game.ui_components import Button, Slider
+from game import sounds
+from game.fonts import get_font
+from game.rendering import button_key, render_text
 from game.constants import *
 import pygame
 from game.settings import load_settings, save_settings
+from game.saves import existing_save
 import os
-import json
 import datetime
 
 class SettingsDialog:
@@ -12,8 +15,8 @@ class SettingsDialog:
         self.width = width
         self.height = height
         self.rect = pygame.Rect((SCREEN_WIDTH - width)//2, (SCREEN_HEIGHT - height)//2, width, height)
-        self.title_font = pygame.font.SysFont("Arial", 28, bold=True)
-        self.label_font = pygame.font.SysFont("Arial", 20)
+        self.title_font = get_font(28, bold=True)
+        self.label_font = get_font(20)
         # sliders initial from game's persisted volumes
         self.bg_slider = Slider(self.rect.x + 40, self.rect.y + 80, self.width - 80, value=getattr(self.game, "bg_volume", 1.0))
         self.sfx_slider = Slider(self.rect.x + 40, self.rect.y + 150, self.width - 80, value=getattr(self.game, "sfx_volume", 1.0))
@@ -28,19 +31,22 @@ class SettingsDialog:
         pygame.draw.rect(screen, WHITE, self.rect, border_radius=10)
         pygame.draw.rect(screen, DARK_GRAY, self.rect, 3, border_radius=10)
         # title
-        title = self.title_font.render("Settings", True, BLACK)
+        title = render_text(self.title_font, "Settings", BLACK)
         screen.blit(title, title.get_rect(midtop=(self.rect.centerx, self.rect.y + 12)))
         # BG label + slider
-        bg_label = self.label_font.render(f"Background Volume: {int(self.bg_slider.value * 100)}%", True, BLACK)
+        bg_label = render_text(self.label_font, f"Background Volume: {int(self.bg_slider.value * 100)}%", BLACK)
         screen.blit(bg_label, (self.rect.x + 40, self.rect.y + 48))
         self.bg_slider.draw(screen)
         # SFX
-        sfx_label = self.label_font.render(f"SFX Volume: {int(self.sfx_slider.value * 100)}%", True, BLACK)
+        sfx_label = render_text(self.label_font, f"SFX Volume: {int(self.sfx_slider.value * 100)}%", BLACK)
         screen.blit(sfx_label, (self.rect.x + 40, self.rect.y + 118))
         self.sfx_slider.draw(screen)
         # close
         self.close_btn.draw(screen)
 
+    def render_key(self):
+        return (self.bg_slider.value, self.sfx_slider.value, button_key(self.close_btn))
+
     def handle_event(self, event):
         changed = False
         if self.bg_slider.handle_event(event):
@@ -59,7 +65,7 @@ class SettingsDialog:
                 if s:
                     s.set_volume(self.game.sfx_volume)
             # apply background music volume
-            pygame.mixer.music.set_volume(self.game.bg_volume)
+            sounds.set_music_volume(self.game.bg_volume)
             # update persisted settings immediately
             save_settings({"bg_volume": self.game.bg_volume, "sfx_volume": self.game.sfx_volume})
         return False
@@ -83,55 +89,71 @@ class SaveLoadDialog:
         self.width = width
         self.height = height
         self.rect = pygame.Rect((SCREEN_WIDTH - width)//2, (SCREEN_HEIGHT - height)//2, width, height)
-        self.title_font = pygame.font.SysFont("Arial", 28, bold=True)
-        self.label_font = pygame.font.SysFont("Arial", 20)
-        self.slots = 5
+        self.title_font = get_font(28, bold=True)
+        self.label_font = get_font(20)
+        self.slots = SAVE_SLOTS
+        self.page = 0
+        self.pages = (self.slots + SLOTS_PER_PAGE - 1) // SLOTS_PER_PAGE
+        self.back_button = Button(self.rect.centerx - 60, self.rect.y + self.height - 56, 120, 40, "Back", LIGHT_GRAY, GRAY, self.close, 20)
+        self.prev_button = Button(self.rect.x + 50, self.rect.y + self.height - 56, 120, 40, "< Prev", LIGHT_GRAY, GRAY, lambda: self.turn_page(-1), 20)
+        self.next_button = Button(self.rect.right - 170, self.rect.y + self.height - 56, 120, 40, "Next >", LIGHT_GRAY, GRAY, lambda: self.turn_page(1), 20)
+        self.build_page()
+
+    def build_page(self):
+        # only the visible page gets buttons; slot details all come from one read of the index
+        index = self.game.slot_index.snapshot()
         self.slot_buttons = []
         self.delete_buttons = []
         start_y = self.rect.y + 60
         slot_btn_width = self.width - 200  # Leave space for delete button
         del_btn_width = 80
-        for i in range(1, self.slots + 1):
-            info = self.get_slot_info(i)
-            text = f"Slot {i}: {info}"
-            slot_btn = Button(self.rect.x + 50, start_y + (i-1) * (BUTTON_HEIGHT + 10), slot_btn_width, BUTTON_HEIGHT, text, LIGHT_BLUE, BLUE, lambda i=i: self.select_slot(i), 18)
+        first = self.page * SLOTS_PER_PAGE + 1
+        for row, i in enumerate(range(first, min(first + SLOTS_PER_PAGE, self.slots + 1))):
+            text = f"Slot {i}: {self.get_slot_info(i, index)}"
+            slot_btn = Button(self.rect.x + 50, start_y + row * (BUTTON_HEIGHT + 10), slot_btn_width, BUTTON_HEIGHT, text, LIGHT_BLUE, BLUE, lambda i=i: self.select_slot(i), 18)
             self.slot_buttons.append(slot_btn)
-            
+
             if self.mode == "load":
                 del_x = self.rect.x + 50 + slot_btn_width + 20
-                del_btn = Button(del_x, start_y + (i-1) * (BUTTON_HEIGHT + 10), del_btn_width, BUTTON_HEIGHT, "Delete", RED, (255, 100, 100), lambda i=i: self.delete_slot(i), 18)
+                del_btn = Button(del_x, start_y + row * (BUTTON_HEIGHT + 10), del_btn_width, BUTTON_HEIGHT, "Delete", RED, (255, 100, 100), lambda i=i: self.delete_slot(i), 18)
                 self.delete_buttons.append(del_btn)
             else:
                 self.delete_buttons.append(None)
-        self.back_button = Button(self.rect.centerx - 60, self.rect.y + self.height - 56, 120, 40, "Back", LIGHT_GRAY, GRAY, self.close, 20)
+        self.prev_button.enabled = self.page > 0
+        self.next_button.enabled = self.page < self.pages - 1
 
-    def get_slot_info(self, slot):
-        path = os.path.join(self.game.progress_dir, f"slot{slot}.json")
-        if os.path.exists(path):
-            try:
-                with open(path, 'r') as f:
-                    data = json.load(f)
-                puzzle = data.get("current_puzzle_name", "Unknown")
-                diff = data.get("current_difficulty", "Unknown")
-                completed = data.get("puzzle_completed", False)
-                save_time = data.get("save_time", 0)
-                try:
-                    if save_time and isinstance(save_time, (int, float)):
-                        dt = datetime.datetime.fromtimestamp(float(save_time))
-                        date_str = dt.strftime("%m/%d %H:%M")
-                    else:
-                        date_str = "Unknown"
-                except (ValueError, TypeError, OSError):
-                    date_str = "Unknown"
-                info = f"{puzzle} {diff} {date_str}"
-                if completed:
-                    info += " (Completed)"
-                return info
-            except Exception as e:
-                print(f"Error loading slot {slot}: {e}")
-                return "Corrupted"
-        else:
+    def turn_page(self, step):
+        self.page = max(0, min(self.pages - 1, self.page + step))
+        self.build_page()
+        return True
+
+    def get_slot_info(self, slot, index=None):
+        if self.game.save_writer.is_pending(self.game.slot_path(slot)):
+            return "Saving..."
+        if slot in self.game.deleting_slots:
+            return "Deleting..."
+        if index is None:
+            index = self.game.slot_index.snapshot()
+        if slot not in index:
             return "Empty"
+        info = index[slot]
+        if info is None:
+            return "Corrupted"
+        puzzle = info.get("name") or "Unknown"
+        diff = info.get("difficulty") or "Unknown"
+        save_time = info.get("save_time")
+        try:
+            if save_time and isinstance(save_time, (int, float)):
+                dt = datetime.datetime.fromtimestamp(float(save_time))
+                date_str = dt.strftime("%m/%d %H:%M")
+            else:
+                date_str = "Unknown"
+        except (ValueError, TypeError, OSError):
+            date_str = "Unknown"
+        info_text = f"{puzzle} {diff} {date_str}"
+        if info.get("completed"):
+            info_text += " (Completed)"
+        return info_text
 
     def draw(self, screen):
         # overlay
@@ -143,7 +165,7 @@ class SaveLoadDialog:
         pygame.draw.rect(screen, DARK_GRAY, self.rect, 3, border_radius=10)
         # title
         title_text = "Save Progress" if self.mode == "save" else "Load Progress"
-        title = self.title_font.render(title_text, True, BLACK)
+        title = render_text(self.title_font, title_text, BLACK)
         screen.blit(title, title.get_rect(midtop=(self.rect.centerx, self.rect.y + 12)))
         # slots
         for b in self.slot_buttons:
@@ -152,8 +174,16 @@ class SaveLoadDialog:
         for b in self.delete_buttons:
             if b:
                 b.draw(screen)
-        # back
+        # back and paging
         self.back_button.draw(screen)
+        if self.pages > 1:
+            self.prev_button.draw(screen); self.next_button.draw(screen)
+            page = render_text(self.label_font, f"Page {self.page + 1}/{self.pages}", DARK_GRAY)
+            screen.blit(page, page.get_rect(topright=(self.rect.right - 20, self.rect.y + 18)))
+
+    def render_key(self):
+        buttons = self.slot_buttons + [b for b in self.delete_buttons if b] + [self.back_button, self.prev_button, self.next_button]
+        return tuple(button_key(b) for b in buttons)
 
     def handle_events(self, event, mouse_pos):
         for b in self.slot_buttons:
@@ -166,18 +196,17 @@ class SaveLoadDialog:
                 b.check_hover(mouse_pos)
                 if b.handle_event(event):
                     return True
-        self.back_button.check_hover(mouse_pos)
-        if self.back_button.handle_event(event):
-            return True
+        for b in (self.back_button, self.prev_button, self.next_button):
+            b.check_hover(mouse_pos)
+            if b.enabled and b.handle_event(event):
+                return True
         return False
 
     def select_slot(self, slot):
         if self.mode == "save":
+            # the game reports the result once the background write finishes
             success = self.game.save_progress(slot)
             if success:
-                self.game.show_alert(f"[SUCCESS] Progress saved to slot {slot}!", GREEN)
-                if self.game.sound_success:
-                    self.game.sound_success.play()
                 self.close()
             else:
                 self.game.show_alert(f"[ERROR] Failed to save to slot {slot}", RED)
@@ -185,8 +214,8 @@ class SaveLoadDialog:
                     self.game.sound_error.play()
                 return  # stay in dialog
         elif self.mode == "load":
-            path = os.path.join(self.game.progress_dir, f"slot{slot}.json")
-            if not os.path.exists(path):
+            path = self.game.slot_path(slot)
+            if slot in self.game.deleting_slots or (not existing_save(path) and not self.game.save_writer.is_pending(path)):
                 self.game.show_alert(f"[ERROR] No save in slot {slot}", RED)
                 if self.game.sound_error:
                     self.game.sound_error.play()
@@ -202,20 +231,9 @@ class SaveLoadDialog:
                 self.close()
 
     def delete_slot(self, slot):
-        path = os.path.join(self.game.progress_dir, f"slot{slot}.json")
-        if os.path.exists(path):
-            try:
-                os.remove(path)
-                self.game.show_alert(f"[SUCCESS] Slot {slot} deleted!", GREEN)
-                if self.game.sound_success:
-                    self.game.sound_success.play()
-                # Refresh the slot button text
-                info = self.get_slot_info(slot)
-                self.slot_buttons[slot-1].text = f"Slot {slot}: {info}"
-            except Exception as e:
-                self.game.show_alert(f"[ERROR] Failed to delete slot {slot}: {e}", RED)
-                if self.game.sound_error:
-                    self.game.sound_error.play()
+        # the game reports the result once the save thread has removed the files
+        if self.game.delete_slot(slot):
+            self.slot_buttons[(slot - 1) % SLOTS_PER_PAGE].text = f"Slot {slot}: {self.get_slot_info(slot)}"
         else:
             self.game.show_alert(f"[ERROR] No save in slot {slot}", RED)
             if self.game.sound_error:
@@ -235,8 +253,8 @@ class Dialog:
         button_y = self.rect.y + self.height - btn_h - 20
         self.yes_button = Button(self.rect.x + (self.width//2) - btn_w - btn_margin//2, button_y, btn_w, btn_h, "Yes", GREEN, (100,255,100), self.yes_action, 22)
         self.no_button = Button(self.rect.x + (self.width//2) + btn_margin//2, button_y, btn_w, btn_h, "No", RED, (255,100,100), self.no_action, 22)
-        self.title_font = pygame.font.SysFont("Arial", 28, bold=True)
-        self.message_font = pygame.font.SysFont("Arial", 20)
+        self.title_font = get_font(28, bold=True)
+        self.message_font = get_font(20)
 
     def __init__(self, title, message, yes_action, no_action, width=400, height=200):
         self.title = title
@@ -250,20 +268,23 @@ class Dialog:
         button_y = self.rect.y + self.height - btn_h - 20
         self.yes_button = Button(self.rect.x + (self.width//2) - btn_w - btn_margin//2, button_y, btn_w, btn_h, "Yes", GREEN, (100,255,100), self.yes_action, 22)
         self.no_button = Button(self.rect.x + (self.width//2) + btn_margin//2, button_y, btn_w, btn_h, "No", RED, (255,100,100), self.no_action, 22)
-        self.title_font = pygame.font.SysFont("Arial", 28, bold=True)
-        self.message_font = pygame.font.SysFont("Arial", 20)
+        self.title_font = get_font(28, bold=True)
+        self.message_font = get_font(20)
 
     def draw(self, screen):
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         overlay.fill(OVERLAY_BG); screen.blit(overlay, (0,0))
         pygame.draw.rect(screen, WHITE, self.rect, border_radius=10)
         pygame.draw.rect(screen, DARK_GRAY, self.rect, 3, border_radius=10)
-        title = self.title_font.render(self.title, True, BLACK)
+        title = render_text(self.title_font, self.title, BLACK)
         screen.blit(title, title.get_rect(midtop=(self.rect.centerx, self.rect.y+12)))
-        msg = self.message_font.render(self.message, True, DARK_GRAY)
+        msg = render_text(self.message_font, self.message, DARK_GRAY)
         screen.blit(msg, msg.get_rect(center=(self.rect.centerx, self.rect.centery-20)))
         self.yes_button.draw(screen); self.no_button.draw(screen)
 
+    def render_key(self):
+        return (button_key(self.yes_button), button_key(self.no_button))
+
     def handle_events(self, event, mouse_pos):
         self.yes_button.check_hover(mouse_pos); self.no_button.check_hover(mouse_pos)
         if self.yes_button.handle_event(event): return True
@@ -0,0 +1,281 @@
+import random
+import time
+from .conflicts import ConflictIndex
+from .constants import GREEN, HINT_LIMITS, RED
+from .geometry import STANDARD, geometry_of
+from .variants import dump_constraints, load_constraints, make_rules, plain_rules
+
+DEFAULT_INSTRUCTIONS = "Click on a cell to select it, then press a number key to fill it"
+CHECK_INSTRUCTIONS = "Only incorrect (red) cells can be modified"
+# history entries are (r, c, old value, peers whose mark was cleared) for a digit, or
+# (r, c, MARK, toggled marks) for a pencil-mark edit
+MARK = "m"
+
+
+class SudokuEngine:
+    # All game state and rules, with no pygame dependency: the board, move history,
+    # hints, solution checking and the timer. SudokuGame is a view over one of these,
+    # and simulations can drive it directly. clock is injectable for replay and tests.
+    # journal, if set, is told about every new game and every move (see journal.MoveJournal).
+    # marks[r][c] holds the player's pencil marks as a bitmask (bit d-1 for digit d); they
+    # are shown only while the cell is empty. geo is the board's shape (see geometry) and rules
+    # its variant constraints on top (see variants); both follow whatever puzzle was loaded last.
+    def __init__(self, clock=time.time, journal=None):
+        self.clock = clock; self.journal = journal
+        self.puzzle = None; self.original_puzzle = None; self.solution = None
+        self.current_puzzle_name = None; self.current_difficulty = "normal"; self.hints_remaining = 0
+        self.selected_cell = None; self.history = []; self.conflicts = ConflictIndex(); self.last_hint = None
+        self.geo = STANDARD; self.rules = plain_rules(STANDARD); self.marks = [[0] * 9 for _ in range(9)]
+        self.solution_check_mode = False; self.cell_colors = {}; self.editable_cells = set()
+        self.puzzle_completed = False
+        self.instructions = DEFAULT_INSTRUCTIONS
+        self.start_time = None; self.timer_paused = False; self.paused_time = 0
+
+    # puzzle setup
+    def load_puzzle(self, puzzle_name, difficulty, producer=None, size=9, variant=None):
+        # take a pre-built puzzle from the bank or the producer queue; generate inline
+        # only when neither has one ready (always, for boards other than 9x9 and for
+        # variants, a kind from variants.VARIANTS). The puzzle modules are imported on first
+        # use so the menu can come up without them.
+        from .bank import get_bank
+        from .generator import generate_puzzle, generate_variant
+        # the bank and the producer only hold classic 9x9 puzzles
+        bank = get_bank() if size == 9 and not variant else None
+        constraints = ()
+        if variant:
+            puzzle, solution, constraints = generate_variant(variant, difficulty, size=size)
+        elif bank and bank.count(difficulty):
+            puzzle, solution = bank.fetch(difficulty, bank.random_index(difficulty))
+        else:
+            ready = producer.pop(difficulty) if producer and size == 9 else None
+            puzzle, solution = ready or generate_puzzle(difficulty, size=size)
+        self.new_game(puzzle, solution, puzzle_name, difficulty, constraints=constraints)
+
+    def load_generated(self, puzzle_name, difficulty, generated):
+        # a board from PuzzleProducer.generate: (puzzle, solution, constraints)
+        puzzle, solution, constraints = generated
+        self.new_game(puzzle, solution, puzzle_name, difficulty, constraints=constraints)
+
+    def new_game(self, puzzle, solution, puzzle_name=None, difficulty=None, start_time=None, constraints=()):
+        self.puzzle = [row[:] for row in puzzle]
+        self.original_puzzle = [row[:] for row in puzzle]
+        self.geo = geometry_of(puzzle); n = self.geo.size
+        self.rules = make_rules(self.geo, constraints)
+        self.conflicts = ConflictIndex(self.puzzle, self.rules)
+        self.solution = solution
+        self.current_puzzle_name = puzzle_name if puzzle_name is not None else self.current_puzzle_name
+        self.current_difficulty = difficulty or self.current_difficulty
+        self.hints_remaining = HINT_LIMITS.get(self.current_difficulty, 5)
+        self.selected_cell = None; self.history = []; self.solution_check_mode = False
+        self.marks = [[0] * n for _ in range(n)]
+        self.cell_colors = {}; self.editable_cells = set(); self.puzzle_completed = False
+        self.instructions = DEFAULT_INSTRUCTIONS
+        self.start_time = start_time or self.clock(); self.paused_time = 0
+        if self.journal: self.journal.start(self.to_dict())
+
+    def reset(self):
+        # a fresh set of holes over the same solution and constraints; the timer keeps running
+        from .generator import difficulty_levels
+        from .puzzles import randomize_puzzle
+        rules = self.rules
+        self.new_game(randomize_puzzle(self.solution, self.current_difficulty, difficulty_levels(rules), rules=rules), self.solution,
+                      start_time=self.start_time, constraints=rules.constraints)
+
+    # queries
+    def is_full(self):
+        return self.conflicts.is_full()
+
+    def is_solved(self):
+        # full and free of repeats; puzzles have one solution, so this is the stored one
+        return self.conflicts.is_solved()
+
+    def has_conflict(self, r, c):
+        return self.conflicts.conflicts(r, c, self.puzzle[r][c])
+
+    def can_select(self, r, c):
+        if self.solution_check_mode:
+            return (r,c) in self.editable_cells
+        return self.original_puzzle[r][c] == '.'
+
+    def can_edit(self, r, c):
+        return self.can_select(r, c)
+
+    def elapsed(self):
+        if not self.start_time:
+            return 0
+        return int(self.clock() - self.start_time - self.paused_time)
+
+    # moves
+    def _place(self, r, c, value):
+        # write value and take it out of the pencil marks of the cell's peers, remembering
+        # which ones lost it so undo can put them back
+        cleared = 0
+        if value != '.':
+            n = self.geo.size; bit = 1 << (self.geo.value(value) - 1); marks = self.marks
+            for p in self.rules.peers[r * n + c]:
+                if marks[p // n][p % n] & bit:
+                    marks[p // n][p % n] &= ~bit; cleared |= 1 << p
+        self.history.append((r,c,self.puzzle[r][c],cleared)); self.conflicts.update(r, c, self.puzzle[r][c], value)
+        self.puzzle[r][c] = value
+
+    def set_cell(self, r, c, value):
+        # value is a digit symbol ('1'-'9' on a 9x9 board) or '.' to clear; False if the cell is not editable
+        if not self.can_edit(r, c):
+            return False
+        self._place(r, c, value)
+        if self.journal: self.journal.record_set(r, c, value)
+        if self.solution_check_mode:
+            if value == '.':
+                self.cell_colors[(r,c)] = None
+            elif value == self.solution[r][c]:
+                self.cell_colors[(r,c)] = GREEN
+                self.editable_cells.discard((r,c))
+            else:
+                self.cell_colors[(r,c)] = RED
+        return True
+
+    def clear_cell(self, r, c):
+        return self.set_cell(r, c, '.')
+
+    def toggle_marks(self, r, c, mask):
+        # flip the pencil marks in mask on an empty editable cell; False if that is not one
+        if not mask or not self.can_edit(r, c) or self.puzzle[r][c] != '.':
+            return False
+        self.history.append((r,c,MARK,mask))
+        self.marks[r][c] ^= mask
+        if self.journal: self.journal.record_marks(r, c, mask)
+        return True
+
+    def check_completion(self):
+        # True exactly once: the first time the board is filled in without any repeats
+        if not self.puzzle_completed and self.is_solved():
+            self.puzzle_completed = True
+            return True
+        return False
+
+    def undo(self):
+        # returns the restored (r, c, value), or None with nothing to undo
+        if not self.history:
+            return None
+        r,c,val,extra = self.history.pop()
+        if self.journal: self.journal.record_undo()
+        self.selected_cell = (r,c)
+        if val == MARK:
+            self.marks[r][c] ^= extra
+            return (r,c,self.puzzle[r][c])
+        if extra:
+            n = self.geo.size; bit = 1 << (self.geo.value(self.puzzle[r][c]) - 1)
+            for p in range(self.geo.cells):
+                if extra >> p & 1: self.marks[p // n][p % n] |= bit
+        self.conflicts.update(r, c, self.puzzle[r][c], val)
+        self.puzzle[r][c] = val
+        if self.solution_check_mode:
+            if val == '.': self.cell_colors[(r,c)] = None
+            elif val == self.solution[r][c]: self.cell_colors[(r,c)] = GREEN
+            else:
+                self.cell_colors[(r,c)] = RED
+                self.editable_cells.add((r,c))
+        return (r,c,val)
+
+    def hint(self, rng=random, cell=None):
+        # fills in the cell the hint engine picks (hints.find_hint; the Hint is kept in
+        # last_hint for its explanation), or the given cell as in journal replay. A wrong
+        # entry is corrected before anything else. Returns (r, c, value), or None if there is
+        # nothing left to fill or no hints remain.
+        if self.hints_remaining <= 0:
+            return None
+        if cell is None:
+            from .hints import find_hint
+            self.last_hint = find_hint(self, rng)
+            if self.last_hint is None:
+                return None
+            cell = self.last_hint.cell
+        r,c = cell
+        if self.puzzle[r][c] == self.solution[r][c]:
+            return None
+        if self.journal: self.journal.record_hint(r, c)
+        self._place(r, c, self.solution[r][c])
+        self.selected_cell = (r,c)
+        self.hints_remaining -= 1
+        if self.solution_check_mode:
+            self.cell_colors[(r,c)] = GREEN
+            self.editable_cells.discard((r,c))
+        return (r,c,self.solution[r][c])
+
+    def check_solution(self):
+        # enter check mode and colour every filled-in cell; returns True if all are correct
+        self.solution_check_mode = True
+        self.editable_cells.clear()
+        if self.journal: self.journal.record_check()
+        # remove colors for empty cells
+        keys_to_remove = [k for k in list(self.cell_colors.keys()) if self.puzzle[k[0]][k[1]] == '.']
+        for k in keys_to_remove: self.cell_colors.pop(k, None)
+        all_correct = True
+        for r in range(self.geo.size):
+            for c in range(self.geo.size):
+                if self.original_puzzle[r][c] == '.' and self.puzzle[r][c] != '.':
+                    if self.puzzle[r][c] == self.solution[r][c]:
+                        self.cell_colors[(r,c)] = GREEN
+                    else:
+                        self.cell_colors[(r,c)] = RED
+                        self.editable_cells.add((r,c))
+                        all_correct = False
+        if all_correct:
+            self.puzzle_completed = True
+        else:
+            self.instructions = CHECK_INSTRUCTIONS
+        return all_correct
+
+    # persistence
+    def to_dict(self):
+        # a snapshot: nothing in it is shared with the live board, so it can be written off-thread
+        return {
+            "current_puzzle_name": self.current_puzzle_name,
+            "current_difficulty": self.current_difficulty,
+            "hints_remaining": self.hints_remaining,
+            "puzzle": [row[:] for row in self.puzzle],
+            "solution": [row[:] for row in self.solution],
+            "original_puzzle": [row[:] for row in self.original_puzzle],
+            "variant": dump_constraints(self.rules.constraints),
+            "start_time": self.start_time,
+            "paused_time": self.paused_time,
+            "history": [list(h) for h in self.history],
+            "pencil_marks": [row[:] for row in self.marks],
+            "selected_cell": list(self.selected_cell) if self.selected_cell else None,
+            "solution_check_mode": self.solution_check_mode,
+            "cell_colors": {str(k): v for k, v in self.cell_colors.items()},
+            "editable_cells": [list(c) for c in self.editable_cells],
+            "puzzle_completed": self.puzzle_completed,
+            "instructions": self.instructions,
+            "save_time": self.clock()
+        }
+
+    def load_dict(self, data):
+        self.current_puzzle_name = data.get("current_puzzle_name")
+        self.current_difficulty = data.get("current_difficulty")
+        self.hints_remaining = data.get("hints_remaining")
+        self.puzzle = data.get("puzzle")
+        self.solution = data.get("solution")
+        self.original_puzzle = data.get("original_puzzle")
+        self.geo = geometry_of(self.puzzle); n = self.geo.size
+        self.rules = make_rules(self.geo, load_constraints(data.get("variant")))
+        self.conflicts = ConflictIndex(self.puzzle, self.rules)
+        self.start_time = data.get("start_time")
+        self.paused_time = data.get("paused_time", 0)
+        # older saves have no marks, and history entries without the cleared peers
+        self.history = [tuple(h) if len(h) == 4 else (*h, 0) for h in data.get("history", [])]
+        self.marks = [list(row) for row in data.get("pencil_marks") or [[0] * n for _ in range(n)]]
+        selected = data.get("selected_cell")
+        self.selected_cell = tuple(selected) if selected else None
+        self.solution_check_mode = data.get("solution_check_mode", False)
+        self.cell_colors = {_parse_cell(k): tuple(v) if v else None for k, v in data.get("cell_colors", {}).items()}
+        self.editable_cells = set(tuple(c) for c in data.get("editable_cells", []))
+        self.puzzle_completed = data.get("puzzle_completed", False)
+        self.instructions = data.get("instructions", DEFAULT_INSTRUCTIONS)
+        if self.journal: self.journal.start(self.to_dict())
+
+
+def _parse_cell(key):
+    # "(r, c)" -> (r, c); saves used to be read back with eval
+    r, c = key.strip("()").split(",")
+    return (int(r), int(c))
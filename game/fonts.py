@@ -0,0 +1,60 @@
+import json
+import os
+import pygame
+from game.constants import FONT_CACHE_PATH
+
+# pygame.font.SysFont scans every installed font the first time it is called in a process
+# (fc-list, the registry or the fonts folder, depending on the platform), and the game used
+# to call it for every button. Here a family is resolved to a font file once, that answer is
+# kept on disk between runs, and Font objects are shared per (size, bold). A family that is
+# not installed is only remembered for the current run, so installing it later takes effect.
+FONT_NAME = "Arial"
+
+_paths = None  # "name:bold" -> font file, or None for pygame's default font
+_fonts = {}
+
+
+def _load_paths():
+    global _paths
+    if _paths is None:
+        try:
+            with open(FONT_CACHE_PATH) as f:
+                # older caches also stored misses as null; scan for those again
+                _paths = {k: v for k, v in json.load(f).items() if v}
+        except (OSError, ValueError, AttributeError):
+            _paths = {}
+    return _paths
+
+
+def font_path(name=FONT_NAME, bold=False):
+    paths = _load_paths()
+    key = f"{name.lower()}:{int(bold)}"
+    path = paths.get(key, "")
+    if path is None or (path and os.path.exists(path)):
+        return path
+    # unknown, or the cached file has gone: do the one system scan and remember the answer
+    path = pygame.font.match_font(name, bold=bold)
+    paths[key] = path
+    if path:
+        try:
+            with open(FONT_CACHE_PATH, "w") as f:
+                json.dump({k: v for k, v in paths.items() if v}, f)
+        except OSError as e:
+            print("Could not write font cache:", e)
+    return path
+
+
+def get_font(size, bold=False, name=FONT_NAME):
+    # drop-in for pygame.font.SysFont(name, size, bold); the same object is returned for
+    # the same arguments, so do not change its style in place
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        path = font_path(name, bold)
+        if bold and path is None:
+            path = font_path(name)  # no bold face installed: embolden the regular one
+        font = pygame.font.Font(path, size)
+        if bold and path == font_path(name):
+            font.set_bold(True)
+        _fonts[key] = font
+    return font
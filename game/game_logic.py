@@ -1,97 +1,105 @@
 import pygame
+import copy
 import random
-from .puzzles import randomize_puzzle
 from .dialogs import SettingsDialog, SaveLoadDialog, Dialog
-from .particles import Particle
+from .particles import ParticleSystem
 from .constants import *
-from .ui_components import Button, ImageButton, sound_click
+from .ui_components import Button, ImageButton
 from .settings import *
-from .sounds import sound_click, sound_success, sound_error, sound_win, background_music_path, music_available
-from .puzzles import initialize_puzzle_files
+from . import sounds
+from .sounds import background_music_path, music_available
+from .engine import SudokuEngine
+from .producer import PuzzleProducer
+from .profiler import FrameProfiler
+from .journal import MoveJournal
+from .saves import SaveWriter, SlotIndex, existing_save, legacy_path, read_save, slot_summary
+from .fonts import get_font
+from .geometry import BOX_SHAPES
+from .variants import VARIANTS
+from .rendering import BoardRenderer, DirtyTracker, button_key, button_rect, render_text
 import os
 import sys
 import time
-import json
+
+PROFILER_RECT = pygame.Rect(5, SCREEN_HEIGHT - 150, 185, 145)
 
 
 class SudokuGame:
-    def __init__(self):
-        pygame.init()
-        pygame.mixer.init()  # Ensure the mixer is initialized
+    def __init__(self, startup_time=None, progress_dir=None):
+        # only what the first frame needs is initialised here; audio comes up on a loader thread
+        pygame.display.init(); pygame.font.init()
+        self.startup_time = startup_time or time.perf_counter()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Sudoku Game")
         self.clock = pygame.time.Clock()
-        self.progress_dir = os.path.join(BASE_DIR, "progress")
+        self.dirty_tracker = DirtyTracker(); self.last_scene = None
+        # F3 toggles the frame-time overlay, F4 dumps the sample ring buffer to CSV;
+        # SUDOKU_PROFILE=1 starts with the overlay shown and SUDOKU_PROFILE_CSV=path dumps on exit
+        self.profiler = FrameProfiler(); self.profiler.visible = os.environ.get("SUDOKU_PROFILE") == "1"
+        self.profiler_lines = []; self.profiler_refresh = 0
+        # saves and the autosave journal; tools and tests point this somewhere disposable
+        self.progress_dir = progress_dir or os.path.join(BASE_DIR, "progress")
         if not os.path.exists(self.progress_dir):
             os.makedirs(self.progress_dir)
-        self.font = pygame.font.SysFont("Arial", 36)
-        self.small_font = pygame.font.SysFont("Arial", 28)
-        self.title_font = pygame.font.SysFont("Arial", 60)
-        self.cell_font = pygame.font.SysFont("Arial", 40)
-
-        # game/puzzle state
-        self.puzzle = None; self.original_puzzle = None; self.solution = None; self.file_path = None
-        self.selected_cell = None; self.history = []
+        self.save_writer = SaveWriter(); self.slot_index = SlotIndex(self.progress_dir)
+        self.deleting_slots = set()  # deletes still queued on the save thread
+        self.journal = MoveJournal(self.progress_dir, self.save_writer)
+        self.font = get_font(36)
+        self.small_font = get_font(28)
+        self.title_font = get_font(60)
+        self.profiler_font = get_font(15)
+        self.board_rules = None  # rules (and so shape) the board layout below was built for; see layout_board
+        self.board_size = 9  # size picked on the difficulty screen for the next new game
+        self.variant = "classic"  # and rules: "classic" or a kind from variants.VARIANTS
+
+        # game/puzzle state lives in the engine; this class only presents it
+        self.engine = SudokuEngine(journal=self.journal)
+        self.pencil_mode = False  # Space or P switches digit keys between digits and pencil marks
+        self.layout_board()
         self.message = ""; self.message_time = 0; self.message_color = BLACK
         self.game_state = "MAIN_MENU"
-        self.current_puzzle_name = None
 
         # alerts
         self.alert_message = ""; self.alert_color = RED; self.alert_time = 0
 
-        # timer
-        self.start_time = None; self.timer_paused = False; self.paused_time = 0
-
         # dialog
         self.current_dialog = None
 
-        # difficulty and hints
-        self.current_difficulty = "normal"; self.hints_remaining = 0
-
-        # sounds & volumes
-        self.sound_click = sound_click; self.sound_success = sound_success
-        self.sound_error = sound_error; self.sound_win = sound_win
-        self.sound_background_path = background_music_path if music_available else None
         # load persisted volumes into game
         settings = load_settings()
         self.bg_volume = settings.get("bg_volume", 1.0)
         self.sfx_volume = settings.get("sfx_volume", 1.0)
 
-        # apply volumes
-        if music_available:
-            try:
-                pygame.mixer.music.set_volume(self.bg_volume)
-            except:
-                pass
+        # sounds & volumes: handles that load in the background and start the music when ready
+        sounds.set_music_volume(self.bg_volume); sounds.init_sounds()
+        self.sound_click = sounds.sound_click; self.sound_success = sounds.sound_success
+        self.sound_error = sounds.sound_error; self.sound_win = sounds.sound_win
+        self.sound_background_path = background_music_path if music_available else None
         for s in (self.sound_click, self.sound_success, self.sound_error, self.sound_win):
             if s:
                 s.set_volume(self.sfx_volume)
 
-        # Start background music if available and not already playing
-        if music_available:
-            try:
-                pygame.mixer.music.load(background_music_path)
-                pygame.mixer.music.set_volume(self.bg_volume)
-                pygame.mixer.music.play(-1)
-            except Exception as e:
-                print("Failed to start background music:", e)
+        # celebration
+        self.particles = ParticleSystem(); self.celebration_active = False; self.celebration_start_time = 0
 
-        # celebration / check mode
-        self.solution_check_mode = False
-        self.cell_colors = {}
-        self.puzzle_completed = False
-        self.particles = []; self.celebration_active = False; self.celebration_start_time = 0
-        self.editable_cells = set()
-        self.instructions = "Click on a cell to select it, then press a number key to fill it"
+        # background puzzle generation (not needed with a puzzle bank); started once the
+        # first frame is up so worker spawning does not delay the menu
+        self.producer = PuzzleProducer()
+        self.pending_puzzle = None  # (future, name, difficulty) of a board generating in a worker; see poll_puzzle
 
         # load resources and UI
-        initialize_puzzle_files()
         self.load_settings_icon()
         self.setup_ui()
+        if self.journal.exists(): self.show_resume_prompt()
 
         if not any((self.sound_click, self.sound_success, self.sound_error, self.sound_win, music_available)):
             self.show_alert("[WARNING] Sound files missing - game will run without sound", YELLOW)
 
+    def start_background_work(self):
+        from .bank import get_bank
+        if not get_bank():
+            self.producer.start()
+
     def load_settings_icon(self):
         self.settings_icon = None
         if os.path.exists(SETTINGS_ICON_PATH):
@@ -128,8 +136,12 @@ class SudokuGame:
             Button(SCREEN_WIDTH//2 - BUTTON_WIDTH//2, difficulty_button_y, BUTTON_WIDTH, BUTTON_HEIGHT, "Beginner", (200,255,200), GREEN, lambda: self.load_puzzle_with_difficulty("beginner")),
             Button(SCREEN_WIDTH//2 - BUTTON_WIDTH//2, difficulty_button_y + BUTTON_HEIGHT + BUTTON_MARGIN, BUTTON_WIDTH, BUTTON_HEIGHT, "Normal", YELLOW, (255,200,0), lambda: self.load_puzzle_with_difficulty("normal")),
             Button(SCREEN_WIDTH//2 - BUTTON_WIDTH//2, difficulty_button_y + 2*(BUTTON_HEIGHT + BUTTON_MARGIN), BUTTON_WIDTH, BUTTON_HEIGHT, "Advanced", (255,150,150), RED, lambda: self.load_puzzle_with_difficulty("advanced")),
-            Button(SCREEN_WIDTH//2 - BUTTON_WIDTH//2, difficulty_button_y + 3*(BUTTON_HEIGHT + BUTTON_MARGIN), BUTTON_WIDTH, BUTTON_HEIGHT, "Back", LIGHT_GRAY, GRAY, self.show_main_menu),
+            Button(SCREEN_WIDTH//2 - BUTTON_WIDTH//2, difficulty_button_y + 5*(BUTTON_HEIGHT + BUTTON_MARGIN), BUTTON_WIDTH, BUTTON_HEIGHT, "Back", LIGHT_GRAY, GRAY, self.show_main_menu),
         ]
+        # board size for the next game: 4x4 up to 25x25; and its rules
+        self.size_button = Button(SCREEN_WIDTH//2 - BUTTON_WIDTH//2, difficulty_button_y + 3*(BUTTON_HEIGHT + BUTTON_MARGIN), BUTTON_WIDTH, BUTTON_HEIGHT, f"Board: {self.board_size}x{self.board_size}", LIGHT_BLUE, BLUE, self.cycle_board_size)
+        self.variant_button = Button(SCREEN_WIDTH//2 - BUTTON_WIDTH//2, difficulty_button_y + 4*(BUTTON_HEIGHT + BUTTON_MARGIN), BUTTON_WIDTH, BUTTON_HEIGHT, f"Rules: {self.variant.title()}", LIGHT_BLUE, BLUE, self.cycle_variant)
+        self.difficulty_buttons[3:3] = [self.size_button, self.variant_button]
 
         # game buttons
         first_row_y = SCREEN_HEIGHT - 2*(BUTTON_HEIGHT + BUTTON_ROW_MARGIN)
@@ -156,53 +168,111 @@ class SudokuGame:
             # fallback text button with animation enabled
             self.settings_button = Button(settings_x, settings_y, 120, 36, "Settings", LIGHT_GRAY, GRAY, self.open_settings, font_size=20, animated=True)
 
+    def layout_board(self):
+        # size the grid, its fonts and its renderer to the engine's board; the board keeps
+        # to the GRID_SIZE square, so cells shrink as boards grow. Variant markings are part
+        # of the renderer, so a change of rules rebuilds it too.
+        rules = self.engine.rules; geo = rules.geo
+        if rules is self.board_rules:
+            return
+        self.board_rules = rules
+        self.cell_size = GRID_SIZE // geo.size
+        size = self.cell_size * geo.size
+        self.grid_rect = pygame.Rect((SCREEN_WIDTH - size) // 2, GRID_OFFSET_Y + (GRID_SIZE - size) // 2, size, size)
+        self.cell_font = get_font(self.cell_size * 4 // 5)
+        self.mark_font = get_font(max(6, self.cell_size // max(geo.box_rows, geo.box_cols)))
+        self.board_renderer = BoardRenderer(self.cell_font, self.grid_rect.x, self.grid_rect.y, size, self.cell_size, self.mark_font, rules)
+        self.dirty_tracker.forget("cell"); self.dirty_tracker.invalidate()
+
+    def cycle_board_size(self):
+        sizes = list(BOX_SHAPES)
+        self.board_size = sizes[(sizes.index(self.board_size) + 1) % len(sizes)]
+        self.size_button.text = f"Board: {self.board_size}x{self.board_size}"
+        if self.board_size > 9 and self.variant != "classic":
+            self.cycle_variant("classic")
+        return True
+
+    def cycle_variant(self, variant=None):
+        # variants are dug with a full uniqueness search, which is only quick enough up to 9x9
+        kinds = ["classic"] + list(VARIANTS)
+        self.variant = variant or kinds[(kinds.index(self.variant) + 1) % len(kinds)]
+        self.variant_button.text = f"Rules: {self.variant.title()}"
+        if self.variant != "classic" and self.board_size > 9:
+            self.board_size = 9; self.size_button.text = "Board: 9x9"
+        return True
+
     # helper: update hint button text
     def update_hint_button_text(self):
-        self.hint_button.text = f"Hint ({self.hints_remaining})"
-        self.hint_button.enabled = self.hints_remaining > 0
+        self.hint_button.text = f"Hint ({self.engine.hints_remaining})"
+        self.hint_button.enabled = self.engine.hints_remaining > 0
+
+    def start_celebration(self, message):
+        self.celebration_active = True; self.celebration_start_time = time.time()
+        self.journal.discard()  # nothing left to resume
+        self.particles.clear(); self.particles.emit(100, (0, SCREEN_WIDTH), (0, SCREEN_HEIGHT//2))
+        if self.sound_win: self.sound_win.play()
+        self.show_alert(message, GREEN)
+        for b in self.game_buttons:
+            if b.text not in ["Main Menu", "Save Progress"]:
+                b.enabled = False
 
     # flow control
     def select_difficulty(self, puzzle_name):
-        self.current_puzzle_name = puzzle_name
+        self.engine.current_puzzle_name = puzzle_name
         self.game_state = "DIFFICULTY_SELECT"
         return True
 
     def load_puzzle_with_difficulty(self, difficulty):
-        self.current_difficulty = difficulty
-        self.hints_remaining = HINT_LIMITS.get(difficulty, 5)
-        return self.load_puzzle_action(self.current_puzzle_name)
+        self.engine.current_difficulty = difficulty
+        return self.load_puzzle_action(self.engine.current_puzzle_name)
 
     def load_puzzle_action(self, puzzle_name):
+        if self.pending_puzzle:
+            return True  # one board at a time
         try:
-            solution_path = os.path.join(PUZZLE_DIR, puzzle_name + "S.txt")
-            if not os.path.exists(solution_path):
-                self.show_alert("[ERROR] No solution file found", RED)
-                if self.sound_error:
-                    self.sound_error.play()
+            variant = self.variant if self.variant != "classic" else None
+            difficulty = self.engine.current_difficulty
+            if self.board_size >= 16:
+                # these take seconds to generate, so a worker does it while the menu keeps
+                # running; poll_puzzle starts the game once it is ready
+                self.pending_puzzle = (self.producer.generate(difficulty, self.board_size, variant), puzzle_name, difficulty)
+                self.show_alert(f"Generating a {self.board_size}x{self.board_size} puzzle...", BLUE)
                 return True
-            with open(solution_path, 'r') as f:
-                self.solution = [list(line.strip()) for line in f.readlines()]
-            self.puzzle = randomize_puzzle(self.solution, self.current_difficulty, DIFFICULTY_LEVELS)
-            self.original_puzzle = [row[:] for row in self.puzzle]
-            self.file_path = os.path.join(PUZZLE_DIR, puzzle_name + ".txt")
-            self.selected_cell = None; self.history = []; self.solution_check_mode = False
-            self.cell_colors = {}; self.puzzle_completed = False; self.celebration_active = False
-            self.editable_cells = set(); self.instructions = "Click on a cell to select it, then press a number key to fill it"
-            for b in self.game_buttons:
-                b.enabled = True
-            self.update_hint_button_text()
-            self.show_alert(f"[SUCCESS] Loaded {puzzle_name} ({self.current_difficulty}) successfully!", GREEN)
-            if self.sound_success:
-                self.sound_success.play()
-            self.game_state = "GAME"
-            self.start_time = time.time()
+            self.engine.load_puzzle(puzzle_name, difficulty, self.producer, self.board_size, variant)
+            self.puzzle_loaded(puzzle_name)
         except Exception as e:
-            print("Error loading puzzle:", e)
-            self.show_alert("[ERROR] Failed to load puzzle", RED)
-            if self.sound_error:
-                self.sound_error.play()
+            self.puzzle_failed(e)
         return True
 
+    def poll_puzzle(self):
+        if not self.pending_puzzle or not self.pending_puzzle[0].done():
+            return
+        future, puzzle_name, difficulty = self.pending_puzzle
+        self.pending_puzzle = None
+        if future.cancelled() or self.game_state != "DIFFICULTY_SELECT":
+            return  # shut down, or the player went elsewhere in the meantime
+        try:
+            self.engine.load_generated(puzzle_name, difficulty, future.result())
+            self.puzzle_loaded(puzzle_name)
+        except Exception as e:
+            self.puzzle_failed(e)
+
+    def puzzle_loaded(self, puzzle_name):
+        self.celebration_active = False
+        for b in self.game_buttons:
+            b.enabled = True
+        self.update_hint_button_text()
+        self.show_alert(f"[SUCCESS] Loaded {puzzle_name} ({self.engine.current_difficulty}) successfully!", GREEN)
+        if self.sound_success:
+            self.sound_success.play()
+        self.game_state = "GAME"
+
+    def puzzle_failed(self, error):
+        print("Error loading puzzle:", error)
+        self.show_alert("[ERROR] Failed to load puzzle", RED)
+        if self.sound_error:
+            self.sound_error.play()
+
     def show_main_menu(self):
         self.game_state = "MAIN_MENU"
         return True
@@ -210,6 +280,9 @@ class SudokuGame:
     def exit_game(self):
         # ensure settings saved before exit
         save_settings({"bg_volume": self.bg_volume, "sfx_volume": self.sfx_volume})
+        self.journal.close(self.engine)
+        self.save_writer.close()
+        self.producer.shutdown()
         pygame.quit()
         sys.exit()
 
@@ -220,10 +293,38 @@ class SudokuGame:
         self.game_state = "DIALOG"
         return True
 
+    def show_resume_prompt(self):
+        self.current_dialog = Dialog("Resume Game", "Continue your unfinished game?", self.resume_autosave, self.discard_autosave)
+        self.dialog_parent_state = self.game_state
+        self.game_state = "DIALOG"
+        return True
+
+    def resume_autosave(self):
+        self.cancel_dialog()
+        try:
+            replayed = self.journal.recover(self.engine)
+        except Exception as e:
+            self.show_alert(f"[ERROR] Could not restore the last game: {e}", RED)
+            if self.sound_error: self.sound_error.play()
+            self.journal.discard()
+            return False
+        # fold the replayed moves into a new snapshot
+        self.journal.start(self.engine.to_dict())
+        self.celebration_active = False
+        for b in self.game_buttons:
+            b.enabled = not self.engine.puzzle_completed or b.text in ["Main Menu", "Save Progress"]
+        self.update_hint_button_text()
+        self.show_alert(f"[SUCCESS] Game restored ({replayed} moves replayed)", GREEN)
+        self.game_state = "GAME"
+        return True
+
+    def discard_autosave(self):
+        self.journal.discard()
+        return self.cancel_dialog()
+
     def check_solution_button(self):
         # ensure puzzle complete
-        has_empty = any(self.puzzle[r][c] == '.' for r in range(9) for c in range(9))
-        if has_empty:
+        if not self.engine.is_full():
             self.show_alert("[ERROR] Please complete the puzzle before checking", RED)
             if self.sound_error: self.sound_error.play()
         else:
@@ -240,20 +341,16 @@ class SudokuGame:
         return True
 
     def reset_puzzle(self):
-        if not self.solution:
+        if not self.engine.solution:
             self.show_alert("[ERROR] No solution available", RED)
             if self.sound_error: self.sound_error.play()
             return False
         try:
-            self.puzzle = randomize_puzzle(self.solution, self.current_difficulty, DIFFICULTY_LEVELS)
-            self.original_puzzle = [row[:] for row in self.puzzle]
-            self.hints_remaining = HINT_LIMITS.get(self.current_difficulty, 5)
-            self.history = []; self.selected_cell = None; self.solution_check_mode = False
-            self.cell_colors = {}; self.puzzle_completed = False; self.celebration_active = False; self.editable_cells = set()
-            self.instructions = "Click on a cell to select it, then press a number key to fill it"
+            self.engine.reset()
+            self.celebration_active = False
             for b in self.game_buttons: b.enabled = True
             self.update_hint_button_text()
-            self.show_alert(f"[SUCCESS] Puzzle reset ({self.current_difficulty} mode)", GREEN)
+            self.show_alert(f"[SUCCESS] Puzzle reset ({self.engine.current_difficulty} mode)", GREEN)
             if self.sound_success: self.sound_success.play()
             self.current_dialog = None
             prev = getattr(self, "dialog_parent_state", "GAME")
@@ -269,117 +366,112 @@ class SudokuGame:
             return False
 
     def provide_hint(self):
-        if not self.puzzle or not self.solution:
+        if not self.engine.puzzle or not self.engine.solution:
             self.show_alert("[ERROR] No puzzle or solution loaded", RED)
             if self.sound_error: self.sound_error.play()
             return False
-        if self.hints_remaining <= 0:
+        if self.engine.hints_remaining <= 0:
             self.show_alert("[ERROR] No hints remaining!", RED)
             if self.sound_error: self.sound_error.play()
             return False
-        empty_cells = [(r,c) for r in range(9) for c in range(9) if self.puzzle[r][c] == '.']
-        if not empty_cells:
+        if self.engine.is_full():
             self.show_alert("[SUCCESS] Puzzle is already complete!", GREEN)
             if self.sound_success: self.sound_success.play()
             return False
-        r,c = random.choice(empty_cells)
-        self.history.append((r,c,self.puzzle[r][c]))
-        self.puzzle[r][c] = self.solution[r][c]
-        self.selected_cell = (r,c)
-        self.hints_remaining -= 1
+        r,c,value = self.engine.hint()
         self.update_hint_button_text()
-        if self.solution_check_mode:
-            self.cell_colors[(r,c)] = GREEN
-        # File is read-only, no writing
-        self.show_alert(f"[WARNING] Hint: Row {r+1}, Column {c+1} is {self.solution[r][c]}", BLUE)
+        self.show_alert(f"[WARNING] Hint: Row {r+1}, Column {c+1} is {value} ({self.engine.last_hint.technique})", BLUE)
+        # the reasoning replaces the instructions under the board for a while
+        self.message = self.engine.last_hint.explanation(); self.message_color = BLUE; self.message_time = time.time()
+        if self.engine.check_completion():
+            self.start_celebration("[SUCCESS] Congratulations! Puzzle solved correctly!")
         return True
 
     def undo_move(self):
-        if not self.history:
+        if not self.engine.undo():
             self.show_alert("[ERROR] Unable to undo - no moves to undo", RED)
             if self.sound_error: self.sound_error.play()
             return False
-        r,c,val = self.history.pop()
-        self.puzzle[r][c] = val
-        self.selected_cell = (r,c)
-        if self.solution_check_mode:
-            if val == '.': self.cell_colors[(r,c)] = None
-            elif val == self.solution[r][c]: self.cell_colors[(r,c)] = GREEN
-            else:
-                self.cell_colors[(r,c)] = RED
-                self.editable_cells.add((r,c))
-        # File is read-only, no writing
         self.show_alert("[SUCCESS] Undo successful", GREEN)
         if self.sound_success: self.sound_success.play()
         return True
 
     def save_progress(self, slot=None):
-        if not self.puzzle or not self.solution:
+        if not self.engine.puzzle or not self.engine.solution:
             self.show_alert("[ERROR] No puzzle to save", RED)
             if self.sound_error: self.sound_error.play()
             return False
-        try:
-            data = {
-                "current_puzzle_name": self.current_puzzle_name,
-                "current_difficulty": self.current_difficulty,
-                "hints_remaining": self.hints_remaining,
-                "puzzle": self.puzzle,
-                "solution": self.solution,
-                "original_puzzle": self.original_puzzle,
-                "start_time": self.start_time,
-                "paused_time": self.paused_time,
-                "history": [list(h) for h in self.history],
-                "selected_cell": self.selected_cell,
-                "solution_check_mode": self.solution_check_mode,
-                "cell_colors": {str(k): v for k, v in self.cell_colors.items()},
-                "editable_cells": list(self.editable_cells),
-                "puzzle_completed": self.puzzle_completed,
-                "instructions": self.instructions,
-                "save_time": time.time()
-            }
-            progress_file = os.path.join(self.progress_dir, f"slot{slot}.json" if slot else "progress.json")
-            with open(progress_file, 'w') as f:
-                json.dump(data, f)
-            slot_msg = f" to slot {slot}" if slot else ""
-            self.show_alert(f"[SUCCESS] Progress saved{slot_msg}!", GREEN)
+        # the write happens on the save thread; poll_saves reports how it went
+        data = self.engine.to_dict(); path = self.slot_path(slot)
+        self.deleting_slots.discard(slot)  # queued after the delete, so this save is what stays
+        self.save_writer.submit(path, data, slot, lambda payload: self.after_save(slot, path, data))
+        return True
+
+    def after_save(self, slot, path, data):
+        # runs on the save thread: drop the slot's pre-binary JSON file and update the index
+        if os.path.exists(legacy_path(path)): os.remove(legacy_path(path))
+        if slot: self.slot_index.update(slot, slot_summary(data))
+
+    def delete_slot(self, slot):
+        # the files go on the save thread, behind any write to the slot still queued there (which
+        # would otherwise recreate them); poll_saves reports how it went
+        path = self.slot_path(slot)
+        if slot in self.deleting_slots: return True
+        if not existing_save(path) and not self.save_writer.is_pending(path): return False
+        self.deleting_slots.add(slot)
+        self.save_writer.call(lambda: self.remove_slot(slot, path), ("delete", slot))
+        return True
+
+    def remove_slot(self, slot, path):
+        # runs on the save thread
+        for p in (path, legacy_path(path)):
+            if os.path.exists(p): os.remove(p)
+        self.slot_index.remove(slot)
+
+    def poll_saves(self):
+        for slot, error in self.save_writer.poll():
+            if slot == "autosave":
+                if error is not None: print("Autosave failed:", error)
+            elif isinstance(slot, tuple):
+                self.slot_deleted(slot[1], error)
+            elif error is None:
+                slot_msg = f" to slot {slot}" if slot else ""
+                self.show_alert(f"[SUCCESS] Progress saved{slot_msg}!", GREEN)
+                if self.sound_success: self.sound_success.play()
+            else:
+                slot_msg = f" to slot {slot}" if slot else " progress"
+                self.show_alert(f"[ERROR] Failed to save{slot_msg}: {error}", RED)
+                if self.sound_error: self.sound_error.play()
+
+    def slot_deleted(self, slot, error):
+        self.deleting_slots.discard(slot)
+        if error is None:
+            self.show_alert(f"[SUCCESS] Slot {slot} deleted!", GREEN)
             if self.sound_success: self.sound_success.play()
-            return True
-        except Exception as e:
-            slot_msg = f" to slot {slot}" if slot else " progress"
-            self.show_alert(f"[ERROR] Failed to save{slot_msg}: {e}", RED)
+        else:
+            self.show_alert(f"[ERROR] Failed to delete slot {slot}: {error}", RED)
             if self.sound_error: self.sound_error.play()
-            return False
+        if isinstance(self.current_dialog, SaveLoadDialog): self.current_dialog.build_page()
+
+    def slot_path(self, slot=None):
+        return os.path.join(self.progress_dir, f"slot{slot}.sav" if slot else "progress.sav")
 
     def load_progress(self, slot=None):
-        progress_file = os.path.join(self.progress_dir, f"slot{slot}.json" if slot else "progress.json")
-        if not os.path.exists(progress_file):
+        # a slot whose write is still queued loads from the data being written rather than
+        # waiting on the disk; copied, since the save thread may still be encoding it
+        data = None if slot in self.deleting_slots else self.save_writer.queued(self.slot_path(slot))
+        progress_file = None if data is not None or slot in self.deleting_slots else existing_save(self.slot_path(slot))
+        if data is None and not progress_file:
             slot_msg = f" in slot {slot}" if slot else ""
             self.show_alert(f"[ERROR] No saved progress found{slot_msg}", RED)
             if self.sound_error: self.sound_error.play()
             return False
         try:
-            with open(progress_file, 'r') as f:
-                data = json.load(f)
-            self.current_puzzle_name = data.get("current_puzzle_name")
-            self.current_difficulty = data.get("current_difficulty")
-            self.hints_remaining = data.get("hints_remaining")
-            self.puzzle = data.get("puzzle")
-            self.solution = data.get("solution")
-            self.original_puzzle = data.get("original_puzzle")
-            self.start_time = data.get("start_time")
-            self.paused_time = data.get("paused_time", 0)
-            self.history = [tuple(h) for h in data.get("history", [])]
-            self.selected_cell = data.get("selected_cell")
-            self.solution_check_mode = data.get("solution_check_mode", False)
-            self.cell_colors = {eval(k): tuple(v) for k, v in data.get("cell_colors", {}).items()}
-            self.editable_cells = set(data.get("editable_cells", []))
-            self.puzzle_completed = data.get("puzzle_completed", False)
-            self.instructions = data.get("instructions", "Click on a cell to select it, then press a number key to fill it")
-            self.file_path = os.path.join(PUZZLE_DIR, self.current_puzzle_name + ".txt") if self.current_puzzle_name else None
+            self.engine.load_dict(copy.deepcopy(data) if data is not None else read_save(progress_file))
             self.celebration_active = False
-            self.particles = []
+            self.particles.clear()
             for b in self.game_buttons:
-                b.enabled = not self.puzzle_completed or b.text in ["Main Menu", "Save Progress"]
+                b.enabled = not self.engine.puzzle_completed or b.text in ["Main Menu", "Save Progress"]
             self.update_hint_button_text()
             slot_msg = f" slot {slot}" if slot else ""
             self.show_alert(f"[SUCCESS] Progress loaded from{slot_msg}!", GREEN)
@@ -395,11 +487,8 @@ class SudokuGame:
     def update_celebration(self):
         if not self.celebration_active: return
         if random.random() < 0.1:
-            for _ in range(5):
-                self.particles.append(Particle(random.randint(0, SCREEN_WIDTH), random.randint(SCREEN_HEIGHT-50, SCREEN_HEIGHT)))
-        for p in self.particles[:]:
-            p.update()
-            if p.life <= 0: self.particles.remove(p)
+            self.particles.emit(5, (0, SCREEN_WIDTH), (SCREEN_HEIGHT-50, SCREEN_HEIGHT))
+        self.particles.update()
         if time.time() - self.celebration_start_time > 10:
             self.celebration_active = False
 
@@ -408,7 +497,7 @@ class SudokuGame:
 
     def draw_alert(self):
         if self.alert_message and time.time() - self.alert_time < 3:
-            t = self.small_font.render(self.alert_message, True, self.alert_color)
+            t = render_text(self.small_font, self.alert_message, self.alert_color)
             rect = t.get_rect(topright=(SCREEN_WIDTH-20, 20))
             bg = pygame.Rect(rect.left - 15, rect.top - 10, rect.width + 30, rect.height + 20)
             surf = pygame.Surface((bg.width, bg.height), pygame.SRCALPHA)
@@ -417,9 +506,9 @@ class SudokuGame:
             self.screen.blit(t, rect)
 
     def draw_timer(self):
-        if self.start_time and not self.timer_paused:
-            elapsed = int(time.time() - self.start_time - self.paused_time)
-            timer_text = self.small_font.render(f"Time: {elapsed//60}:{elapsed%60:02}", True, BLACK)
+        if self.engine.start_time and not self.engine.timer_paused:
+            elapsed = self.engine.elapsed()
+            timer_text = render_text(self.small_font, f"Time: {elapsed//60}:{elapsed%60:02}", BLACK)
             timer_rect = timer_text.get_rect(topleft=(20,20))
             bg = pygame.Rect(timer_rect.left - 10, timer_rect.top - 5, timer_rect.width + 20, timer_rect.height + 10)
             pygame.draw.rect(self.screen, WHITE, bg, border_radius=5)
@@ -428,71 +517,77 @@ class SudokuGame:
 
     def draw_difficulty_indicator(self):
         if self.game_state == "GAME":
-            txt = self.small_font.render(f"Difficulty: {self.current_difficulty.title()}", True, BLACK)
+            txt = render_text(self.small_font, self.difficulty_label(), BLACK)
             rect = txt.get_rect(topright=(SCREEN_WIDTH-20,60))
             bg = pygame.Rect(rect.left - 10, rect.top - 5, rect.width + 20, rect.height + 10)
             pygame.draw.rect(self.screen, WHITE, bg, border_radius=5)
             pygame.draw.rect(self.screen, GRAY, bg, 2, border_radius=5)
             self.screen.blit(txt, rect)
 
+    def difficulty_label(self):
+        kind = self.engine.rules.kind
+        label = f"Difficulty: {self.engine.current_difficulty.title()}"
+        return label if kind == "classic" else f"{label} ({kind.title()})"
+
+    def cell_color(self, r, c):
+        engine = self.engine
+        if engine.solution_check_mode and (r,c) in engine.cell_colors:
+            return engine.cell_colors.get((r,c), BLACK)
+        if engine.has_conflict(r, c) and engine.original_puzzle[r][c] == '.':
+            return CONFLICT
+        return BLUE if (engine.original_puzzle and engine.original_puzzle[r][c] == '.') else BLACK
+
     def draw_grid(self):
-        pygame.draw.rect(self.screen, WHITE, (GRID_OFFSET_X, GRID_OFFSET_Y, GRID_SIZE, GRID_SIZE))
-        for i in range(10):
-            lw = 3 if i % 3 == 0 else 1
-            pygame.draw.line(self.screen, BLACK, (GRID_OFFSET_X + i*CELL_SIZE, GRID_OFFSET_Y), (GRID_OFFSET_X + i*CELL_SIZE, GRID_OFFSET_Y + GRID_SIZE), lw)
-            pygame.draw.line(self.screen, BLACK, (GRID_OFFSET_X, GRID_OFFSET_Y + i*CELL_SIZE), (GRID_OFFSET_X + GRID_SIZE, GRID_OFFSET_Y + i*CELL_SIZE), lw)
-        if self.selected_cell:
-            r,c = self.selected_cell
-            pygame.draw.rect(self.screen, LIGHT_BLUE, (GRID_OFFSET_X + c*CELL_SIZE, GRID_OFFSET_Y + r*CELL_SIZE, CELL_SIZE, CELL_SIZE), 3)
-        # numbers
-        if self.puzzle:
-            for r in range(9):
-                for c in range(9):
-                    if self.puzzle[r][c] == '.': continue
-                    if self.solution_check_mode and (r,c) in self.cell_colors:
-                        color = self.cell_colors.get((r,c), BLACK)
-                    else:
-                        color = BLUE if (self.original_puzzle and self.original_puzzle[r][c] == '.') else BLACK
-                    txt = self.cell_font.render(self.puzzle[r][c], True, color)
-                    rect = txt.get_rect(center=(GRID_OFFSET_X + c*CELL_SIZE + CELL_SIZE//2, GRID_OFFSET_Y + r*CELL_SIZE + CELL_SIZE//2))
-                    self.screen.blit(txt, rect)
+        engine = self.engine
+        self.layout_board()
+        self.board_renderer.draw(self.screen, engine.puzzle, engine.original_puzzle, self.cell_color, engine.selected_cell, engine.marks)
+
+    def instructions(self):
+        return PENCIL_INSTRUCTIONS if self.pencil_mode and not self.engine.solution_check_mode else self.engine.instructions
+
+    def status_line(self):
+        # a fresh message (a hint's reasoning) stands in for the instructions under the board
+        # for a few seconds; there is no room for both between the board and the buttons
+        if self.message and time.time() - self.message_time < 3:
+            return self.message, self.message_color
+        return self.instructions(), DARK_GRAY
 
     def draw_main_menu(self):
-        title = self.title_font.render("Sudoku Game", True, PURPLE)
+        title = render_text(self.title_font, "Sudoku Game", PURPLE)
         self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2,100)))
-        subtitle = self.font.render("Select a puzzle to begin", True, DARK_GRAY)
+        subtitle = render_text(self.font, "Select a puzzle to begin", DARK_GRAY)
         self.screen.blit(subtitle, subtitle.get_rect(center=(SCREEN_WIDTH//2,170)))
         for b in self.menu_buttons: b.draw(self.screen)
         # settings on main menu (top-left)
         self.settings_button.draw(self.screen)
 
     def draw_difficulty_select(self):
-        title = self.title_font.render("Select Difficulty", True, PURPLE)
+        title = render_text(self.title_font, "Select Difficulty", PURPLE)
         self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2,100)))
-        subtitle = self.font.render(f"For Puzzle {self.current_puzzle_name[-1]}" if self.current_puzzle_name else "Select Difficulty", True, DARK_GRAY)
+        subtitle = render_text(self.font, f"For Puzzle {self.engine.current_puzzle_name[-1]}" if self.engine.current_puzzle_name else "Select Difficulty", DARK_GRAY)
         self.screen.blit(subtitle, subtitle.get_rect(center=(SCREEN_WIDTH//2,170)))
         for b in self.difficulty_buttons: b.draw(self.screen)
-        beginner = self.small_font.render("Easiest version", True, DARK_GRAY)
-        normal = self.small_font.render("Common version", True, DARK_GRAY)
-        advanced = self.small_font.render("Hardest version", True, DARK_GRAY)
+        beginner = render_text(self.small_font, "Easiest version", DARK_GRAY)
+        normal = render_text(self.small_font, "Common version", DARK_GRAY)
+        advanced = render_text(self.small_font, "Hardest version", DARK_GRAY)
         self.screen.blit(beginner, beginner.get_rect(left=SCREEN_WIDTH//2 + BUTTON_WIDTH//2 + 20, centery=self.difficulty_buttons[0].rect.centery))
         self.screen.blit(normal, normal.get_rect(left=SCREEN_WIDTH//2 + BUTTON_WIDTH//2 + 20, centery=self.difficulty_buttons[1].rect.centery))
         self.screen.blit(advanced, advanced.get_rect(left=SCREEN_WIDTH//2 + BUTTON_WIDTH//2 + 20, centery=self.difficulty_buttons[2].rect.centery))
+        change = render_text(self.small_font, "Click to change", DARK_GRAY)
+        for b in (self.size_button, self.variant_button):
+            self.screen.blit(change, change.get_rect(left=SCREEN_WIDTH//2 + BUTTON_WIDTH//2 + 20, centery=b.rect.centery))
 
     def draw_celebration(self):
         if not self.celebration_active: return
-        for p in self.particles: p.draw(self.screen)
+        self.particles.draw(self.screen)
 
     def draw_game(self):
-        title = self.title_font.render("Sudoku", True, PURPLE)
+        title = render_text(self.title_font, "Sudoku", PURPLE)
         self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2,80)))
         self.draw_grid()
         for b in self.game_buttons: b.draw(self.screen)
-        if self.message and time.time() - self.message_time < 3:
-            t = self.small_font.render(self.message, True, self.message_color)
-            self.screen.blit(t, t.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 2*(BUTTON_HEIGHT + BUTTON_ROW_MARGIN) - 25)))
-        instr = self.small_font.render(self.instructions, True, DARK_GRAY)
-        self.screen.blit(instr, instr.get_rect(center=(SCREEN_WIDTH//2, GRID_OFFSET_Y + GRID_SIZE + 40)))
+        line = render_text(self.small_font, *self.status_line())
+        self.screen.blit(line, line.get_rect(center=(SCREEN_WIDTH//2, GRID_OFFSET_Y + GRID_SIZE + 40)))
         # unified settings button
         self.settings_button.draw(self.screen)
         self.draw_celebration()
@@ -513,7 +608,55 @@ class SudokuGame:
             self.current_dialog.draw(self.screen)
 
 
-    def draw(self):
+    def track_dirty(self):
+        # Work out which screen regions changed since the last frame. A change of screen
+        # (state or dialog) or a running celebration repaints everything.
+        tracker = self.dirty_tracker
+        scene = (self.game_state, getattr(self, "dialog_parent_state", None), id(self.current_dialog))
+        if scene != self.last_scene or self.celebration_active:
+            self.last_scene = scene
+            tracker.invalidate()
+        tracker.track("celebration", self.screen.get_rect(), self.celebration_active)
+        if self.profiler.visible and time.time() >= self.profiler_refresh:
+            # refresh the overlay text twice a second so it does not repaint every frame
+            self.profiler_lines = self.profiler.overlay_lines(); self.profiler_refresh = time.time() + 0.5
+        tracker.track("profiler", PROFILER_RECT, tuple(self.profiler_lines) if self.profiler.visible else None)
+        state = self.game_state
+        if state == "DIALOG":
+            state = getattr(self, "dialog_parent_state", "GAME")
+            if self.current_dialog:
+                tracker.track("dialog", self.current_dialog.rect.inflate(10, 10), self.current_dialog.render_key())
+        if state == "MAIN_MENU":
+            buttons = self.menu_buttons + [self.settings_button]
+        elif state == "DIFFICULTY_SELECT":
+            buttons = self.difficulty_buttons
+        else:
+            buttons = self.game_buttons + [self.settings_button]
+        for b in buttons:
+            tracker.track(f"button{id(b)}", button_rect(b), button_key(b))
+        if state == "GAME":
+            engine = self.engine
+            timer = engine.elapsed() if engine.start_time and not engine.timer_paused else None
+            tracker.track("timer", (0, 0, 300, 60), timer)
+            tracker.track("difficulty", (SCREEN_WIDTH - 360, 45, 360, 50), self.difficulty_label())
+            tracker.track("instructions", (0, GRID_OFFSET_Y + GRID_SIZE + 20, SCREEN_WIDTH, 40), self.status_line())
+            if engine.puzzle:
+                self.layout_board()
+                x, y, size = self.grid_rect.x, self.grid_rect.y, self.cell_size
+                for r in range(engine.geo.size):
+                    for c in range(engine.geo.size):
+                        value = engine.puzzle[r][c]
+                        key = (value, self.cell_color(r, c) if value != '.' else engine.marks[r][c], engine.selected_cell == (r,c))
+                        cell = (x + c*size - 2, y + r*size - 2, size + 4, size + 4)
+                        tracker.track(f"cell{r},{c}", cell, key)
+        alert = None; alert_rect = (SCREEN_WIDTH, 0, 0, 0)
+        if self.alert_message and time.time() - self.alert_time < 3:
+            alert = (self.alert_message, self.alert_color)
+            w, h = self.small_font.size(self.alert_message)
+            alert_rect = (SCREEN_WIDTH - 20 - w - 17, 8, w + 34, h + 24)
+        tracker.track("alert", alert_rect, alert)
+
+    def draw_scene(self):
         self.screen.fill(BACKGROUND)
         if self.game_state == "MAIN_MENU":
             self.draw_main_menu()
@@ -524,7 +667,41 @@ class SudokuGame:
         elif self.game_state == "DIALOG":
             self.draw_dialog()
         self.draw_alert()
-        pygame.display.flip()
+        if self.profiler.visible: self.draw_profiler()
+
+    def draw_profiler(self):
+        font = self.profiler_font
+        y = PROFILER_RECT.y + 4
+        self.screen.fill(WHITE, PROFILER_RECT); pygame.draw.rect(self.screen, DARK_GRAY, PROFILER_RECT, 1)
+        for line in self.profiler_lines:
+            self.screen.blit(render_text(font, line, BLACK), (PROFILER_RECT.x + 6, y)); y += font.get_linesize()
+
+    def handle_profiler_key(self, key):
+        if key == pygame.K_F3:
+            self.profiler.visible = not self.profiler.visible
+            self.profiler_refresh = 0
+        else:
+            n = self.profiler.dump_csv(PROFILE_CSV_PATH)
+            self.show_alert(f"Saved {n} frame samples to {os.path.basename(PROFILE_CSV_PATH)}", GREEN)
+
+    def draw(self):
+        # Only repaint and push the regions that changed; an idle screen costs nothing.
+        self.track_dirty()
+        full, rects = self.dirty_tracker.take()
+        if full:
+            self.draw_scene()
+        elif rects:
+            # one pass clipped to the rects' union: a scene pass costs about the same whatever
+            # the clip, so a pass per rect would multiply the work; only the rects are pushed
+            self.screen.set_clip(rects[0].unionall(rects[1:]))
+            self.draw_scene()
+            self.screen.set_clip(None)
+        # the display push is timed separately from drawing (the profiler's "flip" phase)
+        self.profiler.mark("draw")
+        if full:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
 
     def open_settings(self):
         # record which state opened the dialog so we draw correct background
@@ -545,6 +722,9 @@ class SudokuGame:
         mouse_pos = pygame.mouse.get_pos()
         for event in pygame.event.get():
             if event.type == pygame.QUIT: return False
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED): self.dirty_tracker.invalidate()
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_F3, pygame.K_F4):
+                self.handle_profiler_key(event.key); continue
 
             if self.game_state == "MAIN_MENU":
                 for b in self.menu_buttons:
@@ -567,83 +747,72 @@ class SudokuGame:
                 self.settings_button.check_hover(mouse_pos)
                 if self.settings_button.handle_event(event): pass
                 # grid clicks
+                engine = self.engine
+                self.layout_board(); last = engine.geo.size - 1
+                grid = self.grid_rect
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if (GRID_OFFSET_X <= mouse_pos[0] <= GRID_OFFSET_X + GRID_SIZE and
-                        GRID_OFFSET_Y <= mouse_pos[1] <= GRID_OFFSET_Y + GRID_SIZE and self.puzzle):
-                        col = (mouse_pos[0] - GRID_OFFSET_X) // CELL_SIZE
-                        row = (mouse_pos[1] - GRID_OFFSET_Y) // CELL_SIZE
-                        if self.solution_check_mode:
-                            if (row,col) in self.editable_cells: self.selected_cell = (row,col)
-                            else:
-                                if self.sound_error: self.sound_error.play()
-                                self.show_alert("[WARNING] Only incorrect cells can be modified", YELLOW)
+                    if (grid.left <= mouse_pos[0] <= grid.right and
+                        grid.top <= mouse_pos[1] <= grid.bottom and engine.puzzle):
+                        col = min((mouse_pos[0] - grid.x) // self.cell_size, last)
+                        row = min((mouse_pos[1] - grid.y) // self.cell_size, last)
+                        if engine.can_select(row, col): engine.selected_cell = (row,col)
                         else:
-                            if self.puzzle[row][col] == '.': self.selected_cell = (row,col)
+                            if self.sound_error: self.sound_error.play()
+                            if engine.solution_check_mode:
+                                self.show_alert("[WARNING] Only incorrect cells can be modified", YELLOW)
                             else:
-                                if self.original_puzzle[row][col] != '.':
-                                    if self.sound_error: self.sound_error.play()
-                                    self.show_alert("[WARNING] Original cells cannot be modified", YELLOW)
-                                else:
-                                    self.selected_cell = (row,col)
+                                self.show_alert("[WARNING] Original cells cannot be modified", YELLOW)
                 # key input
-                if event.type == pygame.KEYDOWN and self.puzzle:
-                    if self.selected_cell:
-                        r, c = self.selected_cell
+                if event.type == pygame.KEYDOWN and engine.puzzle:
+                    if engine.selected_cell:
+                        r, c = engine.selected_cell
                     else:
                         # If no cell selected, default to (0,0)
                         r, c = 0, 0
-                        self.selected_cell = (0, 0)
+                        engine.selected_cell = (0, 0)
 
                     # Handle arrow keys for navigation
                     if event.key == pygame.K_UP and r > 0:
-                        self.selected_cell = (r - 1, c)
+                        engine.selected_cell = (r - 1, c)
                         if self.sound_click:
                             self.sound_click.play()
-                    elif event.key == pygame.K_DOWN and r < 8:
-                        self.selected_cell = (r + 1, c)
+                    elif event.key == pygame.K_DOWN and r < last:
+                        engine.selected_cell = (r + 1, c)
                         if self.sound_click:
                             self.sound_click.play()
                     elif event.key == pygame.K_LEFT and c > 0:
-                        self.selected_cell = (r, c - 1)
+                        engine.selected_cell = (r, c - 1)
                         if self.sound_click:
                             self.sound_click.play()
-                    elif event.key == pygame.K_RIGHT and c < 8:
-                        self.selected_cell = (r, c + 1)
+                    elif event.key == pygame.K_RIGHT and c < last:
+                        engine.selected_cell = (r, c + 1)
                         if self.sound_click:
                             self.sound_click.play()
+                    elif event.key == pygame.K_SPACE or (event.key == pygame.K_p and 'P' not in engine.geo.digits):
+                        self.pencil_mode = not self.pencil_mode
                     # Only handle input if not an arrow key or if we want to allow input after navigation
-                    elif self.selected_cell:
-                        r, c = self.selected_cell
-                        can_edit = (r,c) in self.editable_cells if self.solution_check_mode else (self.original_puzzle[r][c] == '.')
-                        if can_edit:
-                            if event.key in (pygame.K_BACKSPACE, pygame.K_DELETE) or event.key == pygame.K_0:
-                                self.history.append((r,c,self.puzzle[r][c])); self.puzzle[r][c] = '.'
-                                if self.solution_check_mode: self.cell_colors[(r,c)] = None
-                                if self.sound_click:
-                                    self.sound_click.play()
-                            elif event.unicode.isdigit() and event.unicode != '0':
-                                self.history.append((r,c,self.puzzle[r][c])); self.puzzle[r][c] = event.unicode
-                                if self.sound_click:
-                                    self.sound_click.play()
-                                if self.solution_check_mode:
-                                    if event.unicode == self.solution[r][c]:
-                                        self.cell_colors[(r,c)] = GREEN
-                                        if (r,c) in self.editable_cells: self.editable_cells.remove((r,c))
-                                    else:
-                                        self.cell_colors[(r,c)] = RED
-                        # File is read-only, no writing
-                        # check completion in solution_check_mode
-                        if self.solution_check_mode:
-                            all_filled = all(self.puzzle[r][c] != '.' for r in range(9) for c in range(9))
-                            all_correct = all(self.puzzle[r][c] == self.solution[r][c] for r in range(9) for c in range(9))
-                            if all_filled and all_correct and not self.puzzle_completed:
-                                self.puzzle_completed = True; self.celebration_active = True; self.celebration_start_time = time.time()
-                                self.particles = [Particle(random.randint(0,SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT//2)) for _ in range(100)]
-                                if self.sound_win: self.sound_win.play()
-                                self.show_alert("[SUCCESS] Congratulations! Puzzle solved correctly!", GREEN)
-                                for b in self.game_buttons:
-                                    if b.text not in ["Main Menu", "Save Progress"]:
-                                        b.enabled = False
+                    elif engine.selected_cell:
+                        r, c = engine.selected_cell
+                        if event.key in (pygame.K_BACKSPACE, pygame.K_DELETE) or event.key == pygame.K_0:
+                            # in pencil mode an empty cell loses its marks instead
+                            if self.pencil_mode and engine.puzzle[r][c] == '.':
+                                done = engine.toggle_marks(r, c, engine.marks[r][c])
+                            else:
+                                done = engine.clear_cell(r, c)
+                            if done and self.sound_click:
+                                self.sound_click.play()
+                        elif event.unicode and event.unicode.upper() in engine.geo.digits:
+                            # letters are digits too on boards bigger than 9x9
+                            value = event.unicode.upper()
+                            if self.pencil_mode:
+                                done = engine.toggle_marks(r, c, 1 << (engine.geo.value(value) - 1))
+                            else:
+                                done = engine.set_cell(r, c, value)
+                            if done and self.sound_click:
+                                self.sound_click.play()
+                        # the conflict index makes this O(1), so it runs on every key
+                        if engine.check_completion():
+                            self.start_celebration("[SUCCESS] Congratulations! Puzzle solved correctly!")
 
             elif self.game_state == "DIALOG":
                 if self.current_dialog:
@@ -656,40 +825,16 @@ class SudokuGame:
         return True
 
     def check_solution(self):
-        if not self.solution:
+        if not self.engine.solution:
             self.show_alert("[ERROR] No solution available", RED)
             if self.sound_error: self.sound_error.play()
             return False
         try:
-            self.solution_check_mode = True
-            self.editable_cells.clear()
-            # remove colors for empty cells
-            keys_to_remove = [k for k in list(self.cell_colors.keys()) if self.puzzle[k[0]][k[1]] == '.']
-            for k in keys_to_remove: self.cell_colors.pop(k, None)
-            checked = {}
-            all_correct = True
-            for r in range(9):
-                for c in range(9):
-                    if self.original_puzzle[r][c] == '.' and self.puzzle[r][c] != '.':
-                        if self.puzzle[r][c] == self.solution[r][c]:
-                            checked[(r,c)] = GREEN
-                        else:
-                            checked[(r,c)] = RED
-                            self.editable_cells.add((r,c))
-                            all_correct = False
-            self.cell_colors.update(checked)
-            if all_correct:
-                self.puzzle_completed = True; self.celebration_active = True; self.celebration_start_time = time.time()
-                self.particles = [Particle(random.randint(0,SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT//2)) for _ in range(100)]
-                if self.sound_win: self.sound_win.play()
-                self.show_alert("[SUCCESS] Congratulations! All answers are correct!", GREEN)
-                for b in self.game_buttons:
-                    if b.text not in ["Main Menu", "Save Progress"]:
-                        b.enabled = False
+            if self.engine.check_solution():
+                self.start_celebration("[SUCCESS] Congratulations! All answers are correct!")
             else:
                 self.show_alert("[WARNING] Some cells are incorrect - only incorrect cells can be modified", YELLOW)
                 if self.sound_error: self.sound_error.play()
-                self.instructions = "Only incorrect (red) cells can be modified"
             self.current_dialog = None; self.game_state = "GAME"
             return True
         except Exception as e:
@@ -701,9 +846,14 @@ class SudokuGame:
     def run(self):
         print("Game is running...")
         running = True
+        profiler = self.profiler; first_frame = True
         while running:
+            profiler.begin_frame()
             running = self.handle_events()
+            profiler.mark("events")
             if self.celebration_active: self.update_celebration()
+            self.poll_saves(); self.poll_puzzle(); self.journal.tick(self.engine)
+            profiler.mark("update")
 
             # update hover states
             pos = pygame.mouse.get_pos()
@@ -726,9 +876,21 @@ class SudokuGame:
                 else:
                     self.current_dialog.yes_button.check_hover(pos)
                     self.current_dialog.no_button.check_hover(pos)
+            profiler.mark("hover")
 
             self.draw()
+            profiler.mark("flip")
+            if first_frame:
+                first_frame = False
+                audio = "ready" if sounds.mixer_ready.done() else "still loading"
+                print(f"First frame after {(time.perf_counter() - self.startup_time) * 1000:.0f} ms (audio {audio})")
+                self.start_background_work()
+            profiler.end_frame()
             self.clock.tick(30)
+        self.journal.close(self.engine)
+        self.save_writer.close()
+        self.producer.shutdown()
+        if os.environ.get("SUDOKU_PROFILE_CSV"): profiler.dump_csv(os.environ["SUDOKU_PROFILE_CSV"])
         pygame.quit()
         print("Game has exited.")
         sys.exit()
@@ -0,0 +1,87 @@
+import random
+from .constants import DIFFICULTY_LEVELS
+from .geometry import STANDARD, for_size, geometry_of
+from .grader import difficulty_of
+from .puzzles import randomize_puzzle
+from .solver import is_valid_solution, solve
+from .variants import VARIANTS, Rules
+
+EMPTY_GRID = STANDARD.empty_grid()
+MAX_GRADE_ATTEMPTS = 25
+
+
+def transform_grid(grid, rng=None):
+    # Shuffle digits, rows within bands, bands, columns within stacks and stacks,
+    # and maybe transpose (square boxes only); every result is still a valid grid.
+    rng = rng or random
+    geo = geometry_of(grid); br, bc, n = geo.box_rows, geo.box_cols, geo.size
+    digits = list(geo.digits)
+    rng.shuffle(digits)
+    relabel = dict(zip(geo.digits, digits))
+    bands = rng.sample(range(n // br), n // br); stacks = rng.sample(range(n // bc), n // bc)
+    rows = [b * br + r for b in bands for r in rng.sample(range(br), br)]
+    cols = [s * bc + c for s in stacks for c in rng.sample(range(bc), bc)]
+    out = [[relabel.get(grid[r][c], grid[r][c]) for c in cols] for r in rows]
+    if br == bc and rng.random() < 0.5:
+        out = [list(col) for col in zip(*out)]
+    return out
+
+
+def pattern_grid(geo):
+    # a valid filled board built directly: row r is the base row shifted by box_cols for
+    # each row down a band and by one more for each band
+    n, br, bc = geo.size, geo.box_rows, geo.box_cols
+    return [[geo.digits[(bc * (r % br) + r // br + c) % n] for c in range(n)] for r in range(n)]
+
+
+def generate_solution(rng=None, geo=STANDARD):
+    # randomized backtracking from an empty board, then a random symmetry. Other sizes
+    # start from pattern_grid instead: a search over 625 empty cells is too slow, and the
+    # shuffles alone give plenty of variety.
+    rng = rng or random.Random()
+    if geo is STANDARD:
+        return transform_grid(solve(EMPTY_GRID, rng), rng)
+    return transform_grid(pattern_grid(geo), rng)
+
+
+def generate_puzzle(difficulty, seed=None, size=9):
+    # Same seed, difficulty and size always give the same (puzzle, solution) pair.
+    # 9x9 boards are regenerated until the grader agrees with the requested label;
+    # the last attempt is used if none did. The grader only knows 9x9 techniques, so
+    # other sizes take the first board dug to the difficulty's share of givens.
+    if seed is None:
+        seed = random.getrandbits(32)
+    rng = random.Random(seed)
+    if size != 9:
+        solution = generate_solution(rng, for_size(size))
+        return randomize_puzzle(solution, difficulty, DIFFICULTY_LEVELS, rng=rng), solution
+    for _ in range(MAX_GRADE_ATTEMPTS):
+        solution = generate_solution(rng)
+        puzzle = randomize_puzzle(solution, difficulty, DIFFICULTY_LEVELS, rng=rng)
+        if difficulty_of(puzzle) == difficulty:
+            break
+    return puzzle, solution
+
+
+def generate_variant(kind, difficulty, seed=None, size=9):
+    # (puzzle, solution, constraints) for one of variants.VARIANTS. The constraints are laid
+    # over a generated solution; when that solution breaks them (the diagonals) another is
+    # searched for under them. Givens are the classic targets scaled by the kind's
+    # givens_share; the grader only knows classic rules, so the label is not checked.
+    if seed is None:
+        seed = random.getrandbits(32)
+    rng = random.Random(seed)
+    geo = for_size(size)
+    solution = generate_solution(rng, geo)
+    constraints = VARIANTS[kind].derive(solution, geo, rng)
+    rules = Rules(geo, constraints)
+    if not is_valid_solution(solution, rules):
+        solution = solve(geo.empty_grid(), rng, rules)
+    return randomize_puzzle(solution, difficulty, difficulty_levels(rules), rng=rng, rules=rules), solution, constraints
+
+
+def difficulty_levels(rules):
+    # DIFFICULTY_LEVELS for a board under rules: scaled by the smallest givens_share among
+    # its constraint kinds
+    share = min((con.givens_share for con in rules.constraints), default=1.0)
+    return {label: round(givens * share) for label, givens in DIFFICULTY_LEVELS.items()}
@@ -0,0 +1,69 @@
+from functools import lru_cache
+
+# Board shapes. A board of size n = box_rows * box_cols has n rows, n columns and n boxes
+# of box_rows x box_cols cells; cells are indexed row-major and the digit with value v
+# (1..n) is written SYMBOLS[v - 1] and maps to bit v - 1 of a mask. Boards stay lists of
+# single-character strings with '.' for a blank, whatever their size.
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+# box shape used for each supported board size
+BOX_SHAPES = {4: (2, 2), 6: (2, 3), 9: (3, 3), 12: (3, 4), 16: (4, 4), 25: (5, 5)}
+
+
+class Geometry:
+    __slots__ = ("box_rows", "box_cols", "size", "cells", "digits", "values", "all_digits",
+                 "row_of", "col_of", "box_of", "units", "peers")
+
+    def __init__(self, box_rows, box_cols):
+        n = box_rows * box_cols
+        self.box_rows = box_rows; self.box_cols = box_cols
+        self.size = n; self.cells = n * n
+        self.digits = SYMBOLS[:n]
+        self.values = {ch: v + 1 for v, ch in enumerate(self.digits)}  # symbol -> 1..n
+        self.all_digits = (1 << n) - 1
+        stacks = n // box_cols  # boxes across one band
+        self.row_of = [i // n for i in range(n * n)]
+        self.col_of = [i % n for i in range(n * n)]
+        self.box_of = [(i // n // box_rows) * stacks + (i % n) // box_cols for i in range(n * n)]
+        # rows, then columns, then boxes
+        self.units = ([[r * n + c for c in range(n)] for r in range(n)] +
+                      [[r * n + c for r in range(n)] for c in range(n)] +
+                      [[i for i in range(n * n) if self.box_of[i] == b] for b in range(n)])
+        self.peers = [sorted((set(self.units[self.row_of[i]]) | set(self.units[n + self.col_of[i]]) |
+                              set(self.units[2 * n + self.box_of[i]])) - {i}) for i in range(n * n)]
+
+    def __repr__(self):
+        return f"Geometry({self.box_rows}, {self.box_cols})"
+
+    def box_index(self, r, c):
+        return (r // self.box_rows) * (self.size // self.box_cols) + c // self.box_cols
+
+    def value(self, ch):
+        # '.' -> 0
+        return self.values.get(ch, 0)
+
+    def empty_grid(self):
+        return [['.'] * self.size for _ in range(self.size)]
+
+
+@lru_cache(maxsize=None)
+def geometry(box_rows=3, box_cols=3):
+    return Geometry(box_rows, box_cols)
+
+
+def for_size(size):
+    if size not in BOX_SHAPES:
+        raise ValueError(f"unsupported board size {size}")
+    return geometry(*BOX_SHAPES[size])
+
+
+def geometry_of(grid):
+    return for_size(len(grid))
+
+
+def single_value(mask):
+    # the value (1..n) of a mask with exactly one bit set, else 0
+    return mask.bit_length() if mask and not mask & (mask - 1) else 0
+
+
+STANDARD = geometry(3, 3)
@@ -0,0 +1,202 @@
+from itertools import combinations
+from .geometry import geometry_of
+from .solver import ALL_DIGITS, BIT_COUNT, BIT_DIGIT, DIGITS, PEERS, UNITS, ROW_OF, COL_OF, BOX_OF
+
+# Techniques from easiest to hardest; a board's grade is the hardest one it needs.
+TECHNIQUES = ["hidden single", "naked single", "locked candidates", "naked pair", "hidden pair",
+              "naked triple", "x-wing", "guess"]
+TECHNIQUE_RANK = {name: rank for rank, name in enumerate(TECHNIQUES)}
+
+# hardest technique allowed for each difficulty label, easiest label first
+DIFFICULTY_MAX_TECHNIQUE = {"beginner": "hidden single", "normal": "hidden pair", "advanced": "guess"}
+
+ROWS = UNITS[:9]
+COLS = UNITS[9:18]
+BOXES = UNITS[18:]
+
+
+class GradingBoard:
+    __slots__ = ("cells", "cand", "empty")
+
+    def __init__(self, grid, cand=None):
+        # cand, if given, is the candidate mask of every cell (0 where filled) already worked
+        # out elsewhere, which saves placing each digit against its peers. Only this form
+        # takes boards other than 9x9 (hints.find_hint builds one for any size).
+        if cand is not None:
+            values = geometry_of(grid).values
+            self.cells = [values.get(ch, 0) for row in grid for ch in row]
+            self.cand = list(cand); self.empty = self.cells.count(0)
+            return
+        self.cells = [0] * 81
+        self.cand = [ALL_DIGITS] * 81
+        self.empty = 81
+        for r in range(9):
+            for c in range(9):
+                ch = grid[r][c]
+                if ch in DIGITS:
+                    self.place(r * 9 + c, int(ch))
+
+    def place(self, i, d):
+        bit = 1 << (d - 1)
+        self.cells[i] = d; self.cand[i] = 0; self.empty -= 1
+        cand = self.cand
+        for p in PEERS[i]:
+            cand[p] &= ~bit
+
+    def eliminate(self, cells, mask):
+        # remove mask from the given cells; True if anything changed
+        changed = False
+        cand = self.cand
+        for i in cells:
+            if cand[i] & mask:
+                cand[i] &= ~mask
+                changed = True
+        return changed
+
+
+def _hidden_single(board):
+    cand = board.cand
+    for unit in UNITS:
+        once = 0; twice = 0
+        for i in unit:
+            twice |= once & cand[i]
+            once |= cand[i]
+        hidden = once & ~twice
+        if hidden:
+            bit = hidden & -hidden
+            for i in unit:
+                if cand[i] & bit:
+                    board.place(i, BIT_DIGIT[bit])
+                    return True
+    return False
+
+
+def _naked_single(board):
+    cand = board.cand
+    for i in range(81):
+        d = BIT_DIGIT[cand[i]]
+        if d:
+            board.place(i, d)
+            return True
+    return False
+
+
+def _locked_candidates(board):
+    cand = board.cand
+    for b, box in enumerate(BOXES):
+        for d in range(9):
+            bit = 1 << d
+            cells = [i for i in box if cand[i] & bit]
+            if len(cells) < 2:
+                continue
+            # pointing: the digit is confined to one row or column inside the box
+            rows = {ROW_OF[i] for i in cells}
+            if len(rows) == 1 and board.eliminate([i for i in ROWS[rows.pop()] if BOX_OF[i] != b], bit):
+                return True
+            cols = {COL_OF[i] for i in cells}
+            if len(cols) == 1 and board.eliminate([i for i in COLS[cols.pop()] if BOX_OF[i] != b], bit):
+                return True
+    for line in ROWS + COLS:
+        for d in range(9):
+            bit = 1 << d
+            boxes = {BOX_OF[i] for i in line if cand[i] & bit}
+            # claiming: the digit is confined to one box within the line
+            if len(boxes) == 1:
+                b = boxes.pop()
+                if board.eliminate([i for i in BOXES[b] if i not in line], bit):
+                    return True
+    return False
+
+
+def _naked_subset(board, size):
+    cand = board.cand
+    for unit in UNITS:
+        small = [i for i in unit if cand[i] and BIT_COUNT[cand[i]] <= size]
+        if len(small) < size:
+            continue
+        for group in combinations(small, size):
+            mask = 0
+            for i in group:
+                mask |= cand[i]
+            if BIT_COUNT[mask] == size and board.eliminate([i for i in unit if i not in group], mask):
+                return True
+    return False
+
+
+def _naked_pair(board):
+    return _naked_subset(board, 2)
+
+
+def _naked_triple(board):
+    return _naked_subset(board, 3)
+
+
+def _hidden_pair(board):
+    cand = board.cand
+    for unit in UNITS:
+        where = {}
+        for d in range(9):
+            cells = tuple(i for i in unit if cand[i] >> d & 1)
+            if len(cells) == 2:
+                where.setdefault(cells, []).append(d)
+        for cells, digits in where.items():
+            if len(digits) == 2:
+                keep = (1 << digits[0]) | (1 << digits[1])
+                if board.eliminate(cells, ALL_DIGITS & ~keep):
+                    return True
+    return False
+
+
+def _x_wing(board):
+    cand = board.cand
+    for lines, cross, pos in ((ROWS, COLS, COL_OF), (COLS, ROWS, ROW_OF)):
+        for d in range(9):
+            bit = 1 << d
+            pairs = {}
+            for k, line in enumerate(lines):
+                spots = tuple(pos[i] for i in line if cand[i] & bit)
+                if len(spots) == 2:
+                    pairs.setdefault(spots, []).append(k)
+            for spots, found in pairs.items():
+                if len(found) < 2:
+                    continue
+                base = set(lines[found[0]]) | set(lines[found[1]])
+                for s in spots:
+                    if board.eliminate([i for i in cross[s] if i not in base], bit):
+                        return True
+    return False
+
+
+TECHNIQUE_STEPS = [("hidden single", _hidden_single), ("naked single", _naked_single),
+                   ("locked candidates", _locked_candidates), ("naked pair", _naked_pair),
+                   ("hidden pair", _hidden_pair), ("naked triple", _naked_triple), ("x-wing", _x_wing)]
+
+
+def next_step(board):
+    # apply the easiest technique that makes progress; returns its name or None
+    for name, step in TECHNIQUE_STEPS:
+        if step(board):
+            return name
+    return None
+
+
+def grade_puzzle(grid):
+    # Returns (hardest technique needed, number of steps taken). Boards the listed
+    # techniques cannot finish are graded "guess".
+    board = GradingBoard(grid)
+    hardest = 0; steps = 0
+    while board.empty:
+        name = next_step(board)
+        if name is None:
+            return "guess", steps
+        hardest = max(hardest, TECHNIQUE_RANK[name])
+        steps += 1
+    return TECHNIQUES[hardest], steps
+
+
+def difficulty_of(grid):
+    rank = TECHNIQUE_RANK[grade_puzzle(grid)[0]]
+    for difficulty, technique in DIFFICULTY_MAX_TECHNIQUE.items():
+        if rank <= TECHNIQUE_RANK[technique]:
+            return difficulty
+    return "advanced"
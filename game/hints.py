@@ -0,0 +1,180 @@
+import time
+from .geometry import single_value
+from .grader import TECHNIQUE_RANK, TECHNIQUE_STEPS, TECHNIQUES, GradingBoard
+
+# The hint engine: instead of revealing a random cell, find the easiest deduction the player
+# could make from the board as it stands and say why it holds. Candidates come straight from
+# the engine's ConflictIndex (kept up to date move by move), so a hint is a few passes over
+# the cells rather than a solve. Works on any board size (see geometry) and under variant
+# rules (see variants): their houses take part in hidden singles, and each constraint's own
+# propagation narrows the candidates before the search starts.
+MAX_STEPS = 20  # eliminations tried before giving up and revealing a cell
+# and the seconds they may take: a round on a 25x25 board costs about a millisecond, so this
+# keeps every hint under 33 ms there (9x9 and 16x16 boards never get near it)
+STEP_BUDGET = 0.02
+
+# grader steps harder than locked candidates, used only to unlock a single; they are
+# written for 9x9 boards with the usual boxes (extra rules on top leave them sound)
+HARDER_STEPS = [(name, step) for name, step in TECHNIQUE_STEPS if TECHNIQUE_RANK[name] > TECHNIQUE_RANK["locked candidates"]]
+
+
+class Hint:
+    # cell (r, c) and digit are the placement the hint leads to; steps are the reasons, in
+    # order: any candidate eliminations needed first, then the placement itself
+    def __init__(self, technique, cell, digit, steps):
+        self.technique = technique; self.cell = cell; self.digit = digit; self.steps = steps
+
+    def explanation(self):
+        if len(self.steps) == 1:
+            return self.steps[0]
+        more = len(self.steps) - 1
+        return f"{self.steps[0]}, then {more} more step{'s' if more > 1 else ''}"
+
+
+def cell_name(geo, i):
+    return f"R{geo.row_of[i] + 1}C{geo.col_of[i] + 1}"
+
+
+def _ruled_out_by(rules, i):
+    # "row, column and box" and the like: what holds the digits a naked single rules out
+    names = []
+    for u in rules.units_of[i]:
+        name = rules.names[u].split()[0]
+        if name not in names:
+            names.append(name)
+    return ", ".join(names[:-1]) + " and " + names[-1]
+
+
+def _hidden_single(board, rules):
+    cand = board.cand; geo = rules.geo; n = geo.size
+    # boxes first: a digit with one home in its box is the deduction people spot soonest
+    for k in list(range(2 * n, 3 * n)) + list(range(2 * n)) + list(range(3 * n, len(rules.houses))):
+        unit = rules.houses[k]
+        once = 0; twice = 0
+        for i in unit:
+            twice |= once & cand[i]
+            once |= cand[i]
+        hidden = once & ~twice
+        if hidden:
+            bit = hidden & -hidden
+            d = geo.digits[bit.bit_length() - 1]
+            for i in unit:
+                if cand[i] & bit:
+                    return i, d, f"{d} has only one place in {rules.names[k]}: {cell_name(geo, i)}"
+    return None
+
+
+def _naked_single(board, rules):
+    cand = board.cand; geo = rules.geo
+    for i in range(geo.cells):
+        v = single_value(cand[i])
+        if v:
+            d = geo.digits[v - 1]
+            if not rules.constraints:
+                return i, d, f"{cell_name(geo, i)} can only be {d}: its row, column and box hold the rest"
+            return i, d, f"{cell_name(geo, i)} can only be {d}: its {_ruled_out_by(rules, i)} rule out the rest"
+    return None
+
+
+def _confined(masks):
+    # digits (as a mask) present in exactly one of the given candidate masks
+    once = twice = 0
+    for m in masks:
+        twice |= once & m; once |= m
+    return once & ~twice
+
+
+def _locked_candidates(board, rules):
+    # same search as the grader's, but says what it found; each unit's candidates are
+    # folded per line (or per box) once, rather than once per digit
+    cand = board.cand; geo = rules.geo; n = geo.size; box_of = rules.box_of
+    region = rules.names[2 * n].split()[0]
+    rows, cols, boxes = rules.units[:n], rules.units[n:2 * n], rules.units[2 * n:3 * n]
+    for b, box in enumerate(boxes):
+        by_row = {}; by_col = {}
+        for i in box:
+            r, c = geo.row_of[i], geo.col_of[i]
+            by_row[r] = by_row.get(r, 0) | cand[i]; by_col[c] = by_col.get(c, 0) | cand[i]
+        in_row, in_col = _confined(by_row.values()), _confined(by_col.values())
+        pointing = in_row | in_col
+        while pointing:
+            bit = pointing & -pointing; pointing ^= bit
+            for lines, where, confined, kind in ((rows, by_row, in_row, "row"), (cols, by_col, in_col, "column")):
+                if confined & bit:
+                    k = next(k for k, m in where.items() if m & bit)
+                    if board.eliminate([i for i in lines[k] if box_of[i] != b], bit):
+                        return f"in {region} {b + 1}, {geo.digits[bit.bit_length() - 1]} must go in {kind} {k + 1}, so not elsewhere in it"
+    for k, line in enumerate(rows + cols):
+        by_box = {}
+        for i in line:
+            by_box[box_of[i]] = by_box.get(box_of[i], 0) | cand[i]
+        claiming = _confined(by_box.values())
+        while claiming:
+            bit = claiming & -claiming; claiming ^= bit
+            b = next(b for b, m in by_box.items() if m & bit)
+            if board.eliminate([i for i in boxes[b] if i not in line], bit):
+                return f"in {rules.names[k]}, {geo.digits[bit.bit_length() - 1]} must go in {region} {b + 1}, so not elsewhere in it"
+    return None
+
+
+def _narrow(board, rules):
+    # the constraints' own propagation (cage sums, thermometer order); says which kinds
+    # ruled something out
+    cand = board.cand; labels = []
+    for con in rules.local:
+        before = [cand[i] for i in con.cells]
+        con.propagate(cand, board.cells, rules.geo)
+        if con.label not in labels and before != [cand[i] for i in con.cells]:
+            labels.append(con.label)
+    if labels:
+        return f"the {' and '.join(label + 's' for label in labels)} rule out some candidates"
+    return None
+
+
+def find_hint(engine, rng):
+    # the easiest next move on engine's board, as a Hint; None if the board is full
+    puzzle, solution, rules = engine.puzzle, engine.solution, engine.rules
+    geo = rules.geo
+    n = geo.size
+    # a wrong entry spoils every deduction made from it, so point that out first
+    for r in range(n):
+        for c in range(n):
+            if puzzle[r][c] != '.' and puzzle[r][c] != solution[r][c]:
+                return Hint("mistake", (r, c), solution[r][c], [f"{cell_name(geo, r * n + c)} should be {solution[r][c]}, not {puzzle[r][c]}"])
+    conflicts = engine.conflicts
+    board = GradingBoard(puzzle, [conflicts.candidates(r, c) if puzzle[r][c] == '.' else 0 for r in range(n) for c in range(n)])
+    if not board.empty:
+        return None
+    _narrow(board, rules)
+    steps = []; hardest = 0; deadline = time.perf_counter() + STEP_BUDGET
+    for _ in range(MAX_STEPS):
+        if time.perf_counter() > deadline:
+            break
+        for technique, find in (("hidden single", _hidden_single), ("naked single", _naked_single)):
+            found = find(board, rules)
+            if found:
+                i, d, text = found
+                steps.append(text); hardest = max(hardest, TECHNIQUE_RANK[technique])
+                steps[0] = steps[0][0].upper() + steps[0][1:]
+                return Hint(TECHNIQUES[hardest], (geo.row_of[i], geo.col_of[i]), d, steps)
+        text = _locked_candidates(board, rules)
+        if text:
+            steps.append(text); hardest = max(hardest, TECHNIQUE_RANK["locked candidates"])
+            continue
+        text = _narrow(board, rules)
+        if text:
+            steps.append(text)
+            continue
+        for name, step in HARDER_STEPS if n == 9 and rules.box_of is geo.box_of else ():
+            if step(board):
+                steps.append(f"a {name} rules out some candidates"); hardest = max(hardest, TECHNIQUE_RANK[name])
+                break
+        else:
+            break
+    # nothing within reach: reveal one of the most constrained cells
+    cand = board.cand
+    empty = [i for i in range(geo.cells) if not board.cells[i]]
+    fewest = min(cand[i].bit_count() for i in empty)
+    i = rng.choice([i for i in empty if cand[i].bit_count() == fewest])
+    r, c = geo.row_of[i], geo.col_of[i]
+    return Hint("reveal", (r, c), solution[r][c], [f"No simple step from here, so {cell_name(geo, i)} is given away"])
@@ -0,0 +1,205 @@
+import os
+import struct
+import threading
+import time
+import zlib
+from .geometry import STANDARD, geometry_of
+from .saves import SaveCorrupted, decode_save, encode_save, write_atomic
+
+# Autosave: a base snapshot (autosave.sav, the slot format) plus an append-only log of the
+# moves made since (autosave.log). A move costs a few bytes appended to an in-memory buffer;
+# the buffer goes to disk in framed batches, and the log is folded back into a fresh snapshot
+# once it grows long and on clean exit. After a crash the snapshot is loaded and the log
+# replayed up to the last intact frame.
+#
+# log:    MAGIC, crc32 trailer of the snapshot it extends, then frames
+# frame:  record bytes length (u16), crc32 of the records (u32), records
+# record: op byte, then a cell (r * n + c, u16) and a digit value (u8, 0 for blank) where
+#         the op needs them; a pencil-mark edit has a cell and the toggled marks as a u32
+MAGIC = b"SDJ2"  # b"SDKJ" logs had one-byte cells and are not replayed
+LOG_HEADER = struct.Struct("<4sI")
+FRAME = struct.Struct("<HI")
+OP_SET = 1
+OP_UNDO = 2
+OP_HINT = 3
+OP_CHECK = 4
+OP_MARKS = 5
+RECORD_ARGS = {OP_SET: struct.Struct("<HB"), OP_UNDO: None, OP_HINT: struct.Struct("<H"), OP_CHECK: None, OP_MARKS: struct.Struct("<HI")}
+FLUSH_RECORDS = 32
+FLUSH_INTERVAL = 2.0
+COMPACT_RECORDS = 2000
+
+
+def snapshot_id(payload):
+    # the save format ends in a crc32 of everything before it
+    return struct.unpack_from("<I", payload, len(payload) - 4)[0]
+
+
+class MoveJournal:
+    # SudokuEngine calls the record_* methods as moves happen; the game calls tick() every
+    # frame and close() on exit. Snapshot writes go through the game's SaveWriter thread.
+    def __init__(self, directory, writer):
+        self.snapshot_path = os.path.join(directory, "autosave.sav")
+        self.log_path = os.path.join(directory, "autosave.log")
+        self.writer = writer
+        self.lock = threading.Lock()
+        self.buffer = bytearray(); self.records = 0; self.logged = 0
+        self.log = None  # open for appending once the snapshot it extends is on disk
+        self.active = False; self.generation = 0
+        self.geo = STANDARD  # shape of the board being recorded
+        self.last_flush = time.time()
+
+    def exists(self):
+        return os.path.exists(self.snapshot_path)
+
+    # recording
+    def _record(self, op, *args):
+        self.buffer.append(op)
+        if args: self.buffer += RECORD_ARGS[op].pack(*args)
+        self.records += 1
+
+    def record_set(self, r, c, value):
+        if self.active: self._record(OP_SET, r * self.geo.size + c, self.geo.value(value))
+
+    def record_undo(self):
+        if self.active: self._record(OP_UNDO)
+
+    def record_hint(self, r, c):
+        if self.active: self._record(OP_HINT, r * self.geo.size + c)
+
+    def record_marks(self, r, c, mask):
+        if self.active: self._record(OP_MARKS, r * self.geo.size + c, mask)
+
+    def record_check(self):
+        if self.active: self._record(OP_CHECK)
+
+    def tick(self, engine):
+        if not self.buffer:
+            return
+        if self.records >= FLUSH_RECORDS or time.time() - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+        if self.logged >= COMPACT_RECORDS:
+            self.start(engine.to_dict())
+
+    def flush(self):
+        # one framed write; no fsync, so a batch survives a crash of the game but not of the OS
+        with self.lock:
+            if self.log is None or not self.buffer:
+                return
+            self.log.write(FRAME.pack(len(self.buffer), zlib.crc32(self.buffer)) + self.buffer)
+            self.log.flush()
+            self.logged += self.records
+            self.buffer = bytearray(); self.records = 0; self.last_flush = time.time()
+
+    # snapshots
+    def start(self, data):
+        # begin a new base snapshot from engine.to_dict(); moves recorded until it is written
+        # stay buffered
+        with self.lock:
+            self._close_log()
+            self.buffer = bytearray(); self.records = 0; self.logged = 0
+            self.active = True; self.generation += 1
+            generation = self.generation
+            self.geo = geometry_of(data["puzzle"])
+        self.writer.submit(self.snapshot_path, data, "autosave", lambda payload: self._open_log(payload, generation))
+
+    def _open_log(self, payload, generation):
+        # save thread, once the snapshot is on disk: start its log. A crash between the two
+        # leaves an old log whose header names another snapshot, and replay ignores it.
+        with self.lock:
+            if generation != self.generation:
+                return  # a newer snapshot is already queued behind this one
+            self._close_log()
+            self.log = open(self.log_path, "wb")
+            self.log.write(LOG_HEADER.pack(MAGIC, snapshot_id(payload)))
+            self.log.flush()
+
+    def _close_log(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    def close(self, engine):
+        # clean exit: fold the log into the snapshot so the next start replays nothing
+        self.writer.wait()
+        if not self.active:
+            return  # nothing played this session; leave any earlier autosave alone
+        with self.lock:
+            self._close_log()
+            self.buffer = bytearray(); self.records = 0
+        if engine.puzzle_completed:
+            self.discard(); self.writer.wait()
+            return
+        payload = encode_save(engine.to_dict())
+        write_atomic(self.snapshot_path, payload)
+        self._open_log(payload, self.generation)
+        with self.lock:
+            self._close_log()
+
+    def discard(self):
+        # the files are deleted on the save thread, behind any snapshot still queued there (which
+        # would otherwise recreate one after the delete), so the caller never waits on the disk
+        with self.lock:
+            self._close_log()
+            self.buffer = bytearray(); self.records = 0
+            self.active = False; self.generation += 1
+        self.writer.call(self._remove_files, "autosave")
+
+    def _remove_files(self):
+        for path in (self.snapshot_path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # recovery
+    def recover(self, engine):
+        # load the snapshot into engine and replay the log; returns the number of moves
+        # replayed. Raises SaveCorrupted or OSError if the snapshot itself is unusable.
+        with open(self.snapshot_path, "rb") as f:
+            payload = f.read()
+        journal, engine.journal = engine.journal, None
+        try:
+            engine.load_dict(decode_save(payload))
+            replayed = 0; n = engine.geo.size
+            for op, args in self._read_log(snapshot_id(payload)):
+                if op == OP_SET:
+                    engine.set_cell(args[0] // n, args[0] % n, engine.geo.digits[args[1] - 1] if args[1] else '.')
+                elif op == OP_UNDO:
+                    engine.undo()
+                elif op == OP_HINT:
+                    engine.hint(cell=(args[0] // n, args[0] % n))
+                elif op == OP_CHECK:
+                    engine.check_solution()
+                elif op == OP_MARKS:
+                    engine.toggle_marks(args[0] // n, args[0] % n, args[1])
+                replayed += 1
+        finally:
+            engine.journal = journal
+        return replayed
+
+    def _read_log(self, base):
+        try:
+            with open(self.log_path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return
+        if len(raw) < LOG_HEADER.size or LOG_HEADER.unpack_from(raw) != (MAGIC, base):
+            return
+        pos = LOG_HEADER.size
+        while pos + FRAME.size <= len(raw):
+            length, crc = FRAME.unpack_from(raw, pos)
+            records = raw[pos + FRAME.size:pos + FRAME.size + length]
+            if len(records) < length or zlib.crc32(records) != crc:
+                return  # torn last write
+            pos += FRAME.size + length
+            i = 0
+            while i < len(records):
+                op = records[i]
+                if op not in RECORD_ARGS:
+                    raise SaveCorrupted(f"unknown journal record {op}")
+                fmt = RECORD_ARGS[op]
+                if fmt is None:
+                    yield op, ()
+                    i += 1
+                else:
+                    yield op, fmt.unpack_from(records, i + 1)
+                    i += 1 + fmt.size
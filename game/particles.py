@@ -1,19 +1,84 @@
+import numpy as np
 import pygame
-import random
 from game.constants import *
 
-class Particle:
-    def __init__(self, x, y):
-        self.x = x; self.y = y
-        self.vx = random.uniform(-2,2); self.vy = random.uniform(-5,-1)
-        self.size = random.randint(5,15)
-        self.color = random.choice([RED,GREEN,BLUE,YELLOW,PURPLE])
-        self.life = random.uniform(30,60)
+PARTICLE_COLORS = [RED, GREEN, BLUE, YELLOW, PURPLE]
+MIN_SIZE, MAX_SIZE = 5, 15  # sprite diameters
+ALPHA_LEVELS = 8  # sprites are pre-rendered at this many fade steps
+
+
+class ParticleSystem:
+    # Structure of arrays: particle i lives at index i of every array, and the first
+    # `count` entries are alive. Dead particles are swap-removed so the live range stays packed.
+    def __init__(self, capacity=8192, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.seed = seed; self.rng = None  # numpy.random is imported on the first emit, not at startup
+        self.x = np.zeros(capacity, np.float32); self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32); self.vy = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.size = np.zeros(capacity, np.int32); self.color = np.zeros(capacity, np.int32)
+        self.arrays = (self.x, self.y, self.vx, self.vy, self.life, self.size, self.color)
+        self.sheet = None  # every sprite, indexed as in sprite_index; rendered on the first draw
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, n, x_range, y_range):
+        n = max(0, min(n, self.capacity - self.count))
+        s = slice(self.count, self.count + n)
+        if self.rng is None:
+            self.rng = np.random.default_rng(self.seed)
+        rng = self.rng
+        self.x[s] = rng.integers(x_range[0], x_range[1] + 1, n); self.y[s] = rng.integers(y_range[0], y_range[1] + 1, n)
+        self.vx[s] = rng.uniform(-2, 2, n); self.vy[s] = rng.uniform(-5, -1, n)
+        self.size[s] = rng.integers(MIN_SIZE, MAX_SIZE + 1, n)
+        self.color[s] = rng.integers(0, len(PARTICLE_COLORS), n)
+        self.life[s] = rng.uniform(30, 60, n)
+        self.count += n
+
     def update(self):
-        self.x += self.vx; self.y += self.vy; self.vy += 0.1; self.life -= 1
+        n = self.count
+        self.x[:n] += self.vx[:n]; self.y[:n] += self.vy[:n]
+        self.vy[:n] += 0.1; self.life[:n] -= 1
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if len(dead):
+            alive = n - len(dead)
+            # holes inside the new live range are filled from live particles beyond it
+            holes = dead[dead < alive]
+            movers = np.setdiff1d(np.arange(alive, n), dead, assume_unique=True)
+            for a in self.arrays:
+                a[holes] = a[movers]
+            self.count = alive
+
+    def sprite(self, size, color, level):
+        alpha = level * 255 // (ALPHA_LEVELS - 1)
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(surf, (*PARTICLE_COLORS[color][:3], alpha), (size//2, size//2), size//2)
+        return surf
+
+    def sprite_index(self, size, color, level):
+        # works on scalars and on NumPy arrays alike
+        return ((size - MIN_SIZE) * len(PARTICLE_COLORS) + color) * ALPHA_LEVELS + level
+
     def draw(self, screen):
-        alpha = min(255, max(0, int(self.life * 4)))
-        if alpha > 0:
-            surf = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-            pygame.draw.circle(surf, (*self.color[:3], alpha), (self.size//2, self.size//2), self.size//2)
-            screen.blit(surf, (int(self.x), int(self.y)))
+        n = self.count
+        if not n:
+            return
+        if self.sheet is None:
+            # a few hundred small surfaces, made up front so no frame pays for a new one
+            self.sheet = [self.sprite(size, color, level) for size in range(MIN_SIZE, MAX_SIZE + 1)
+                          for color in range(len(PARTICLE_COLORS)) for level in range(ALPHA_LEVELS)]
+        alpha = np.clip(self.life[:n] * 4, 0, 255)
+        levels = np.rint(alpha * (ALPHA_LEVELS - 1) / 255).astype(np.int32)
+        w, h = screen.get_size(); x, y = self.x[:n], self.y[:n]
+        visible = np.flatnonzero((levels > 0) & (x > -MAX_SIZE) & (x < w) & (y > -MAX_SIZE) & (y < h))
+        # the per-particle Python work is one list lookup, and blits takes its pairs straight
+        # from zip, which reuses its tuples: no per-particle objects for the garbage collector
+        # to wade through, which is what used to stretch the slowest frames
+        keys = self.sprite_index(self.size[visible], self.color[visible], levels[visible]).tolist()
+        xs = self.x[visible].astype(np.int32).tolist(); ys = self.y[visible].astype(np.int32).tolist()
+        screen.blits(zip(map(self.sheet.__getitem__, keys), zip(xs, ys)), doreturn=False)
@@ -0,0 +1,88 @@
+import os
+import threading
+from collections import deque
+from .constants import DIFFICULTY_LEVELS, PUZZLE_QUEUE_SIZE
+
+
+def _produce(difficulty):
+    from .generator import generate_puzzle
+    return generate_puzzle(difficulty)
+
+
+def _generate(difficulty, size, variant):
+    # a one-off board of a kind the queues do not keep: (puzzle, solution, constraints)
+    from .generator import generate_puzzle, generate_variant
+    if variant:
+        return generate_variant(variant, difficulty, size=size)
+    return generate_puzzle(difficulty, size=size) + ((),)
+
+
+class PuzzleProducer:
+    # Keeps up to queue_size ready puzzles per difficulty, generated in worker processes
+    # so the render loop never waits on generation or grading. generate() runs a single
+    # board of any other kind (the big sizes take seconds) on the same workers.
+    def __init__(self, queue_size=PUZZLE_QUEUE_SIZE, workers=None):
+        self.queue_size = queue_size
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.ready = {d: deque() for d in DIFFICULTY_LEVELS}
+        self.pending = {d: 0 for d in DIFFICULTY_LEVELS}
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def start(self):
+        self._spawn()
+        self.refill()
+
+    def _spawn(self):
+        # spawn rather than fork: the parent already holds SDL state and threads
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        if not self.executor:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def generate(self, difficulty, size=9, variant=None):
+        # a Future of (puzzle, solution, constraints); starts the workers if the queues
+        # never did (as with a puzzle bank)
+        self._spawn()
+        return self.executor.submit(_generate, difficulty, size, variant)
+
+    def refill(self):
+        if not self.executor:
+            return
+        submitted = []
+        with self.lock:
+            for difficulty in self.ready:
+                while len(self.ready[difficulty]) + self.pending[difficulty] < self.queue_size:
+                    try:
+                        future = self.executor.submit(_produce, difficulty)
+                    except RuntimeError:  # executor shut down
+                        break
+                    self.pending[difficulty] += 1
+                    submitted.append((difficulty, future))
+        # outside the lock: a future that has already finished runs its callback right here,
+        # and _done takes the lock itself
+        for difficulty, future in submitted:
+            future.add_done_callback(lambda f, d=difficulty: self._done(d, f))
+
+    def _done(self, difficulty, future):
+        with self.lock:
+            self.pending[difficulty] -= 1
+            if future.cancelled():
+                return
+            if future.exception():
+                print("Puzzle generation failed:", future.exception())
+                return
+            self.ready[difficulty].append(future.result())
+
+    def pop(self, difficulty):
+        # (puzzle, solution) if one is ready, otherwise None
+        with self.lock:
+            queue = self.ready.get(difficulty)
+            item = queue.popleft() if queue else None
+        self.refill()
+        return item
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,61 @@
+import csv
+import time
+from collections import deque
+
+PHASES = ("events", "hover", "update", "draw", "flip")
+
+
+class FrameProfiler:
+    # Per-frame phase timings kept in a ring buffer of the last `capacity` frames.
+    # The main loop calls begin_frame(), mark(phase) after each phase, then end_frame().
+    def __init__(self, capacity=900):
+        self.samples = deque(maxlen=capacity)  # (timestamp, frame interval ms, phase ms...)
+        self.visible = False
+        self.last_frame_start = None
+        self.last_mark = time.perf_counter()
+        self.interval = 0.0
+        self.current = {}
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        self.interval = (now - self.last_frame_start) * 1000 if self.last_frame_start else 0.0
+        self.last_frame_start = now
+        self.last_mark = now
+        self.current = {}
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self):
+        self.samples.append((time.time(), self.interval) + tuple(self.current.get(p, 0.0) for p in PHASES))
+
+    def stats(self):
+        if not self.samples:
+            return None
+        work = sorted(sum(s[2:]) for s in self.samples)
+        intervals = [s[1] for s in self.samples if s[1] > 0]
+        n = len(self.samples)
+        return {
+            "fps": 1000 * len(intervals) / sum(intervals) if intervals else 0.0,
+            "p50": work[n // 2],
+            "p99": work[min(n - 1, int(n * 0.99))],
+            "phases": {p: sum(s[2 + k] for s in self.samples) / n for k, p in enumerate(PHASES)},
+        }
+
+    def overlay_lines(self):
+        stats = self.stats()
+        if not stats:
+            return ["collecting..."]
+        lines = [f"FPS {stats['fps']:.1f}", f"frame p50 {stats['p50']:.2f} ms", f"frame p99 {stats['p99']:.2f} ms"]
+        lines += [f"{p} {ms:.2f} ms" for p, ms in stats["phases"].items()]
+        return lines
+
+    def dump_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("time", "interval_ms") + tuple(f"{p}_ms" for p in PHASES))
+            for sample in self.samples:
+                writer.writerow([f"{v:.4f}" for v in sample])
+        return len(self.samples)
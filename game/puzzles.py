@@ -1,39 +1,83 @@
-import os
 import random
+from .constants import DIFFICULTY_FILL
+from .geometry import STANDARD, geometry_of
+from .solver import _propagate, solve_state, state_for
 
-PUZZLE_CONTENTS = {
-    "puzzle1.txt":[ "534678912","672195348","198342567","859761423","426853791","713924856","961537284","287419635","345286179"],
-    "puzzle1S.txt":[ "534678912","672195348","198342567","859761423","426853791","713924856","961537284","287419635","345286179"],
-    "puzzle2.txt":[ "435269781","682571493","197834562","826195347","374682915","951743628","519326874","248957136","763418259"],
-    "puzzle2S.txt":[ "435269781","682571493","197834562","826195347","374682915","951743628","519326874","248957136","763418259"],
-    "puzzle3.txt":[ "245981376","169273584","837564219","976125438","513498627","482736195","391657842","728349651","654812793"],
-    "puzzle3S.txt":[ "245981376","169273584","837564219","976125438","513498627","482736195","391657842","728349651","654812793"],
-    "puzzle4.txt":[ "123456789","456789123","789123456","234567891","567891234","891234567","345678912","678912345","912345678"],
-    "puzzle4S.txt":[ "123456789","456789123","789123456","234567891","567891234","891234567","345678912","678912345","912345678"],
-    "puzzle5.txt":[ "534678912","672195348","198342567","859761423","426853791","713924856","961537284","287419635","345286179"],
-    "puzzle5S.txt":[ "534678912","672195348","198342567","859761423","426853791","713924856","961537284","287419635","345286179"],
-    "puzzle6.txt":[ "795836421","431297856","286145397","814753962","659421738","372968145","928514673","163782594","547693281"],
-    "puzzle6S.txt":[ "795836421","431297856","286145397","814753962","659421738","372968145","928514673","163782594","547693281"]
-}
+def _has_other_solution(state, i, d):
+    # The board minus cell i is ambiguous iff some digit other than d at i still solves;
+    # stop at the first such solution instead of counting all of them.
+    cand = state.candidates(i) & ~(1 << (d - 1))
+    for e in range(1, state.geo.size + 1):
+        if cand >> (e - 1) & 1:
+            child = state.copy()
+            child.place(i, e)
+            if solve_state(child) is not None:
+                return True
+    return False
 
-PUZZLE_DIR = os.path.join(os.path.dirname(__file__), "puzzle")
+def _not_single(state, i, d):
+    # For boards too big to search (12x12 and up): keep a hole only if cell i is a naked or
+    # hidden single on the board as it now stands. Holes dug this way can be filled back in
+    # reverse order by singles alone, so the puzzle keeps a single solution, and each test
+    # looks at three units instead of solving.
+    bit = 1 << (d - 1)
+    if state.candidates(i) == bit:
+        return False
+    geo = state.geo; n = geo.size
+    for unit in (geo.units[geo.row_of[i]], geo.units[n + geo.col_of[i]], geo.units[2 * n + geo.box_of[i]]):
+        if not any(j != i and state.candidates(j) & bit for j in unit):
+            return False
+    return True
 
-def initialize_puzzle_files():
-    if not os.path.exists(PUZZLE_DIR):
-        os.makedirs(PUZZLE_DIR)
-    for filename, content in PUZZLE_CONTENTS.items():
-        file_path = os.path.join(PUZZLE_DIR, filename)
-        if not os.path.exists(file_path):
-            with open(file_path, 'w') as f:
-                for line in content:
-                    f.write(line + "\n")
+def _not_refuted(state, i, d):
+    # The big-board stand-in for _has_other_solution: the hole is dug only if singles alone
+    # rule out every other digit at i. Anything propagation cannot settle counts as
+    # ambiguous, so no search is ever started.
+    cand = state.candidates(i) & ~(1 << (d - 1))
+    for e in range(1, state.geo.size + 1):
+        if cand >> (e - 1) & 1:
+            child = state.copy()
+            child.place(i, e)
+            if _propagate(child):
+                return True
+    return False
 
-def randomize_puzzle(puzzle, difficulty, difficulty_levels):
+def randomize_puzzle(puzzle, difficulty, difficulty_levels, unique=True, rng=None, rules=None):
+    # difficulty_levels gives the givens for a 9x9 board; other sizes keep DIFFICULTY_FILL
+    # of their cells. rules (variants.Rules) is what uniqueness is judged under; variant
+    # boards are dug with the full search whatever their size.
+    rng = rng or random
+    geo = geometry_of(puzzle); n = geo.size
     puzzle_copy = [row[:] for row in puzzle]
-    cells_to_hide = 81 - difficulty_levels.get(difficulty, 40)
-    all_positions = [(r, c) for r in range(9) for c in range(9)]
-    random.shuffle(all_positions)
-    for i in range(min(cells_to_hide, 81)):
-        r, c = all_positions[i]
-        puzzle_copy[r][c] = '.'
-    return puzzle_copy
\ No newline at end of file
+    if geo is STANDARD:
+        givens = difficulty_levels.get(difficulty, 40)
+    else:
+        givens = round(geo.cells * DIFFICULTY_FILL.get(difficulty, 0.5))
+    cells_to_hide = geo.cells - givens
+    all_positions = [(r, c) for r in range(n) for c in range(n)]
+    rng.shuffle(all_positions)
+    if not unique:
+        for i in range(min(cells_to_hide, geo.cells)):
+            r, c = all_positions[i]
+            puzzle_copy[r][c] = '.'
+        return puzzle_copy
+    # dig holes one at a time, keeping only removals that leave a single solution;
+    # the state's masks are updated in place so no removal needs a full rebuild
+    state = state_for(puzzle_copy, rules)
+    hidden = 0
+    # big boards: the quick singles test first, then refutation by propagation for what remains
+    big = n > 9 and (rules is None or not rules.constraints)
+    for keep in ((_not_single, _not_refuted) if big else (_has_other_solution,)):
+        for r, c in all_positions:
+            if hidden >= cells_to_hide:
+                break
+            i = r * n + c
+            if puzzle_copy[r][c] == '.':
+                continue
+            d = state.remove(i)
+            if keep(state, i, d):
+                state.place(i, d)
+            else:
+                puzzle_copy[r][c] = '.'
+                hidden += 1
+    return puzzle_copy
@@ -0,0 +1,272 @@
+import pygame
+from collections import OrderedDict
+from game.constants import BLACK, DARK_GRAY, LIGHT_BLUE, VARIANT_GRAY, WHITE
+from game.variants import plain_rules
+
+
+class DirtyTracker:
+    # Remembers the last (rect, key) drawn for each named region. When a region's key
+    # or rect changes both the old and new rects become dirty, so only they get redrawn.
+    def __init__(self):
+        self.regions = {}
+        self.dirty = []
+        self.full = True
+
+    def track(self, name, rect, key):
+        rect = pygame.Rect(rect)
+        prev = self.regions.get(name)
+        if prev is not None and prev[0] == rect and prev[1] == key:
+            return
+        if prev is not None:
+            self.dirty.append(prev[0])
+        self.dirty.append(rect)
+        self.regions[name] = (rect, key)
+
+    def forget(self, prefix):
+        # drop regions that are no longer drawn (e.g. a closed dialog), dirtying their rects
+        for name in [n for n in self.regions if n.startswith(prefix)]:
+            self.dirty.append(self.regions.pop(name)[0])
+
+    def invalidate(self):
+        self.full = True
+
+    def take(self):
+        full, rects = self.full, self.dirty
+        self.full = False
+        self.dirty = []
+        return full, rects
+
+
+def button_rect(button):
+    # area a Button/ImageButton can touch: its rect plus drop shadow and press offset
+    return button.rect.union(button.rect.move(2, 6))
+
+
+def button_key(button):
+    return (getattr(button, "text", None), getattr(button, "enabled", True), button.is_hovered, button.is_pressed)
+
+
+class TextCache:
+    # LRU cache of rendered text surfaces keyed by (font, text, color), so static labels
+    # and grid digits are rasterized once and then only blitted.
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, tuple(color))
+        surf = self.surfaces.get(key)
+        if surf is None:
+            surf = font.render(text, True, color)
+            self.surfaces[key] = surf
+            if len(self.surfaces) > self.maxsize:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surf
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color):
+    return text_cache.render(font, text, color)
+
+
+class GlyphAtlas:
+    # A set of glyphs rendered once side by side on one surface, each drawn afterwards as a
+    # sub-rect blit, so a cell full of pencil marks costs a few blits and no text rendering.
+    def __init__(self, font, glyphs, color):
+        surfaces = [font.render(g, True, color) for g in glyphs]
+        w = max(s.get_width() for s in surfaces); h = max(s.get_height() for s in surfaces)
+        self.surface = pygame.Surface((w * len(glyphs), h), pygame.SRCALPHA)
+        self.rects = {}
+        for i, (g, s) in enumerate(zip(glyphs, surfaces)):
+            rect = s.get_rect(center=(i * w + w // 2, h // 2))
+            self.surface.blit(s, rect)
+            self.rects[g] = rect
+
+    def blit(self, dest, glyph, center):
+        area = self.rects[glyph]
+        dest.blit(self.surface, area.move(center[0] - area.centerx, center[1] - area.centery), area)
+
+
+def _dashed_line(layer, color, start, end, dash=4, gap=3):
+    # horizontal or vertical only; dashes line up with the layer's origin so neighbouring
+    # segments continue each other's pattern
+    (x0, y0), (x1, y1) = start, end
+    step = dash + gap
+    if y0 == y1:
+        for x in range(x0 - x0 % step, x1 + 1, step):
+            if max(x, x0) <= min(x + dash - 1, x1):
+                pygame.draw.line(layer, color, (max(x, x0), y0), (min(x + dash - 1, x1), y0))
+    else:
+        for y in range(y0 - y0 % step, y1 + 1, step):
+            if max(y, y0) <= min(y + dash - 1, y1):
+                pygame.draw.line(layer, color, (x0, max(y, y0)), (x0, min(y + dash - 1, y1)))
+
+
+def _draw_diagonals(renderer, layer, con):
+    n = renderer.geo.size
+    first, last = renderer.cell_rect(0, 0), renderer.cell_rect(n - 1, n - 1)
+    pygame.draw.line(layer, VARIANT_GRAY, first.topleft, last.bottomright, 3)
+    pygame.draw.line(layer, VARIANT_GRAY, (last.right, first.top), (first.left, last.bottom), 3)
+
+
+def _draw_thermo(renderer, layer, con):
+    n = renderer.geo.size; size = renderer.cell_size
+    centers = [renderer.cell_rect(i // n, i % n).center for i in con.cells]
+    width = max(4, size // 4)
+    pygame.draw.lines(layer, VARIANT_GRAY, False, centers, width)
+    for center in centers[1:]:
+        pygame.draw.circle(layer, VARIANT_GRAY, center, width // 2)  # round off joints and the tip
+    pygame.draw.circle(layer, VARIANT_GRAY, centers[0], size * 7 // 20)
+
+
+def _draw_cage(renderer, layer, con):
+    # a dashed outline just inside the cage's edge, and its sum in the corner of its first cell
+    n = renderer.geo.size; inset = max(3, renderer.cell_size // 10)
+    cells = set(con.cells)
+
+    def inside(r, c):
+        return 0 <= r < n and 0 <= c < n and r * n + c in cells
+
+    for i in con.cells:
+        r, c = i // n, i % n; rect = renderer.cell_rect(r, c)
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            if inside(r + dr, c + dc):
+                continue
+            # each end of this side stops short of the corner, meets the cage's next cell
+            # or, round an inner corner, runs on to meet the side coming the other way
+            ends = []
+            for s in (-1, 1):
+                ar, ac = r + s * abs(dc), c + s * abs(dr)
+                ends.append(-inset if not inside(ar, ac) else 0 if not inside(ar + dr, ac + dc) else inset)
+            if dr:
+                y = rect.top + inset if dr < 0 else rect.bottom - 1 - inset
+                _dashed_line(layer, DARK_GRAY, (rect.left - ends[0], y), (rect.right - 1 + ends[1], y))
+            else:
+                x = rect.left + inset if dc < 0 else rect.right - 1 - inset
+                _dashed_line(layer, DARK_GRAY, (x, rect.top - ends[0]), (x, rect.bottom - 1 + ends[1]))
+    if renderer.label_font:
+        label = render_text(renderer.label_font, str(con.total), DARK_GRAY)
+        rect = renderer.cell_rect(con.cells[0] // n, con.cells[0] % n)
+        spot = label.get_rect(topleft=(rect.left + 2, rect.top + 2))
+        layer.fill(WHITE, spot); layer.blit(label, spot)
+
+
+# how each variant kind is drawn over the grid lines, keyed like variants.VARIANTS; jigsaw
+# needs nothing here, since the thick lines already follow the rules' regions
+DECORATIONS = {"diagonal": _draw_diagonals, "killer": _draw_cage, "thermo": _draw_thermo}
+
+
+class BoardRenderer:
+    # The board is composited from three layers: the background, grid lines and variant
+    # markings (drawn once), the givens (rebuilt only when the original puzzle changes) and
+    # the player's digits and pencil marks (redrawn cell by cell as they change). One
+    # renderer draws one board shape and set of rules (see variants.Rules); size is the
+    # board's width in pixels, cell_size * geo.size.
+    MARGIN = 2
+
+    def __init__(self, font, x, y, size, cell_size, mark_font=None, rules=None):
+        rules = rules or plain_rules()
+        geo = rules.geo
+        self.font = font
+        self.rules = rules; self.geo = geo
+        self.marks = GlyphAtlas(mark_font, geo.digits, DARK_GRAY) if mark_font else None
+        self.label_font = mark_font
+        self.pos = (x - self.MARGIN, y - self.MARGIN)
+        self.cell_size = cell_size
+        layer_size = (size + 2 * self.MARGIN, size + 2 * self.MARGIN)
+        self.base = pygame.Surface(layer_size, pygame.SRCALPHA)
+        pygame.draw.rect(self.base, WHITE, (self.MARGIN, self.MARGIN, size, size))
+        boxes = rules.box_of is geo.box_of
+        for i in range(geo.size + 1):
+            p = self.MARGIN + i * cell_size
+            # box edges are thick: every box_cols columns and every box_rows rows
+            edge = i in (0, geo.size)
+            pygame.draw.line(self.base, BLACK, (p, self.MARGIN), (p, self.MARGIN + size), 3 if edge or boxes and i % geo.box_cols == 0 else 1)
+            pygame.draw.line(self.base, BLACK, (self.MARGIN, p), (self.MARGIN + size, p), 3 if edge or boxes and i % geo.box_rows == 0 else 1)
+        if not boxes:
+            self.draw_regions()
+        for con in rules.constraints:
+            draw = DECORATIONS.get(con.kind)
+            if draw:
+                draw(self, self.base, con)
+        self.givens = pygame.Surface(layer_size, pygame.SRCALPHA)
+        self.overlay = pygame.Surface(layer_size, pygame.SRCALPHA)
+        self.givens_key = None
+        self.overlay_cells = {}
+
+    def draw_regions(self):
+        # jigsaw regions: a thick line wherever two neighbouring cells are in different ones
+        n = self.geo.size; region = self.rules.box_of
+        for i in range(self.geo.cells):
+            r, c = i // n, i % n; rect = self.cell_rect(r, c)
+            if c + 1 < n and region[i] != region[i + 1]:
+                pygame.draw.line(self.base, BLACK, (rect.right, rect.top - 1), (rect.right, rect.bottom + 1), 3)
+            if r + 1 < n and region[i] != region[i + n]:
+                pygame.draw.line(self.base, BLACK, (rect.left - 1, rect.bottom), (rect.right + 1, rect.bottom), 3)
+
+    def cell_rect(self, r, c):
+        return pygame.Rect(self.MARGIN + c * self.cell_size, self.MARGIN + r * self.cell_size, self.cell_size, self.cell_size)
+
+    def blit_digit(self, layer, r, c, value, color):
+        txt = render_text(self.font, value, color)
+        layer.blit(txt, txt.get_rect(center=self.cell_rect(r, c).center))
+
+    def update_givens(self, original):
+        key = tuple(map(tuple, original)) if original else None
+        if key == self.givens_key:
+            return
+        self.givens_key = key
+        self.givens.fill((0, 0, 0, 0))
+        self.overlay.fill((0, 0, 0, 0))
+        self.overlay_cells = {}
+        for r, row in enumerate(original or []):
+            for c, value in enumerate(row):
+                if value != '.':
+                    self.blit_digit(self.givens, r, c, value, BLACK)
+
+    def blit_marks(self, layer, r, c, mask):
+        # marks are laid out like a box: digit d (0-based) in row d // box_cols, column d % box_cols
+        geo = self.geo
+        rect = self.cell_rect(r, c); step_x = self.cell_size / geo.box_cols; step_y = self.cell_size / geo.box_rows
+        for d in range(geo.size):
+            if mask >> d & 1:
+                self.marks.blit(layer, geo.digits[d], (rect.x + int(step_x * (d % geo.box_cols + 0.5)), rect.y + int(step_y * (d // geo.box_cols + 0.5))))
+
+    def update_overlay(self, puzzle, original, cell_color, marks=None):
+        n = self.geo.size
+        for r in range(n):
+            for c in range(n):
+                if original[r][c] != '.':
+                    continue
+                value = puzzle[r][c]
+                if value != '.':
+                    entry = (value, cell_color(r, c))
+                else:
+                    entry = ('', marks[r][c]) if marks and marks[r][c] and self.marks else None
+                if self.overlay_cells.get((r, c)) == entry:
+                    continue
+                self.overlay.fill((0, 0, 0, 0), self.cell_rect(r, c))
+                if entry:
+                    if entry[0]:
+                        self.blit_digit(self.overlay, r, c, *entry)
+                    else:
+                        self.blit_marks(self.overlay, r, c, entry[1])
+                    self.overlay_cells[(r, c)] = entry
+                else:
+                    self.overlay_cells.pop((r, c), None)
+
+    def draw(self, screen, puzzle, original, cell_color, selected, marks=None):
+        screen.blit(self.base, self.pos)
+        if selected:
+            r, c = selected
+            rect = self.cell_rect(r, c).move(self.pos)
+            pygame.draw.rect(screen, LIGHT_BLUE, rect, 3)
+        if puzzle and original:
+            self.update_givens(original)
+            self.update_overlay(puzzle, original, cell_color, marks)
+            screen.blit(self.givens, self.pos)
+            screen.blit(self.overlay, self.pos)
@@ -0,0 +1,269 @@
+import struct
+import zlib
+from .bank import pack_grid, unpack_grid
+from .constants import GREEN, RED
+from .engine import CHECK_INSTRUCTIONS, DEFAULT_INSTRUCTIONS, MARK
+from .geometry import STANDARD, geometry, geometry_of
+from .solver import solve
+from .variants import load_constraints, make_rules
+
+# Binary save layout (little-endian), replacing the nested-list JSON saves. n is the board
+# size (9 for the standard board) and all sizes below are for n x n cells:
+#   header      magic, version, box shape (rows << 4 | cols), difficulty, flags, hints left,
+#               selected cell (u16), start/paused/save time
+#   strings     instructions code (or 255 + literal), puzzle name
+#   source      [kind, difficulty, varint bank index or seed] when FLAG_SOURCE is set; only early
+#               version 5 saves have one, and it is skipped on load
+#   variant     when FLAG_VARIANT is set: varint count and the constraint kind names used, then
+#               varint count of constraints, each a varint kind index, a varint count and that
+#               many varints (variants.Constraint.to_data)
+#   grids       original and current board (9x9: 4 bits a cell, 41 bytes each; otherwise
+#               bit_length(n) bits a cell), then the solution only when it is not simply the
+#               unique solution of the original board under its rules (always, on other sizes:
+#               re-solving a 25x25 board can take a second or more)
+#   cell masks  one bit a cell: green, red and editable masks
+#   marks       pencil marks, n bits a cell, when FLAG_MARKS is set
+#   history     varint count, then one varint per move: zigzag(cell - previous cell) * (2n + 3) + kind,
+#               where kind is the old digit (0-n), plus n + 1 when a varint mask of the peers that lost a
+#               pencil mark follows, or 2n + 2 for a pencil-mark edit followed by a varint of the marks toggled
+#   trailer     crc32 of everything before it
+# Version 4 had no variant section; version 3 also had no box shape and a one-byte selected
+# cell (255 for none), and was always 9x9; version 2 also had no marks and only the old digit
+# for a move (kinds 0-9).
+MAGIC = b"SDKS"
+VERSION = 5
+HEADER = struct.Struct("<4sBBBBBHddd")
+HEADER_V3 = struct.Struct("<4sBBBBBddd")
+CRC = struct.Struct("<I")
+NO_CELL = 0xFFFF
+DIFFICULTIES = ("beginner", "normal", "advanced")
+INSTRUCTIONS = (DEFAULT_INSTRUCTIONS, CHECK_INSTRUCTIONS)
+
+FLAG_CHECK_MODE = 1
+FLAG_COMPLETED = 2
+FLAG_SOLUTION = 4
+FLAG_SOURCE = 8
+FLAG_NAME = 16
+FLAG_MARKS = 32
+FLAG_VARIANT = 64
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(buf, pos):
+    n = shift = 0
+    while True:
+        b = buf[pos]; pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def write_string(out, text):
+    raw = text.encode()
+    write_varint(out, len(raw)); out += raw
+
+
+def read_string(buf, pos):
+    n, pos = read_varint(buf, pos)
+    return bytes(buf[pos:pos + n]).decode(), pos + n
+
+
+def _bytes(bits):
+    return (bits + 7) // 8
+
+
+def _mask(cells, geo):
+    m = 0
+    for r, c in cells:
+        m |= 1 << (r * geo.size + c)
+    return m.to_bytes(_bytes(geo.cells), "little")
+
+
+def _cells(raw, geo):
+    m = int.from_bytes(raw, "little")
+    return [(i // geo.size, i % geo.size) for i in range(geo.cells) if m >> i & 1]
+
+
+def _grid_bytes(geo):
+    return 41 if geo is STANDARD else _bytes(geo.cells * geo.size.bit_length())
+
+
+def _pack_grid(grid, geo):
+    if geo is STANDARD:
+        return pack_grid(grid)
+    bits = geo.size.bit_length(); m = 0
+    for i, ch in enumerate(ch for row in grid for ch in row):
+        m |= geo.value(ch) << (i * bits)
+    return m.to_bytes(_grid_bytes(geo), "little")
+
+
+def _unpack_grid(raw, geo):
+    if geo is STANDARD:
+        return unpack_grid(raw)
+    n = geo.size; bits = n.bit_length(); m = int.from_bytes(raw, "little"); top = (1 << bits) - 1
+    values = [m >> (i * bits) & top for i in range(geo.cells)]
+    return [[geo.digits[v - 1] if v else '.' for v in values[r * n:r * n + n]] for r in range(n)]
+
+
+def _code(value, table, missing=255):
+    return table.index(value) if value in table else missing
+
+
+def encode(data):
+    # data is SudokuEngine.to_dict(); see the layout above
+    original, solution = data["original_puzzle"], data["solution"]
+    geo = geometry_of(original); n = geo.size
+    name = data.get("current_puzzle_name")
+    variant = data.get("variant") or []
+    rules = make_rules(geo, load_constraints(variant))
+    explicit_solution = geo is not STANDARD or solve(original, rules=rules) != solution
+    marks = 0
+    for i, m in enumerate(m for row in data.get("pencil_marks") or [] for m in row):
+        marks |= m << (i * n)
+    flags = ((FLAG_CHECK_MODE if data.get("solution_check_mode") else 0) | (FLAG_COMPLETED if data.get("puzzle_completed") else 0) |
+             (FLAG_SOLUTION if explicit_solution else 0) | (FLAG_NAME if name is not None else 0) | (FLAG_MARKS if marks else 0) |
+             (FLAG_VARIANT if variant else 0))
+    selected = data.get("selected_cell")
+    out = bytearray(HEADER.pack(MAGIC, VERSION, geo.box_rows << 4 | geo.box_cols, _code(data.get("current_difficulty"), DIFFICULTIES), flags,
+                                max(0, min(255, data.get("hints_remaining") or 0)),
+                                selected[0] * n + selected[1] if selected else NO_CELL,
+                                data.get("start_time") or 0.0, data.get("paused_time") or 0.0, data.get("save_time") or 0.0))
+    instructions = data.get("instructions", DEFAULT_INSTRUCTIONS)
+    out.append(_code(instructions, INSTRUCTIONS))
+    if instructions not in INSTRUCTIONS:
+        write_string(out, instructions)
+    if name is not None:
+        write_string(out, name)
+    if variant:
+        kinds = list(dict.fromkeys(kind for kind, *_ in variant))
+        write_varint(out, len(kinds))
+        for kind in kinds:
+            write_string(out, kind)
+        write_varint(out, len(variant))
+        for kind, *args in variant:
+            write_varint(out, kinds.index(kind)); write_varint(out, len(args))
+            for v in args:
+                write_varint(out, v)
+    out += _pack_grid(original, geo); out += _pack_grid(data["puzzle"], geo)
+    if explicit_solution:
+        out += _pack_grid(solution, geo)
+    colors = {}
+    for key, color in data.get("cell_colors", {}).items():
+        if color:
+            r, c = key.strip("()").split(",")
+            colors.setdefault(tuple(color), []).append((int(r), int(c)))
+    out += _mask(colors.get(GREEN, []), geo); out += _mask(colors.get(RED, []), geo)
+    out += _mask(data.get("editable_cells", []), geo)
+    if marks:
+        out += marks.to_bytes(_bytes(geo.cells * n), "little")
+    history = data.get("history", [])
+    write_varint(out, len(history))
+    prev = 0; cleared_kind = n + 1; mark_kind = 2 * n + 2
+    for r, c, old, *extra in history:
+        cell = r * n + c; delta = cell - prev; prev = cell
+        extra = extra[0] if extra else 0
+        kind = mark_kind if old == MARK else geo.value(old) + (cleared_kind if extra else 0)
+        write_varint(out, (delta * 2 if delta >= 0 else -delta * 2 - 1) * (2 * n + 3) + kind)
+        if extra:
+            write_varint(out, extra)
+    out += CRC.pack(zlib.crc32(out))
+    return bytes(out)
+
+
+def decode(raw):
+    if len(raw) < HEADER_V3.size + CRC.size or CRC.unpack_from(raw, len(raw) - CRC.size)[0] != zlib.crc32(raw[:-CRC.size]):
+        raise ValueError("checksum mismatch")
+    version = raw[4]
+    if version in (4, VERSION):
+        magic, version, shape, difficulty, flags, hints, selected, start, paused, saved = HEADER.unpack_from(raw)
+        geo = geometry(shape >> 4, shape & 0xF); pos = HEADER.size
+    elif version in (2, 3):
+        magic, version, difficulty, flags, hints, selected, start, paused, saved = HEADER_V3.unpack_from(raw)
+        geo = STANDARD; pos = HEADER_V3.size
+        selected = NO_CELL if selected == 255 else selected
+    else:
+        raise ValueError(f"unsupported save version {version}")
+    n = geo.size
+    code = raw[pos]; pos += 1
+    if code < len(INSTRUCTIONS):
+        instructions = INSTRUCTIONS[code]
+    else:
+        instructions, pos = read_string(raw, pos)
+    name = None
+    if flags & FLAG_NAME:
+        name, pos = read_string(raw, pos)
+    if flags & FLAG_SOURCE:
+        _, pos = read_varint(raw, pos + 2)
+    variant = []
+    if flags & FLAG_VARIANT:
+        count, pos = read_varint(raw, pos)
+        kinds = []
+        for _ in range(count):
+            kind, pos = read_string(raw, pos); kinds.append(kind)
+        count, pos = read_varint(raw, pos)
+        for _ in range(count):
+            kind, pos = read_varint(raw, pos); length, pos = read_varint(raw, pos)
+            args = []
+            for _ in range(length):
+                v, pos = read_varint(raw, pos); args.append(v)
+            variant.append([kinds[kind]] + args)
+    size = _grid_bytes(geo)
+    original = _unpack_grid(raw[pos:pos + size], geo); puzzle = _unpack_grid(raw[pos + size:pos + 2 * size], geo); pos += 2 * size
+    if flags & FLAG_SOLUTION:
+        solution = _unpack_grid(raw[pos:pos + size], geo); pos += size
+    else:
+        # every puzzle the game deals has exactly one solution, so it is cheaper to re-solve
+        # than to store (the bank does the same)
+        solution = solve(original, rules=make_rules(geo, load_constraints(variant)))
+    size = _bytes(geo.cells)
+    green = _cells(raw[pos:pos + size], geo); red = _cells(raw[pos + size:pos + 2 * size], geo)
+    editable = _cells(raw[pos + 2 * size:pos + 3 * size], geo); pos += 3 * size
+    marks = 0
+    if flags & FLAG_MARKS:
+        size = _bytes(geo.cells * n)
+        marks = int.from_bytes(raw[pos:pos + size], "little"); pos += size
+    count, pos = read_varint(raw, pos)
+    history = []; cell = 0
+    kinds = 10 if version == 2 else 2 * n + 3; cleared_kind = n + 1; mark_kind = 2 * n + 2
+    for _ in range(count):
+        v, pos = read_varint(raw, pos)
+        z, kind = divmod(v, kinds)
+        cell += z // 2 if z % 2 == 0 else -(z + 1) // 2
+        extra = 0
+        if kind >= cleared_kind:
+            extra, pos = read_varint(raw, pos)
+        if kind == mark_kind:
+            history.append([cell // n, cell % n, MARK, extra])
+        else:
+            old = kind % cleared_kind
+            history.append([cell // n, cell % n, geo.digits[old - 1] if old else '.', extra])
+    colors = {str(k): list(GREEN) for k in green}
+    colors.update({str(k): list(RED) for k in red})
+    top = geo.all_digits
+    return {
+        "current_puzzle_name": name,
+        "current_difficulty": DIFFICULTIES[difficulty] if difficulty < len(DIFFICULTIES) else None,
+        "hints_remaining": hints,
+        "puzzle": puzzle,
+        "solution": solution,
+        "original_puzzle": original,
+        "variant": variant,
+        "start_time": start,
+        "paused_time": paused,
+        "history": history,
+        "pencil_marks": [[marks >> ((r * n + c) * n) & top for c in range(n)] for r in range(n)],
+        "selected_cell": [selected // n, selected % n] if selected != NO_CELL else None,
+        "solution_check_mode": bool(flags & FLAG_CHECK_MODE),
+        "cell_colors": colors,
+        "editable_cells": [list(c) for c in editable],
+        "puzzle_completed": bool(flags & FLAG_COMPLETED),
+        "instructions": instructions,
+        "save_time": saved,
+    }
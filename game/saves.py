@@ -0,0 +1,241 @@
+import json
+import os
+import queue
+import re
+import struct
+import threading
+import zlib
+
+# Slots are written in the compact binary format of save_format (slotN.sav); slotN.json saves
+# from older versions still load. The index is {"checksum": crc32 of the canonical data JSON,
+# "data": {...}}. Every file is written to a temp file in the same directory, fsynced and then
+# os.replace'd over the target, so a crash leaves either the old file or the new one.
+JSON_VERSION = 1
+INDEX_NAME = "index.json"
+SLOT_FILE = re.compile(r"slot(\d+)\.(sav|json)$")
+LEGACY_EXT = ".json"
+
+
+class SaveCorrupted(ValueError):
+    pass
+
+
+def _canonical(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+def encode_json(data):
+    body = _canonical(data)
+    return json.dumps({"version": JSON_VERSION, "checksum": zlib.crc32(body.encode()), "data": data}).encode()
+
+
+def decode_json(raw):
+    try:
+        doc = json.loads(raw)
+    except ValueError as e:
+        raise SaveCorrupted(f"unreadable save: {e}") from e
+    if not isinstance(doc, dict):
+        raise SaveCorrupted("unreadable save")
+    if "checksum" not in doc:
+        return doc  # saves from before checksums were added are the bare data dict
+    data = doc.get("data")
+    if zlib.crc32(_canonical(data).encode()) != doc["checksum"]:
+        raise SaveCorrupted("checksum mismatch")
+    return data
+
+
+def encode_save(data):
+    from . import save_format  # pulls in the solver and bank; not needed for the menu
+    return save_format.encode(data)
+
+
+def decode_save(raw):
+    from . import save_format
+    if not raw.startswith(save_format.MAGIC):
+        return decode_json(raw)
+    try:
+        return save_format.decode(raw)
+    except (ValueError, IndexError, struct.error) as e:
+        raise SaveCorrupted(str(e)) from e
+
+
+def legacy_path(path):
+    # slot3.sav -> slot3.json, where older versions kept the same slot
+    return os.path.splitext(path)[0] + LEGACY_EXT
+
+
+def existing_save(path):
+    # the file currently holding this slot, preferring the binary one; None if the slot is empty
+    for candidate in (path, legacy_path(path)):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def write_atomic(path, payload):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # make the rename itself durable
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def read_save(path):
+    with open(path, "rb") as f:
+        return decode_save(f.read())
+
+
+class SaveWriter:
+    # Encodes and writes saves on a background thread so the render loop never touches the
+    # disk. Callers pass a snapshot of the data; results come back through poll(), which the
+    # main loop drains to report success or failure on its own thread.
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = {}  # path -> number of queued writes
+        self.latest = {}  # path -> data of the newest queued write
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, path, data, tag=None, after=None):
+        # after(payload) runs on the save thread once the file is safely on disk
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+            self.thread.start()
+        if path is not None:
+            with self.lock:
+                self.pending[path] = self.pending.get(path, 0) + 1
+                self.latest[path] = data
+        self.jobs.put((path, data, tag, after))
+
+    def call(self, fn, tag=None):
+        # run fn() on the save thread once every write queued before it is done; failures are
+        # reported through poll() under tag like those of a write
+        self.submit(None, None, tag, fn)
+
+    def is_pending(self, path):
+        with self.lock:
+            return path in self.pending
+
+    def queued(self, path):
+        # the data the newest queued write to path will put on disk, or None if nothing is queued
+        with self.lock:
+            return self.latest.get(path)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            path, data, tag, after = job
+            try:
+                if path is None:
+                    after()  # a call()
+                else:
+                    payload = encode_save(data)
+                    write_atomic(path, payload)
+                    if after: after(payload)
+                error = None
+            except Exception as e:
+                error = e
+            if path is not None:
+                with self.lock:
+                    self.pending[path] -= 1
+                    if not self.pending[path]:
+                        del self.pending[path]; del self.latest[path]
+            self.results.put((tag, error))
+            self.jobs.task_done()
+
+    def poll(self):
+        # (tag, error) for every write finished since the last call; error is None on success
+        done = []
+        while True:
+            try:
+                done.append(self.results.get_nowait())
+            except queue.Empty:
+                return done
+
+    def wait(self):
+        # block until every queued write is on disk
+        if self.thread is not None:
+            self.jobs.join()
+
+    def close(self):
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+
+
+def slot_summary(data):
+    # what the save/load dialog shows for a slot
+    return {"name": data.get("current_puzzle_name"), "difficulty": data.get("current_difficulty"),
+            "completed": data.get("puzzle_completed", False), "save_time": data.get("save_time")}
+
+
+class SlotIndex:
+    # slot number -> slot_summary, kept in progress/index.json and updated on every save and
+    # delete, so listing slots is one small read however many there are. A missing or
+    # unreadable index is rebuilt once from the slot files.
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, INDEX_NAME)
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.path, "rb") as f:
+                    self.entries = {int(k): v for k, v in decode_json(f.read()).items()}
+            except (OSError, ValueError, AttributeError):
+                self.entries = self._scan()
+                self._write()
+        return self.entries
+
+    def _scan(self):
+        entries = {}
+        # sorted so slotN.sav overrides a leftover slotN.json
+        for name in sorted(os.listdir(self.directory)):
+            match = SLOT_FILE.match(name)
+            if match:
+                try:
+                    entries[int(match.group(1))] = slot_summary(read_save(os.path.join(self.directory, name)))
+                except (OSError, ValueError) as e:
+                    print(f"Error loading {name}: {e}")
+                    entries[int(match.group(1))] = None  # corrupted
+        return entries
+
+    def _write(self):
+        write_atomic(self.path, encode_json({str(k): v for k, v in self.entries.items()}))
+
+    def snapshot(self):
+        # {slot: summary}, with None for a slot whose file is corrupted; empty slots are absent
+        with self.lock:
+            return dict(self._load())
+
+    def update(self, slot, summary):
+        with self.lock:
+            self._load()[slot] = summary
+            self._write()
+
+    def remove(self, slot):
+        with self.lock:
+            entries = self._load()
+            if slot in entries:
+                del entries[slot]
+                self._write()
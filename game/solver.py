@@ -0,0 +1,352 @@
+from .geometry import BOX_SHAPES, STANDARD, for_size, geometry_of
+
+# Cells are indexed row-major; digit d maps to bit d-1 of a mask. The tables below are the
+# standard 9x9 board's; SolverState works on any geometry.Geometry.
+ALL_DIGITS = STANDARD.all_digits
+DIGITS = STANDARD.digits
+
+ROW_OF = STANDARD.row_of
+COL_OF = STANDARD.col_of
+BOX_OF = STANDARD.box_of
+
+UNITS = STANDARD.units
+PEERS = STANDARD.peers
+
+BIT_COUNT = [bin(m).count("1") for m in range(ALL_DIGITS + 1)]
+# mask with a single bit set -> digit (1..9); 0 for anything else
+BIT_DIGIT = [0] * (ALL_DIGITS + 1)
+for _d in range(9):
+    BIT_DIGIT[1 << _d] = _d + 1
+
+
+# Board plus per-row/column/box used-digit masks, updated incrementally. Masks are plain
+# ints, so the same code handles up to 25 digits (boards of 625 cells).
+class SolverState:
+    __slots__ = ("geo", "cells", "rows", "cols", "boxes")
+
+    def __init__(self, cells=None, rows=None, cols=None, boxes=None, geo=STANDARD):
+        n = geo.size
+        self.geo = geo
+        self.cells = cells if cells is not None else [0] * geo.cells
+        self.rows = rows if rows is not None else [0] * n
+        self.cols = cols if cols is not None else [0] * n
+        self.boxes = boxes if boxes is not None else [0] * n
+
+    @classmethod
+    def from_grid(cls, grid):
+        geo = geometry_of(grid)
+        state = cls(geo=geo)
+        n = geo.size; values = geo.values
+        for r in range(n):
+            for c in range(n):
+                d = values.get(grid[r][c])
+                if d and not state.place(r * n + c, d):
+                    return None
+        return state
+
+    def copy(self):
+        return SolverState(self.cells[:], self.rows[:], self.cols[:], self.boxes[:], self.geo)
+
+    def candidates(self, i):
+        if self.cells[i]:
+            return 0
+        geo = self.geo
+        return geo.all_digits & ~(self.rows[geo.row_of[i]] | self.cols[geo.col_of[i]] | self.boxes[geo.box_of[i]])
+
+    def place(self, i, d):
+        bit = 1 << (d - 1)
+        geo = self.geo
+        r, c, b = geo.row_of[i], geo.col_of[i], geo.box_of[i]
+        if self.cells[i] or (self.rows[r] | self.cols[c] | self.boxes[b]) & bit:
+            return False
+        self.cells[i] = d
+        self.rows[r] |= bit; self.cols[c] |= bit; self.boxes[b] |= bit
+        return True
+
+    def remove(self, i):
+        d = self.cells[i]
+        if d:
+            bit = ~(1 << (d - 1))
+            geo = self.geo
+            self.cells[i] = 0
+            self.rows[geo.row_of[i]] &= bit; self.cols[geo.col_of[i]] &= bit; self.boxes[geo.box_of[i]] &= bit
+        return d
+
+    def to_grid(self):
+        n = self.geo.size; digits = self.geo.digits
+        return [[digits[d - 1] if d else '.' for d in self.cells[r * n:r * n + n]] for r in range(n)]
+
+    def propagate(self):
+        return _propagate(self)
+
+    def pick_cell(self):
+        return _pick_cell(self)
+
+
+# The same interface for boards with variant rules (see variants.Rules): a used-digit mask per
+# unit rather than per row, column and box, and each constraint's own propagation between
+# rounds of singles. propagate() leaves the narrowed candidates in cand for pick_cell.
+class VariantState:
+    __slots__ = ("rules", "geo", "cells", "used", "cand")
+
+    def __init__(self, rules, cells=None, used=None):
+        self.rules = rules; self.geo = rules.geo
+        self.cells = cells if cells is not None else [0] * rules.geo.cells
+        self.used = used if used is not None else [0] * len(rules.units)
+        self.cand = None
+
+    @classmethod
+    def from_grid(cls, grid, rules):
+        state = cls(rules)
+        values = rules.geo.values
+        for i, ch in enumerate(ch for row in grid for ch in row):
+            d = values.get(ch)
+            if d and not state.place(i, d):
+                return None
+        return state
+
+    def copy(self):
+        return VariantState(self.rules, self.cells[:], self.used[:])
+
+    def candidates(self, i):
+        if self.cells[i]:
+            return 0
+        used = self.used; taken = 0
+        for u in self.rules.units_of[i]:
+            taken |= used[u]
+        return self.geo.all_digits & ~taken
+
+    def place(self, i, d):
+        bit = 1 << (d - 1)
+        used = self.used; units = self.rules.units_of[i]
+        if self.cells[i]:
+            return False
+        for u in units:
+            if used[u] & bit:
+                return False
+        self.cells[i] = d
+        for u in units:
+            used[u] |= bit
+        return True
+
+    def remove(self, i):
+        d = self.cells[i]
+        if d:
+            bit = ~(1 << (d - 1))
+            self.cells[i] = 0
+            for u in self.rules.units_of[i]:
+                self.used[u] &= bit
+        return d
+
+    to_grid = SolverState.to_grid
+
+    def propagate(self):
+        return _propagate_rules(self)
+
+    def pick_cell(self):
+        cand, cells = self.cand, self.cells
+        best = -1; best_cand = 0; best_count = self.geo.size + 1
+        for i in range(len(cells)):
+            if cells[i]:
+                continue
+            n = cand[i].bit_count()
+            if n < best_count:
+                best, best_cand, best_count = i, cand[i], n
+                if n <= 2:
+                    break
+        return best, best_cand
+
+
+def state_for(grid, rules=None):
+    # the solver state for grid under rules (classic when None); None if givens clash
+    if rules is None or not rules.constraints:
+        return SolverState.from_grid(grid)
+    return VariantState.from_grid(grid, rules)
+
+
+def _propagate(state):
+    # Fill naked and hidden singles until nothing changes; False on contradiction.
+    geo = state.geo
+    cells, rows, cols, boxes = state.cells, state.rows, state.cols, state.boxes
+    row_of, col_of, box_of, all_digits = geo.row_of, geo.col_of, geo.box_of, geo.all_digits
+    while True:
+        progress = False
+        for i in range(geo.cells):
+            if cells[i]:
+                continue
+            cand = all_digits & ~(rows[row_of[i]] | cols[col_of[i]] | boxes[box_of[i]])
+            if not cand:
+                return False
+            if not cand & (cand - 1):
+                state.place(i, cand.bit_length())
+                progress = True
+        if progress:
+            continue
+        for unit in geo.units:
+            once = 0; twice = 0; placed = 0
+            for i in unit:
+                d = cells[i]
+                if d:
+                    placed |= 1 << (d - 1)
+                    continue
+                cand = all_digits & ~(rows[row_of[i]] | cols[col_of[i]] | boxes[box_of[i]])
+                twice |= once & cand
+                once |= cand
+            if (once | placed) != all_digits:
+                return False
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if not cells[i] and state.candidates(i) & bit:
+                        if not state.place(i, bit.bit_length()):
+                            return False
+                        progress = True
+                        break
+        if not progress:
+            return True
+
+
+def _pick_cell(state):
+    # Minimum remaining values: the empty cell with the fewest candidates.
+    geo = state.geo
+    best = -1; best_cand = 0; best_count = geo.size + 1
+    cells, rows, cols, boxes = state.cells, state.rows, state.cols, state.boxes
+    row_of, col_of, box_of, all_digits = geo.row_of, geo.col_of, geo.box_of, geo.all_digits
+    for i in range(geo.cells):
+        if cells[i]:
+            continue
+        cand = all_digits & ~(rows[row_of[i]] | cols[col_of[i]] | boxes[box_of[i]])
+        n = cand.bit_count()
+        if n < best_count:
+            best, best_cand, best_count = i, cand, n
+            if n <= 2:
+                break
+    return best, best_cand
+
+
+def _propagate_rules(state):
+    # _propagate for a VariantState: the constraints narrow the candidates, then naked and
+    # hidden singles (in houses only; groups need not hold every digit), until nothing changes
+    rules = state.rules; geo = rules.geo
+    cells, peers, local, all_digits = state.cells, rules.peers, rules.local, geo.all_digits
+    cand = [state.candidates(i) for i in range(geo.cells)]
+    while True:
+        for con in local:
+            if not con.propagate(cand, cells, geo):
+                return False
+        progress = False
+        for i in range(geo.cells):
+            if cells[i]:
+                continue
+            m = cand[i]
+            if not m:
+                return False
+            if not m & (m - 1):
+                if not state.place(i, m.bit_length()):
+                    return False
+                cand[i] = 0
+                for p in peers[i]:
+                    cand[p] &= ~m
+                progress = True
+        if progress:
+            continue
+        for unit in rules.houses:
+            once = 0; twice = 0; placed = 0
+            for i in unit:
+                if cells[i]:
+                    placed |= 1 << (cells[i] - 1)
+                    continue
+                twice |= once & cand[i]
+                once |= cand[i]
+            if (once | placed) != all_digits:
+                return False
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if cand[i] & bit:
+                        if not state.place(i, bit.bit_length()):
+                            return False
+                        cand[i] = 0
+                        for p in peers[i]:
+                            cand[p] &= ~bit
+                        progress = True
+                        break
+        if not progress:
+            state.cand = cand
+            return True
+
+
+def _search(state, limit, found, rng=None):
+    if not state.propagate():
+        return
+    i, cand = state.pick_cell()
+    if i < 0:
+        found.append(state)
+        return
+    digits = [d + 1 for d in range(state.geo.size) if cand >> d & 1]
+    if rng:
+        rng.shuffle(digits)
+    for d in digits:
+        child = state.copy()
+        child.place(i, d)
+        _search(child, limit, found, rng)
+        if len(found) >= limit:
+            return
+
+
+def solve_state(state, rng=None):
+    found = []
+    _search(state.copy(), 1, found, rng)
+    return found[0] if found else None
+
+
+def count_state_solutions(state, limit=2):
+    found = []
+    _search(state.copy(), limit, found)
+    return len(found)
+
+
+# grid is an n x n list of digit / '.' strings (see geometry), as produced by randomize_puzzle;
+# rules, if given, is a variants.Rules for the same board
+def solve(grid, rng=None, rules=None):
+    state = state_for(grid, rules)
+    if state is None:
+        return None
+    solved = solve_state(state, rng)
+    return solved.to_grid() if solved else None
+
+
+# stops as soon as limit solutions have been found
+def count_solutions(grid, limit=2, rules=None):
+    state = state_for(grid, rules)
+    if state is None:
+        return 0
+    return count_state_solutions(state, limit)
+
+
+def is_valid_solution(grid, rules=None):
+    # full, and breaking none of the rules (propagation checks what placing alone does not)
+    state = state_for(grid, rules)
+    return state is not None and all(state.cells) and state.propagate()
+
+
+def parse_grid(text):
+    # Accepts n*n cells for a supported board size n (81 for the standard board) of digits
+    # with '.' or '0' for blanks; whitespace is ignored, anything else is a ValueError.
+    chars = [ch for ch in text if not ch.isspace()]
+    n = int(len(chars) ** 0.5)
+    if n * n != len(chars) or n not in BOX_SHAPES:
+        raise ValueError(f"expected 81 cells (or another n*n board), got {len(chars)}")
+    digits = for_size(n).values
+    for i, ch in enumerate(chars):
+        if ch not in digits and ch not in ".0":
+            raise ValueError(f"unexpected character {ch!r} at cell {i + 1}")
+    return [['.' if ch in ".0" else ch for ch in chars[r * n:r * n + n]] for r in range(n)]
+
+
+def grid_to_string(grid):
+    return "".join("".join(row) for row in grid)
@@ -1,7 +1,6 @@
 import pygame
 import os
-
-pygame.mixer.init()
+from concurrent.futures import Future, ThreadPoolExecutor
 
 SOUNDS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "sounds")
 
@@ -14,6 +13,45 @@ background_music_path = os.path.join(SOUNDS_DIR, "background.mp3")
 
 music_available = os.path.exists(background_music_path)
 
+# populated by init_sounds(); importing this module touches neither the mixer nor the disk
+sound_click = None
+sound_success = None
+sound_error = None
+sound_win = None
+
+# one loader thread: mixer init, then each sound in turn, then the background music
+_loader = None
+mixer_ready = Future()
+music_volume = 1.0
+
+
+class LazySound:
+    # Stands in for a pygame Sound while it decodes on the loader thread. future resolves to
+    # the Sound (or None if it failed); play() before then is silently skipped and
+    # set_volume() is remembered and applied once it has loaded.
+    def __init__(self, filename, future):
+        self.filename = filename
+        self.future = future
+        self.volume = None
+        future.add_done_callback(self._loaded)
+
+    def _loaded(self, future):
+        sound = future.result()
+        if sound is not None and self.volume is not None:
+            sound.set_volume(self.volume)
+
+    def ready(self):
+        return self.future.done() and self.future.result() is not None
+
+    def play(self):
+        if self.ready():
+            self.future.result().play()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.ready():
+            self.future.result().set_volume(volume)
+
 
 def load_sound(filename):
 
@@ -42,7 +80,50 @@ def initialize_background_music(volume):
     return False
 
 
-sound_click = load_sound("click.wav")
-sound_success = load_sound("success.wav")
-sound_error = load_sound("error.wav")
-sound_win = load_sound("win.wav")
\ No newline at end of file
+def set_music_volume(volume):
+    # safe to call before the mixer is up; the music starts at the latest volume set
+    global music_volume
+    music_volume = volume
+    if mixer_ready.done() and mixer_ready.result():
+        pygame.mixer.music.set_volume(volume)
+
+
+def _init_mixer():
+    try:
+        pygame.mixer.init()
+        mixer_ready.set_result(True)
+    except pygame.error as e:
+        print("Failed to initialize audio:", e)
+        mixer_ready.set_result(False)
+
+
+def _load_after_mixer(filename):
+    return load_sound(filename) if mixer_ready.result() else None
+
+
+def init_sounds(start_music=True):
+    # Returns at once: the mixer is initialised and every sound decoded on a background
+    # thread, so the window can come up before any audio is ready. The module's sound_*
+    # names are LazySound handles (None when the file does not exist).
+    global _loader, sound_click, sound_success, sound_error, sound_win
+    if _loader is not None:
+        return
+    _loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-loader")
+    _loader.submit(_init_mixer)
+
+    def lazy(path):
+        if not os.path.exists(path):
+            print(f"Sound not found: {os.path.basename(path)}")
+            return None
+        name = os.path.basename(path)
+        return LazySound(name, _loader.submit(_load_after_mixer, name))
+
+    sound_click = lazy(sound_click_path)
+    sound_success = lazy(sound_success_path)
+    sound_error = lazy(sound_error_path)
+    sound_win = lazy(sound_win_path)
+    if start_music:
+        # queued last: decoding the start of the mp3 is the slowest part
+        _loader.submit(lambda: mixer_ready.result() and initialize_background_music(music_volume))
+    _loader.shutdown(wait=False)
+
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import time
+
+# `python main.py --startup-report`: how long each startup phase took up to the first menu
+# frame, and the slowest imports as reported by `python -X importtime`.
+TARGET_MS = 300
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module="game.game_logic"):
+    # [(cumulative ms, self ms, module)] for a fresh interpreter importing module
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=ROOT)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.strip()))
+    return times
+
+
+def startup_report(startup_time, imported_time, top=12):
+    from game.game_logic import SudokuGame
+    game = SudokuGame(startup_time)
+    created = time.perf_counter()
+    game.draw()
+    first_frame = time.perf_counter()
+    game.save_writer.close()
+    total = (first_frame - startup_time) * 1000
+    print(f"imports      {(imported_time - startup_time) * 1000:7.1f} ms")
+    print(f"game init    {(created - imported_time) * 1000:7.1f} ms")
+    print(f"first frame  {(first_frame - created) * 1000:7.1f} ms")
+    print(f"total        {total:7.1f} ms ({'within' if total <= TARGET_MS else 'over'} the {TARGET_MS} ms target)")
+    times = sorted(import_times(), reverse=True)
+    print("\nslowest imports (python -X importtime, cumulative / self ms):")
+    for cumulative, own, name in times[:top]:
+        print(f"  {cumulative:7.1f} {own:7.1f}  {name}")
+    print("\ngame modules:")
+    for cumulative, own, name in times:
+        if name.startswith("game."):
+            print(f"  {cumulative:7.1f} {own:7.1f}  {name}")
+    return 0
@@ -1,7 +1,9 @@
 import pygame
 from game.constants import *
 import time
-from game.sounds import sound_click
+from game import sounds
+from game.fonts import get_font
+from game.rendering import render_text
 
 class Button:
     def __init__(self, x, y, w, h, text="", color=LIGHT_GRAY, hover_color=GRAY, action=None, font_size=22, enabled=True, animated=False):
@@ -10,7 +12,7 @@ class Button:
         self.color = color
         self.hover_color = hover_color
         self.action = action
-        self.font = pygame.font.SysFont("Arial", font_size)
+        self.font = get_font(font_size)
         self.is_hovered = False
         self.enabled = enabled
         # animation support for settings fallback button
@@ -34,7 +36,7 @@ class Button:
         pygame.draw.rect(screen, col, draw_rect, border_radius=6)
         pygame.draw.rect(screen, DARK_GRAY, draw_rect, 2, border_radius=6)
         if self.text:
-            surf = self.font.render(self.text, True, txt_col)
+            surf = render_text(self.font, self.text, txt_col)
             screen.blit(surf, surf.get_rect(center=draw_rect.center))
 
     def check_hover(self, pos):
@@ -54,8 +56,8 @@ class Button:
                 # Play click sound on mouse down for animated buttons
                 if hasattr(self, "sound_click") and self.sound_click:
                     self.sound_click.play()
-                elif "sound_click" in globals() and sound_click:
-                    sound_click.play()
+                elif sounds.sound_click:
+                    sounds.sound_click.play()
                 return False
             if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                 if self.is_pressed:
@@ -63,8 +65,8 @@ class Button:
                     if self.is_hovered:
                         if hasattr(self, "sound_click") and self.sound_click:
                             self.sound_click.play()
-                        elif "sound_click" in globals() and sound_click:
-                            sound_click.play()
+                        elif sounds.sound_click:
+                            sounds.sound_click.play()
                         if self.action:
                             return self.action()
                 return False
@@ -74,8 +76,8 @@ class Button:
                 # Always play click sound on button down
                 if hasattr(self, "sound_click") and self.sound_click:
                     self.sound_click.play()
-                elif "sound_click" in globals() and sound_click:
-                    sound_click.play()
+                elif sounds.sound_click:
+                    sounds.sound_click.play()
                 if self.action:
                     return self.action()
         return False
@@ -94,6 +96,7 @@ class ImageButton:
         self.is_pressed = False
         self.pulse = 0.0  # optional small pulse
         self.last_pulse_time = time.time()
+        self.fallback_font = None
 
     def draw(self, screen):
         # compute press offset & scale when pressed
@@ -124,8 +127,9 @@ class ImageButton:
         else:
             pygame.draw.rect(screen, LIGHT_GRAY, draw_rect, border_radius=6)
             pygame.draw.rect(screen, DARK_GRAY, draw_rect, 2, border_radius=6)
-            f = pygame.font.SysFont("Arial", 18)
-            surf = f.render("Settings", True, BLACK)
+            if self.fallback_font is None:
+                self.fallback_font = get_font(18)
+            surf = render_text(self.fallback_font, "Settings", BLACK)
             screen.blit(surf, surf.get_rect(center=draw_rect.center))
 
     def check_hover(self, pos):
@@ -141,8 +145,8 @@ class ImageButton:
             if self.is_pressed:
                 self.is_pressed = False
                 if self.is_hovered:
-                    if sound_click:
-                        sound_click.play()
+                    if sounds.sound_click:
+                        sounds.sound_click.play()
                     if self.action:
                         return self.action()
         return False
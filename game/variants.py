@@ -0,0 +1,355 @@
+from functools import lru_cache
+from itertools import combinations
+from .geometry import STANDARD
+
+# Variant rules. A puzzle's rules are its geometry plus a list of constraints, each an
+# instance of a class registered in VARIANTS under its kind. A constraint can add
+#   houses      units that hold every digit once on top of rows, columns and boxes (diagonals)
+#   regions     a region index per cell to use in place of the boxes (jigsaw)
+#   groups      cells whose digits must differ, without holding every digit (cages)
+#   propagate   its own narrowing of candidate masks beyond "not in a peer" (cage sums,
+#               thermometer order), run by the solver between rounds of singles
+#   broken      whether the digits placed so far already break it, for conflict highlighting
+# Rules flattens all of that once so the solver, the conflict index and the hint engine
+# read the same units; the renderer draws each kind it knows (see rendering.DECORATIONS).
+VARIANTS = {}
+
+CAGE_SIZES = (2, 2, 3, 3, 3, 4, 4, 5)  # drawn from when growing killer cages
+JIGSAW_SWAPS = 30  # cell swaps tried per region when reshaping the boxes
+
+
+def register(cls):
+    VARIANTS[cls.kind] = cls
+    return cls
+
+
+def _adjacent(geo, i, diagonal=False):
+    n = geo.size; r, c = geo.row_of[i], geo.col_of[i]
+    steps = ((-1, 0), (1, 0), (0, -1), (0, 1)) + (((-1, -1), (-1, 1), (1, -1), (1, 1)) if diagonal else ())
+    return [(r + dr) * n + c + dc for dr, dc in steps if 0 <= r + dr < n and 0 <= c + dc < n]
+
+
+def _values(solution, geo):
+    return [geo.value(ch) for row in solution for ch in row]
+
+
+@lru_cache(maxsize=None)
+def cage_combos(n, k, total):
+    # masks of k distinct digits from 1..n adding up to total
+    return tuple(sum(1 << (d - 1) for d in combo) for combo in combinations(range(1, n + 1), k) if sum(combo) == total)
+
+
+class Constraint:
+    kind = None
+    label = None  # what one is called in messages
+    cells = ()  # the cells propagate and broken look at; empty for pure unit constraints
+    givens_share = 1.0  # of the classic givens targets; kinds that pin the digits down keep fewer
+
+    def houses(self, geo):
+        return []  # (name, cells) pairs
+
+    def regions(self, geo):
+        return None
+
+    def groups(self, geo):
+        return []  # (name, cells) pairs
+
+    def propagate(self, cand, values, geo):
+        # cand: candidate mask per cell (0 where filled), values: digit per cell (0 where
+        # empty). Narrow cand in place; False if the constraint can no longer be met.
+        return True
+
+    def broken(self, values, geo):
+        return False
+
+    def to_data(self):
+        return []  # ints, enough for from_data to rebuild it
+
+    @classmethod
+    def from_data(cls, data):
+        return cls()
+
+    @classmethod
+    def derive(cls, solution, geo, rng):
+        # constraints of this kind for a new puzzle around solution; ones that solution breaks
+        # (the diagonals) make the generator search for another solution under them
+        return [cls()]
+
+
+@register
+class Diagonal(Constraint):
+    # X-sudoku: both long diagonals hold every digit once
+    kind = "diagonal"
+
+    def houses(self, geo):
+        n = geo.size
+        return [("diagonal", [i * n + i for i in range(n)]), ("anti-diagonal", [i * n + n - 1 - i for i in range(n)])]
+
+
+@register
+class Jigsaw(Constraint):
+    # irregular regions of n connected cells take the place of the boxes
+    kind = "jigsaw"
+
+    def __init__(self, region_of):
+        self.region_of = list(region_of)
+
+    def regions(self, geo):
+        return self.region_of
+
+    def to_data(self):
+        return self.region_of
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data)
+
+    @classmethod
+    def derive(cls, solution, geo, rng):
+        # reshape the boxes by trading cells between neighbouring regions, only ever two
+        # cells holding the same digit of solution: every region keeps one of each digit, so
+        # solution still fits. A trade that would split a region is undone.
+        values = _values(solution, geo); region = list(geo.box_of)
+        for _ in range(JIGSAW_SWAPS * geo.size):
+            i = rng.randrange(geo.cells); a = region[i]
+            others = sorted({region[k] for k in _adjacent(geo, i)} - {a})
+            if not others:
+                continue
+            b = rng.choice(others)
+            j = next(k for k in range(geo.cells) if region[k] == b and values[k] == values[i])
+            region[i], region[j] = b, a
+            if not (_connected(geo, region, a) and _connected(geo, region, b)):
+                region[i], region[j] = a, b
+        return [cls(region)]
+
+
+def _connected(geo, region, k):
+    cells = [i for i in range(geo.cells) if region[i] == k]
+    seen = {cells[0]}; todo = [cells[0]]
+    while todo:
+        for j in _adjacent(geo, todo.pop()):
+            if region[j] == k and j not in seen:
+                seen.add(j); todo.append(j)
+    return len(seen) == len(cells)
+
+
+@register
+class Cage(Constraint):
+    # killer cage: its digits differ and add up to total
+    kind = "killer"
+    label = "cage"
+    givens_share = 0.5
+
+    def __init__(self, cells, total):
+        self.cells = list(cells); self.total = total
+
+    def groups(self, geo):
+        return [(self.label, self.cells)]
+
+    def propagate(self, cand, values, geo):
+        # keep only digits that appear in some set of distinct digits making up what is
+        # left of the sum, where that set can actually be spread over the empty cells
+        total = self.total; placed = 0; empty = []
+        for i in self.cells:
+            if values[i]:
+                total -= values[i]; placed |= 1 << (values[i] - 1)
+            else:
+                empty.append(i)
+        if not empty:
+            return total == 0
+        allowed = 0
+        for combo in cage_combos(geo.size, len(empty), total):
+            if combo & placed:
+                continue
+            seen = 0
+            for i in empty:
+                m = cand[i] & combo
+                if not m:
+                    break
+                seen |= m
+            else:
+                if seen == combo:
+                    allowed |= combo
+        if not allowed:
+            return False
+        for i in empty:
+            cand[i] &= allowed
+        return True
+
+    def broken(self, values, geo):
+        # what is placed already leaves the rest of the sum out of reach
+        placed = [values[i] for i in self.cells if values[i]]
+        left = len(self.cells) - len(placed); total = self.total - sum(placed)
+        return not left * (left + 1) // 2 <= total <= left * (2 * geo.size - left + 1) // 2
+
+    def to_data(self):
+        return [self.total] + self.cells
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data[1:], data[0])
+
+    @classmethod
+    def derive(cls, solution, geo, rng):
+        # cover the board with cages grown from random cells through neighbours whose digit
+        # is not in the cage yet; sums are read off solution
+        values = _values(solution, geo)
+        cage_of = [-1] * geo.cells; cages = []
+        order = list(range(geo.cells)); rng.shuffle(order)
+        for i in order:
+            if cage_of[i] >= 0:
+                continue
+            cage = [i]; cage_of[i] = len(cages); size = rng.choice(CAGE_SIZES)
+            while len(cage) < size:
+                digits = {values[k] for k in cage}
+                options = [j for k in cage for j in _adjacent(geo, k) if cage_of[j] < 0 and values[j] not in digits]
+                if not options:
+                    break
+                j = rng.choice(options); cage.append(j); cage_of[j] = cage_of[i]
+            cages.append(cage)
+        # a one-cell cage is just a given: fold it into a neighbouring cage where its digit fits
+        for k, cage in enumerate(cages):
+            if len(cage) != 1:
+                continue
+            i = cage[0]
+            for j in _adjacent(geo, i):
+                other = cages[cage_of[j]]
+                if other is not cage and len(other) < max(CAGE_SIZES) and values[i] not in {values[m] for m in other}:
+                    other.append(i); cage_of[i] = cage_of[j]; cages[k] = []
+                    break
+        return [cls(sorted(cage), sum(values[i] for i in cage)) for cage in cages if cage]
+
+
+@register
+class Thermo(Constraint):
+    # thermometer: digits rise strictly from the bulb, cells[0], to the tip
+    kind = "thermo"
+    label = "thermometer"
+    givens_share = 0.75
+
+    def __init__(self, cells):
+        self.cells = list(cells)
+
+    def groups(self, geo):
+        return [(self.label, self.cells)]
+
+    def propagate(self, cand, values, geo):
+        # each cell must beat the smallest digit the one before it can take and stay under
+        # the largest the one after it can take: one pass up from the bulb, one back down
+        masks = [1 << (values[i] - 1) if values[i] else cand[i] for i in self.cells]
+        low = 0
+        for k, m in enumerate(masks):
+            m &= ~((1 << low) - 1)
+            if not m:
+                return False
+            masks[k] = m; low = (m & -m).bit_length()
+        high = geo.size + 1
+        for k in range(len(masks) - 1, -1, -1):
+            m = masks[k] & ((1 << (high - 1)) - 1)
+            if not m:
+                return False
+            masks[k] = m; high = m.bit_length()
+        for i, m in zip(self.cells, masks):
+            if not values[i]:
+                cand[i] = m
+        return True
+
+    def broken(self, values, geo):
+        # k steps up from the bulb needs a digit at least k + 1 and at least k above a digit k
+        # cells further down; the same from the top end
+        last, prev = -1, 0; length = len(self.cells)
+        for k, i in enumerate(self.cells):
+            v = values[i]
+            if v:
+                if v - prev < k - last or v > geo.size - (length - 1 - k):
+                    return True
+                last, prev = k, v
+        return False
+
+    def to_data(self):
+        return self.cells
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data)
+
+    @classmethod
+    def derive(cls, solution, geo, rng):
+        # walk uphill through solution from low digits, taking small steps (diagonal moves
+        # too) so the thermometers run long; they do not share cells
+        values = _values(solution, geo); used = set(); thermos = []
+        starts = list(range(geo.cells)); rng.shuffle(starts); starts.sort(key=lambda i: values[i])
+        longest = geo.size // 2 + 2
+        for i in starts:
+            if len(thermos) > geo.size // 2:
+                break
+            if i in used:
+                continue
+            path = [i]
+            while len(path) < longest:
+                options = [j for j in _adjacent(geo, path[-1], True) if j not in used and j not in path and values[j] > values[path[-1]]]
+                if not options:
+                    break
+                step = min(values[j] for j in options)
+                path.append(rng.choice([j for j in options if values[j] <= step + 1]))
+            if len(path) >= 3:
+                thermos.append(cls(path)); used.update(path)
+        return thermos
+
+
+class Rules:
+    # A board's geometry and constraints, flattened. Units are the houses (rows, columns,
+    # boxes or regions, then any extra houses), then the groups; units_of[i] lists the units
+    # through cell i, peers[i] every cell sharing one with it, and local_of[i] the
+    # constraints with their own propagate/broken that cover i. names[u] is for messages.
+    __slots__ = ("geo", "constraints", "kind", "box_of", "houses", "units", "names", "units_of", "peers", "local", "local_of")
+
+    def __init__(self, geo=STANDARD, constraints=()):
+        n = geo.size
+        self.geo = geo; self.constraints = list(constraints)
+        self.kind = "+".join(sorted({con.kind for con in self.constraints})) or "classic"
+        box_of = geo.box_of; extra = []; groups = []
+        for con in self.constraints:
+            box_of = con.regions(geo) or box_of
+            extra += con.houses(geo); groups += con.groups(geo)
+        self.box_of = box_of
+        if box_of is geo.box_of:
+            boxes = geo.units[2 * n:]; region = "box"
+        else:
+            boxes = [[i for i in range(geo.cells) if box_of[i] == b] for b in range(n)]; region = "region"
+        self.houses = geo.units[:2 * n] + boxes + [cells for _, cells in extra]
+        self.units = self.houses + [cells for _, cells in groups]
+        self.names = ([f"row {k + 1}" for k in range(n)] + [f"column {k + 1}" for k in range(n)] +
+                      [f"{region} {k + 1}" for k in range(n)] + [name for name, _ in extra + groups])
+        self.units_of = [[] for _ in range(geo.cells)]
+        for u, unit in enumerate(self.units):
+            for i in unit:
+                self.units_of[i].append(u)
+        if len(self.units) == 3 * n and box_of is geo.box_of:
+            self.peers = geo.peers
+        else:
+            self.peers = [sorted(set().union(*(self.units[u] for u in self.units_of[i])) - {i}) for i in range(geo.cells)]
+        self.local = [con for con in self.constraints if con.cells]
+        self.local_of = [[] for _ in range(geo.cells)]
+        for con in self.local:
+            for i in con.cells:
+                self.local_of[i].append(con)
+
+
+@lru_cache(maxsize=None)
+def plain_rules(geo=STANDARD):
+    # the classic rules of a geometry, shared by every board of that shape
+    return Rules(geo)
+
+
+def make_rules(geo, constraints=()):
+    return Rules(geo, constraints) if constraints else plain_rules(geo)
+
+
+def dump_constraints(constraints):
+    # JSON-friendly [kind, *ints] lists, as kept in SudokuEngine.to_dict
+    return [[con.kind] + list(con.to_data()) for con in constraints]
+
+
+def load_constraints(data):
+    return [VARIANTS[kind].from_data(list(args)) for kind, *args in data or []]
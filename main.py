@@ -1,5 +1,13 @@
+import sys
+import time
+startup_time = time.perf_counter()  # time to first frame is measured from here
+
 from game.game_logic import SudokuGame
+imported_time = time.perf_counter()
 
 if __name__ == "__main__":
-    game = SudokuGame()
-    game.run()
\ No newline at end of file
+    if "--startup-report" in sys.argv:
+        from game.startup import startup_report
+        sys.exit(startup_report(startup_time, imported_time))
+    game = SudokuGame(startup_time)
+    game.run()
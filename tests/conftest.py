@@ -0,0 +1,5 @@
+import os
+
+# headless pygame for anything that opens the game window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,87 @@
+import io
+import pytest
+from game.cli import main, read_puzzles, run
+from game.solver import grid_to_string, parse_grid, solve
+
+PUZZLE = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+
+
+def _rows(puzzle):
+    return [puzzle[r * 9:r * 9 + 9] for r in range(9)]
+
+
+def test_reads_lines_and_blocks_mixed():
+    text = "# comment\n" + PUZZLE + "\n\n" + "\n".join(" ".join(row) for row in _rows(PUZZLE)) + "\n" + PUZZLE.replace(".", "0") + "\n"
+    assert list(read_puzzles(io.StringIO(text))) == [PUZZLE, PUZZLE, PUZZLE.replace(".", "0")]
+
+
+def test_reads_other_board_sizes():
+    small = "1..4" "4..1" "..1." "...3"
+    assert list(read_puzzles(io.StringIO(small + "\n"))) == [small]
+
+
+@pytest.mark.parametrize("text,message", [
+    (PUZZLE + "5\n", "line 1: expected 81 cells"),
+    ("\n".join(_rows(PUZZLE)[:3] + ["12345"] + _rows(PUZZLE)[3:]), "line 4: expected row 4 of the puzzle starting on line 1"),
+    ("\n".join(_rows(PUZZLE)[:4] + [PUZZLE]), "line 5: expected row 5"),
+    ("# x\n" + PUZZLE.replace(".", "x", 1), "line 2: unexpected character 'x'"),
+    ("\n".join(_rows(PUZZLE)[:8]), "incomplete puzzle at end of input (8 of 9 rows, starting on line 1)"),
+])
+def test_malformed_input_names_the_line(text, message):
+    with pytest.raises(ValueError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        list(read_puzzles(io.StringIO(text)))
+
+
+def test_stray_line_does_not_shift_the_next_puzzles():
+    # the first puzzle is read before the bad line is reported, never a misaligned one
+    text = PUZZLE + "\n" + "\n".join(_rows(PUZZLE)[:5]) + "\n" + PUZZLE + "\n"
+    found = []
+    with pytest.raises(ValueError, match="line 7"):
+        for puzzle in read_puzzles(io.StringIO(text)):
+            found.append(puzzle)
+    assert found == [PUZZLE]
+
+
+def test_parse_grid_blanks_and_digits():
+    grid = parse_grid(PUZZLE.replace(".", "0"))
+    assert grid == parse_grid(PUZZLE) and grid[0][0] == "4" and grid[0][1] == "."
+
+
+@pytest.mark.parametrize("text", ["x" + PUZZLE[1:], "?" + PUZZLE[1:], "A" + PUZZLE[1:], "G" + "." * 80])
+def test_parse_grid_rejects_unknown_characters(text):
+    with pytest.raises(ValueError, match="unexpected character"):
+        parse_grid(text)
+
+
+SMALL = "1..4" "4..1" "..1." "...3"
+
+
+def test_grade_reports_other_sizes_per_line():
+    out = io.StringIO()
+    run("grade", [SMALL, PUZZLE], out, workers=1)
+    graded = out.getvalue().splitlines()
+    assert graded[0] == "error: grading supports 9x9 boards only" and not graded[1].startswith("error")
+
+
+def test_solve_handles_other_sizes():
+    out = io.StringIO()
+    run("solve", [SMALL, "x" + SMALL[1:]], out, workers=1)
+    solved, bad = out.getvalue().splitlines()
+    assert solved[0] == "1" and "." not in solved and bad.startswith("error: unexpected character")
+
+
+@pytest.mark.parametrize("puzzles,solutions,message", [(2, 1, "more puzzles than solutions"), (1, 2, "more solutions than puzzles")])
+def test_validate_rejects_mismatched_counts(tmp_path, capsys, puzzles, solutions, message):
+    solution = grid_to_string(solve(parse_grid(PUZZLE)))
+    (tmp_path / "p.txt").write_text((PUZZLE + "\n") * puzzles)
+    (tmp_path / "s.txt").write_text((solution + "\n") * solutions)
+    assert main(["validate", str(tmp_path / "p.txt"), "-s", str(tmp_path / "s.txt"), "-j", "1", "-o", str(tmp_path / "out.txt")]) == 1
+    assert message in capsys.readouterr().err
+
+
+def test_validate_matching_files(tmp_path):
+    solution = grid_to_string(solve(parse_grid(PUZZLE)))
+    (tmp_path / "p.txt").write_text(PUZZLE + "\n" + PUZZLE + "\n")
+    (tmp_path / "s.txt").write_text(solution + "\n" + solution + "\n")
+    assert main(["validate", str(tmp_path / "p.txt"), "-s", str(tmp_path / "s.txt"), "-j", "1", "-o", str(tmp_path / "out.txt")]) == 0
+    assert (tmp_path / "out.txt").read_text() == "ok\nok\n"
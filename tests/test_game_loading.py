@@ -0,0 +1,62 @@
+from concurrent.futures import Future
+import pytest
+from game.game_logic import SudokuGame
+from game.producer import _produce
+from game.solver import count_solutions
+
+
+class DeferredExecutor:
+    # runs a submitted job only when the test says so, like a worker finishing later
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future(); self.jobs.append((future, fn, args))
+        return future
+
+    def finish(self):
+        for future, fn, args in self.jobs:
+            future.set_result(fn(*args))
+        self.jobs = []
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.fixture
+def game(tmp_path):
+    game = SudokuGame(progress_dir=str(tmp_path))
+    game.producer.executor = DeferredExecutor()
+    game.select_difficulty("puzzle1")
+    yield game
+    game.save_writer.close()
+
+
+def test_big_boards_generate_off_the_render_thread(game):
+    while game.board_size != 16: game.cycle_board_size()
+    game.load_puzzle_with_difficulty("advanced")
+    # nothing has run yet: the menu stays up and keeps drawing
+    assert game.game_state == "DIFFICULTY_SELECT" and game.pending_puzzle
+    game.load_puzzle_with_difficulty("normal")  # ignored while one is on the way
+    assert len([job for job in game.producer.executor.jobs if job[1] is not _produce]) == 1
+    game.poll_puzzle(); game.draw()
+    assert game.game_state == "DIFFICULTY_SELECT"
+    game.producer.executor.finish(); game.poll_puzzle()
+    engine = game.engine
+    assert game.game_state == "GAME" and game.pending_puzzle is None
+    assert engine.geo.size == 16 and engine.current_difficulty == "advanced"
+    assert count_solutions(engine.puzzle) == 1
+
+
+def test_result_is_dropped_once_the_player_leaves(game):
+    while game.board_size != 16: game.cycle_board_size()
+    game.load_puzzle_with_difficulty("beginner")
+    game.show_main_menu()
+    game.producer.executor.finish(); game.poll_puzzle()
+    assert game.game_state == "MAIN_MENU" and game.pending_puzzle is None and game.engine.puzzle is None
+
+
+def test_small_boards_still_load_at_once(game):
+    game.load_puzzle_with_difficulty("normal")
+    # the only jobs are the usual refills of the 9x9 queues
+    assert game.game_state == "GAME" and all(fn is _produce for _, fn, _ in game.producer.executor.jobs)
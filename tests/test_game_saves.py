@@ -0,0 +1,87 @@
+import json
+import os
+import pytest
+import threading
+from game.game_logic import SudokuGame
+from game.saves import read_save
+
+
+@pytest.fixture
+def game(tmp_path):
+    game = SudokuGame(progress_dir=str(tmp_path))
+    game.select_difficulty("puzzle1")
+    game.load_puzzle_with_difficulty("normal")
+    yield game
+    game.save_writer.close()
+    game.producer.shutdown()
+
+
+def test_slot_save_updates_index_and_reloads(game, tmp_path):
+    # a leftover slot from before the binary format is replaced by the new save
+    legacy = tmp_path / "slot3.json"
+    legacy.write_text(json.dumps({"current_puzzle_name": "old"}))
+    r, c = next((r, c) for r in range(9) for c in range(9) if game.engine.puzzle[r][c] == '.')
+    game.engine.set_cell(r, c, game.engine.solution[r][c])
+    assert game.save_progress(3)
+    game.save_writer.wait()
+    game.poll_saves()
+    assert game.alert_message == "[SUCCESS] Progress saved to slot 3!"
+    assert not legacy.exists()
+    entry = game.slot_index.snapshot()[3]
+    assert entry["name"] == "puzzle1" and entry["difficulty"] == "normal"
+    data = read_save(os.path.join(str(tmp_path), "slot3.sav"))
+    assert data["puzzle"] == game.engine.puzzle and data["solution"] == game.engine.solution
+
+
+def test_slot_save_loads_back(game):
+    before = [row[:] for row in game.engine.puzzle]
+    game.save_progress(1); game.save_writer.wait(); game.poll_saves()
+    game.load_puzzle_with_difficulty("advanced")
+    assert game.load_progress(1)
+    assert game.engine.puzzle == before and game.engine.current_difficulty == "normal"
+
+
+def _hold(writer):
+    # keeps the save thread busy until the returned event is set
+    release = threading.Event(); writer.call(release.wait)
+    return release
+
+
+def test_load_of_a_queued_save_does_not_wait(game):
+    before = [row[:] for row in game.engine.puzzle]
+    release = _hold(game.save_writer)
+    try:
+        game.save_progress(2)
+        game.load_puzzle_with_difficulty("advanced")
+        assert game.load_progress(2)
+        assert game.engine.puzzle == before and game.save_writer.is_pending(game.slot_path(2))
+    finally:
+        release.set()
+    game.save_writer.wait()
+    assert read_save(game.slot_path(2))["puzzle"] == before
+
+
+def test_delete_is_queued_behind_the_slot_write(game):
+    release = _hold(game.save_writer)
+    try:
+        game.save_progress(4)
+        assert game.delete_slot(4)
+        assert not game.load_progress(4)
+    finally:
+        release.set()
+    game.save_writer.wait(); game.poll_saves()
+    assert game.alert_message == "[SUCCESS] Slot 4 deleted!"
+    assert not os.path.exists(game.slot_path(4)) and 4 not in game.slot_index.snapshot()
+    assert not game.deleting_slots and not game.delete_slot(4)
+
+
+def test_save_after_delete_is_kept(game):
+    game.save_progress(5); game.save_writer.wait(); game.poll_saves()
+    release = _hold(game.save_writer)
+    try:
+        game.delete_slot(5); game.save_progress(5)
+        assert game.load_progress(5)
+    finally:
+        release.set()
+    game.save_writer.wait(); game.poll_saves()
+    assert os.path.exists(game.slot_path(5)) and 5 in game.slot_index.snapshot()
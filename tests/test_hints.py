@@ -0,0 +1,50 @@
+import random
+import pytest
+from game.engine import SudokuEngine
+from game.hints import find_hint
+from game.variants import VARIANTS
+
+
+def _engine(size=9, variant=None, difficulty="advanced", seed=0):
+    random.seed(seed)
+    engine = SudokuEngine()
+    engine.load_puzzle("puzzle1", difficulty, None, size, variant)
+    return engine
+
+
+def _play_out(engine):
+    # follow hints to the end; every one must name the solution's digit for an empty cell
+    rng = random.Random(1); techniques = set()
+    while not engine.is_full():
+        hint = find_hint(engine, rng)
+        r, c = hint.cell
+        assert engine.puzzle[r][c] == '.' and hint.digit == engine.solution[r][c], hint.explanation()
+        assert hint.steps and hint.explanation()
+        techniques.add(hint.technique)
+        engine.set_cell(r, c, hint.digit)
+    assert engine.is_solved() and find_hint(engine, rng) is None
+    return techniques
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_hints_match_the_solution(seed):
+    assert "hidden single" in _play_out(_engine(seed=seed))
+
+
+@pytest.mark.parametrize("size", [4, 6, 12, 16])
+def test_hints_on_other_sizes(size):
+    _play_out(_engine(size, difficulty="normal"))
+
+
+@pytest.mark.parametrize("kind", sorted(VARIANTS))
+def test_hints_under_variant_rules(kind):
+    _play_out(_engine(variant=kind))
+
+
+def test_wrong_entry_is_pointed_out_first():
+    engine = _engine()
+    r, c = next((r, c) for r in range(9) for c in range(9) if engine.puzzle[r][c] == '.')
+    wrong = next(d for d in engine.geo.digits if d != engine.solution[r][c])
+    engine.set_cell(r, c, wrong)
+    hint = find_hint(engine, random.Random(0))
+    assert hint.technique == "mistake" and hint.cell == (r, c) and hint.digit == engine.solution[r][c]
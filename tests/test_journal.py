@@ -0,0 +1,95 @@
+import os
+import threading
+import pytest
+from game.engine import SudokuEngine
+from game.journal import FRAME, LOG_HEADER, MoveJournal
+from game.saves import SaveWriter
+
+
+@pytest.fixture
+def journal(tmp_path):
+    writer = SaveWriter()
+    yield MoveJournal(str(tmp_path), writer)
+    writer.close()
+
+
+def _play(journal, moves):
+    # a new game, then one flushed frame per move; returns the engine and its board after
+    # each frame
+    engine = SudokuEngine(journal=journal)
+    engine.load_puzzle("puzzle1", "normal")
+    journal.writer.wait()
+    boards = [[row[:] for row in engine.puzzle]]
+    empties = [(r, c) for r in range(9) for c in range(9) if engine.puzzle[r][c] == '.']
+    for k in range(moves):
+        r, c = empties[k]
+        if k % 3 == 2:
+            engine.hint(cell=(r, c))
+        else:
+            engine.set_cell(r, c, engine.solution[r][c])
+        journal.flush()
+        boards.append([row[:] for row in engine.puzzle])
+    return engine, boards
+
+
+def _recovered(journal):
+    engine = SudokuEngine()
+    replayed = journal.recover(engine)
+    return engine, replayed
+
+
+def test_replays_every_move(journal):
+    engine, boards = _play(journal, 6)
+    engine.undo(); journal.flush()
+    back, replayed = _recovered(journal)
+    assert replayed == 7 and back.puzzle == engine.puzzle and back.hints_remaining == engine.hints_remaining
+
+
+def test_torn_last_frame_is_dropped(journal):
+    engine, boards = _play(journal, 5)
+    size = os.path.getsize(journal.log_path)
+    with open(journal.log_path, "r+b") as f:
+        f.truncate(size - 2)
+    back, replayed = _recovered(journal)
+    assert replayed == 4 and back.puzzle == boards[4]
+
+
+def test_corrupt_frame_stops_replay(journal):
+    engine, boards = _play(journal, 5)
+    with open(journal.log_path, "r+b") as f:
+        raw = bytearray(f.read())
+        # flip a record byte in the third frame
+        pos = LOG_HEADER.size
+        for _ in range(2):
+            pos += FRAME.size + FRAME.unpack_from(raw, pos)[0]
+        raw[pos + FRAME.size] ^= 0xFF
+        f.seek(0); f.write(raw)
+    back, replayed = _recovered(journal)
+    assert replayed == 2 and back.puzzle == boards[2]
+
+
+def test_log_of_another_snapshot_is_ignored(journal):
+    engine, boards = _play(journal, 3)
+    with open(journal.log_path, "rb") as f:
+        stale = f.read()
+    engine.load_puzzle("puzzle1", "advanced"); journal.writer.wait()
+    with open(journal.log_path, "wb") as f:
+        f.write(stale)
+    back, replayed = _recovered(journal)
+    assert replayed == 0 and back.puzzle == engine.puzzle and back.current_difficulty == "advanced"
+
+
+def test_discard_does_not_wait_for_the_disk(journal):
+    engine, boards = _play(journal, 2)
+    # hold the save thread, with a snapshot queued behind it
+    release = threading.Event()
+    journal.writer.call(release.wait)
+    journal.start(engine.to_dict())
+    done = threading.Thread(target=journal.discard)
+    done.start(); done.join(1)
+    blocked = done.is_alive()
+    release.set(); done.join()
+    assert not blocked
+    journal.writer.wait()
+    # the queued snapshot landed first and was deleted after
+    assert not journal.exists() and not os.path.exists(journal.log_path)
@@ -0,0 +1,21 @@
+import threading
+from concurrent.futures import Future
+from game.producer import PuzzleProducer
+
+
+class InlineExecutor:
+    # hands back futures that are already done, as a warm pool can for easy boards
+    def submit(self, fn, *args):
+        future = Future(); future.set_result(("puzzle", "solution"))
+        return future
+
+
+def test_refill_with_finished_futures_does_not_deadlock():
+    producer = PuzzleProducer(queue_size=2, workers=1)
+    producer.executor = InlineExecutor()
+    done = threading.Thread(target=producer.refill, daemon=True)
+    done.start(); done.join(2)
+    assert not done.is_alive()
+    assert all(len(ready) == 2 for ready in producer.ready.values())
+    assert all(count == 0 for count in producer.pending.values())
+    assert producer.pop("normal")[0] == "puzzle"
@@ -0,0 +1,97 @@
+import json
+import os
+import zlib
+import pytest
+from game.engine import SudokuEngine
+from game.saves import (SaveCorrupted, SaveWriter, SlotIndex, decode_save, encode_json, encode_save, existing_save,
+                        read_save, slot_summary)
+from game.save_format import CRC, FLAG_SOURCE, HEADER
+
+KEPT = ("current_puzzle_name", "current_difficulty", "hints_remaining", "puzzle", "solution", "original_puzzle",
+        "variant", "history", "pencil_marks", "selected_cell", "editable_cells", "puzzle_completed")
+
+
+def _played(size=9, variant=None):
+    engine = SudokuEngine()
+    engine.load_puzzle("puzzle2", "normal", None, size, variant)
+    n = engine.geo.size
+    empties = [(r, c) for r in range(n) for c in range(n) if engine.puzzle[r][c] == '.']
+    (r, c), (r2, c2), (r3, c3) = empties[:3]
+    engine.set_cell(r, c, engine.solution[r][c])
+    engine.set_cell(r2, c2, engine.geo.digits[0]); engine.undo()
+    engine.toggle_marks(r3, c3, 0b101)
+    engine.selected_cell = (r3, c3)
+    return engine.to_dict()
+
+
+@pytest.mark.parametrize("size,variant", [(9, None), (4, None), (16, None), (9, "killer"), (6, "jigsaw")])
+def test_binary_round_trip(size, variant):
+    data = _played(size, variant)
+    back = decode_save(encode_save(data))
+    for key in KEPT:
+        assert back[key] == data[key], key
+
+
+def test_saves_with_a_puzzle_source_still_load():
+    # earlier version 5 saves carried [kind, difficulty, varint seed] after the name
+    data = _played(); raw = encode_save(data)
+    at = HEADER.size + 1 + 1 + len(data["current_puzzle_name"])
+    old = bytearray(raw[:at] + bytes([1, 1, 0xB9, 0x60]) + raw[at:-CRC.size])
+    old[7] |= FLAG_SOURCE
+    old += CRC.pack(zlib.crc32(old))
+    back = decode_save(bytes(old))
+    assert "puzzle_source" not in back
+    for key in KEPT:
+        assert back[key] == data[key], key
+
+
+def test_binary_rejects_corruption():
+    raw = bytearray(encode_save(_played()))
+    raw[20] ^= 0xFF
+    with pytest.raises(SaveCorrupted):
+        decode_save(bytes(raw))
+
+
+def test_legacy_json_slots_still_load(tmp_path):
+    data = _played()
+    (tmp_path / "slot2.json").write_bytes(encode_json(data))
+    # saves from before checksums were the bare data dict
+    (tmp_path / "slot5.json").write_text(json.dumps(data))
+    for slot in (2, 5):
+        path = existing_save(os.path.join(str(tmp_path), f"slot{slot}.sav"))
+        assert path.endswith(".json") and read_save(path)["puzzle"] == data["puzzle"]
+    assert SlotIndex(str(tmp_path)).snapshot() == {2: slot_summary(data), 5: slot_summary(data)}
+
+
+def test_legacy_json_checksum_mismatch(tmp_path):
+    doc = json.loads(encode_json(_played()))
+    doc["data"]["hints_remaining"] += 1
+    with pytest.raises(SaveCorrupted):
+        decode_save(json.dumps(doc).encode())
+
+
+def test_writer_saves_and_updates_index(tmp_path):
+    directory = str(tmp_path); data = _played()
+    path = os.path.join(directory, "slot4.sav")
+    index = SlotIndex(directory); writer = SaveWriter()
+    try:
+        writer.submit(path, data, 4, lambda payload: index.update(4, slot_summary(data)))
+        writer.wait()
+        assert writer.poll() == [(4, None)] and not writer.is_pending(path)
+    finally:
+        writer.close()
+    assert read_save(path)["puzzle"] == data["puzzle"]
+    # a fresh index reads the entry back from index.json rather than rescanning
+    os.remove(path)
+    assert SlotIndex(directory).snapshot() == {4: slot_summary(data)}
+
+
+def test_writer_reports_failures(tmp_path):
+    writer = SaveWriter()
+    try:
+        writer.submit(os.path.join(str(tmp_path), "missing", "slot1.sav"), _played(), 1)
+        writer.wait()
+        (tag, error), = writer.poll()
+        assert tag == 1 and isinstance(error, OSError)
+    finally:
+        writer.close()
@@ -0,0 +1,52 @@
+import pytest
+from game.generator import generate_puzzle, generate_variant
+from game.geometry import geometry_of
+from game.solver import count_solutions, grid_to_string, is_valid_solution, parse_grid, solve
+from game.variants import VARIANTS, make_rules
+from benchmarks.common import HARD_PUZZLES_PATH
+from game.cli import read_puzzles
+
+
+def _hard_puzzles():
+    with open(HARD_PUZZLES_PATH) as f:
+        return [parse_grid(p) for p in read_puzzles(f)][:4]
+
+
+def _agrees(puzzle, solution):
+    return all(p == '.' or p == s for prow, srow in zip(puzzle, solution) for p, s in zip(prow, srow))
+
+
+@pytest.mark.parametrize("grid", _hard_puzzles(), ids=grid_to_string)
+def test_solves_hard_puzzles(grid):
+    solved = solve(grid)
+    assert solved and is_valid_solution(solved) and _agrees(grid, solved)
+    assert count_solutions(grid) == 1
+
+
+def test_counts_more_than_one_solution():
+    grid = parse_grid(grid_to_string(_hard_puzzles()[0]).replace("4", ".", 1))
+    solved = solve(grid)
+    assert count_solutions(grid) == 2 and count_solutions(grid, limit=5) > 1
+    assert count_solutions(solved) == 1
+
+
+def test_rejects_contradiction():
+    grid = parse_grid("11" + "." * 79)
+    assert solve(grid) is None and count_solutions(grid) == 0
+
+
+@pytest.mark.parametrize("size", [4, 6, 9, 12])
+def test_generated_puzzles_are_unique(size):
+    puzzle, solution = generate_puzzle("normal", 7, size)[:2]
+    assert is_valid_solution(solution) and _agrees(puzzle, solution)
+    assert count_solutions(puzzle) == 1 and solve(puzzle) == solution
+
+
+@pytest.mark.parametrize("kind", sorted(VARIANTS))
+def test_variant_puzzles_are_unique_under_their_rules(kind):
+    puzzle, solution, constraints = generate_variant(kind, "normal", 3)
+    rules = make_rules(geometry_of(puzzle), constraints)
+    assert is_valid_solution(solution, rules) and _agrees(puzzle, solution)
+    assert count_solutions(puzzle, rules=rules) == 1 and solve(puzzle, rules=rules) == solution
+    # the constraints carry information: without them the givens no longer pin the board
+    assert count_solutions(puzzle) == 2